@@ -4,8 +4,27 @@ from google import genai
 from google.genai import types
 import json
 import os
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional
+from pydantic import BaseModel, ValidationError
+
+from json_stream import JsonArrayStreamParser
+from metrics import (
+    LLM_REQUEST_SECONDS, LLM_PROMPT_BYTES, LLM_RESPONSE_BYTES, LLM_TOKENS, LLM_ERRORS,
+    LLM_PARSE_FAILURES, LLM_CACHE_LOOKUPS
+)
+from llm_cache import LLMCache, cache_key
+from llm_scheduler import (
+    scheduler, estimate_tokens, PRIORITY_INTERACTIVE, PRIORITY_PIPELINE, PRIORITY_SOURCING
+)
+
+MODEL = 'gemini-3-flash-preview'
+
+# "gemini" calls the real API; "fake" uses the offline stand-in in fake_llm.py
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+# Stream sourcing responses so candidates reach the pipeline one at a time
+SOURCING_STREAMING = os.getenv("SOURCING_STREAMING", "1") == "1"
 
 
 # Lazy client initialization
@@ -13,9 +32,14 @@ _client: Optional[genai.Client] = None
 
 
 def get_client() -> genai.Client:
-    """Get or create the Gemini client."""
+    """Get or create the Gemini client (or its stand-in, per LLM_BACKEND)."""
     global _client
-    if _client is None:
+    if _client is None and LLM_BACKEND == "fake":
+        from fake_llm import FakeClient
+        _client = FakeClient()
+    elif _client is None:
+        if LLM_BACKEND != "gemini":
+            raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
         # Try GEMINI_API_KEY first (standard), then fall back to GOOGLE_API_KEY
         api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         if not api_key:
@@ -24,6 +48,72 @@ def get_client() -> genai.Client:
     return _client
 
 
+def _record_call(agent: str, started: float, error: Optional[BaseException] = None,
+                 response_chars: int = 0, usage: Any = None):
+    """Record latency, sizes and token usage (or the error) for one LLM call."""
+    LLM_REQUEST_SECONDS.labels(agent=agent, outcome="error" if error else "ok").observe(time.perf_counter() - started)
+    if error is not None:
+        LLM_ERRORS.labels(agent=agent, code=getattr(error, "code", None) or type(error).__name__).inc()
+        return
+    LLM_RESPONSE_BYTES.labels(agent=agent).observe(response_chars)
+    if usage is not None:
+        for kind, value in (("prompt", usage.prompt_token_count), ("response", usage.candidates_token_count),
+                            ("total", usage.total_token_count)):
+            if value is not None:
+                LLM_TOKENS.labels(agent=agent, kind=kind).observe(value)
+
+
+def _response_excerpt(text: Optional[str], tail: int = 200) -> str:
+    """Size and last few characters of a response, for parse-failure logs."""
+    text = text or ""
+    return f"{len(text)} chars, ending {text[-tail:]!r}"
+
+
+async def generate_text(prompt: str, config: types.GenerateContentConfig,
+                        cache: Optional[LLMCache] = None, model: str = MODEL,
+                        priority: int = PRIORITY_PIPELINE, job_id: Optional[int] = None,
+                        agent: str = "other") -> str:
+    """Run one generate_content call through the scheduler and return the text.
+
+    With a cache, an identical earlier request is answered from it; only
+    responses that parse as JSON are stored, so a truncated answer is
+    never replayed. `agent` labels the call's metrics.
+    """
+    key = cache_key(model, prompt, config) if cache is not None else None
+    if key is not None:
+        cached = await cache.get(key)
+        LLM_CACHE_LOOKUPS.labels(result="miss" if cached is None else "hit").inc()
+        if cached is not None:
+            return cached
+
+    LLM_PROMPT_BYTES.labels(agent=agent).observe(len(prompt))
+    started = time.perf_counter()
+    try:
+        response = await scheduler.call(
+            lambda: get_client().aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=config
+            ),
+            priority=priority,
+            job_id=job_id,
+            tokens=estimate_tokens(prompt, config)
+        )
+    except Exception as e:
+        _record_call(agent, started, error=e)
+        raise
+    text = response.text
+    _record_call(agent, started, response_chars=len(text or ""), usage=getattr(response, "usage_metadata", None))
+
+    if key is not None:
+        try:
+            json.loads(text)
+        except (TypeError, json.JSONDecodeError):
+            return text
+        await cache.put(key, text)
+    return text
+
+
 # Pydantic models for structured outputs
 class CandidateProfile(BaseModel):
     name: str
@@ -53,9 +143,12 @@ class EmailPitch(BaseModel):
 class SourcingAgent:
     """Generates realistic mock candidate profiles."""
 
-    async def generate_candidates(self, job: Dict[str, Any], count: int = 25) -> List[Dict[str, Any]]:
-        """Generate diverse candidate profiles for a job."""
-        prompt = f"""Generate {count} realistic candidate profiles for this job:
+    def __init__(self, streaming: bool = SOURCING_STREAMING):
+        self.streaming = streaming
+
+    def _build_prompt(self, job: Dict[str, Any], count: int) -> str:
+        """Build the sourcing prompt for `count` profiles."""
+        return f"""Generate {count} realistic candidate profiles for this job:
 
 Job Title: {job['title']}
 Company: {job['company']} ({job['company_website']})
@@ -83,52 +176,113 @@ These are mock URLs for demo purposes but should look authentic.
 
 Return a JSON array with candidate profiles."""
 
-        try:
-            # Define schema for list of candidates
-            list_schema = {
-                'type': 'array',
-                'items': {
-                    'type': 'object',
-                    'properties': {
-                        'name': {'type': 'string'},
-                        'current_role': {'type': 'string'},
-                        'current_company': {'type': 'string'},
-                        'years_experience': {'type': 'integer'},
-                        'skills': {'type': 'array', 'items': {'type': 'string'}},
-                        'location': {'type': 'string'},
-                        'email': {'type': 'string'},
-                        'linkedin_summary': {'type': 'string'},
-                        'linkedin_url': {'type': 'string'},
-                        'company_website': {'type': 'string'}
-                    },
-                    'required': ['name', 'current_role', 'current_company', 'years_experience',
-                               'skills', 'location', 'email', 'linkedin_summary', 'linkedin_url', 'company_website']
-                }
+    def _build_config(self) -> types.GenerateContentConfig:
+        """Structured-output config constraining the response to a profile list."""
+        # Define schema for list of candidates
+        list_schema = {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string'},
+                    'current_role': {'type': 'string'},
+                    'current_company': {'type': 'string'},
+                    'years_experience': {'type': 'integer'},
+                    'skills': {'type': 'array', 'items': {'type': 'string'}},
+                    'location': {'type': 'string'},
+                    'email': {'type': 'string'},
+                    'linkedin_summary': {'type': 'string'},
+                    'linkedin_url': {'type': 'string'},
+                    'company_website': {'type': 'string'}
+                },
+                'required': ['name', 'current_role', 'current_company', 'years_experience',
+                           'skills', 'location', 'email', 'linkedin_summary', 'linkedin_url', 'company_website']
             }
+        }
+        return types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_json_schema=list_schema
+        )
 
-            response = await get_client().aio.models.generate_content(
-                model='gemini-3-flash-preview',
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type='application/json',
-                    response_json_schema=list_schema
-                )
-            )
+    async def generate_candidates(self, job: Dict[str, Any], count: int = 25) -> List[Dict[str, Any]]:
+        """Generate diverse candidate profiles for a job."""
+        prompt = self._build_prompt(job, count)
 
-            candidates = json.loads(response.text)
+        try:
+            text = await generate_text(prompt, self._build_config(),
+                                       priority=PRIORITY_SOURCING, job_id=job.get('id'), agent="sourcing")
+
+            candidates = json.loads(text)
             return candidates
         except json.JSONDecodeError as e:
+            LLM_PARSE_FAILURES.labels(agent="sourcing").inc()
             print(f"Failed to parse JSON from Gemini: {e}")
-            print(f"Response: {response.text}")
+            print(f"Response was {_response_excerpt(text)}")
             raise
         except Exception as e:
             print(f"Error generating candidates: {e}")
             raise
 
+    async def stream_candidates(self, job: Dict[str, Any], count: int = 25) -> AsyncIterator[Dict[str, Any]]:
+        """Yield candidate profiles one by one as soon as each is generated.
+
+        In streaming mode the response is parsed incrementally and every
+        profile is validated against CandidateProfile before it is yielded;
+        invalid profiles are logged and skipped. Otherwise this falls back
+        to generate_candidates.
+        """
+        if not self.streaming:
+            for candidate in await self.generate_candidates(job, count=count):
+                yield candidate
+            return
+
+        parser = JsonArrayStreamParser()
+        prompt = self._build_prompt(job, count)
+        config = self._build_config()
+        LLM_PROMPT_BYTES.labels(agent="sourcing").observe(len(prompt))
+        started = time.perf_counter()
+        received = 0
+        usage = None
+        try:
+            stream = scheduler.stream(
+                lambda: get_client().aio.models.generate_content_stream(
+                    model=MODEL,
+                    contents=prompt,
+                    config=config
+                ),
+                priority=PRIORITY_SOURCING,
+                job_id=job.get('id'),
+                tokens=estimate_tokens(prompt, config)
+            )
+            async for chunk in stream:
+                received += len(chunk.text or "")
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                for profile in parser.feed(chunk.text or ""):
+                    try:
+                        yield CandidateProfile.model_validate(profile).model_dump()
+                    except ValidationError as e:
+                        LLM_PARSE_FAILURES.labels(agent="sourcing").inc()
+                        print(f"Skipping invalid candidate profile from Gemini: {e}")
+            if not parser.finished:
+                raise json.JSONDecodeError("Candidate stream ended before the array closed", "", 0)
+            _record_call("sourcing", started, response_chars=received, usage=usage)
+        except json.JSONDecodeError as e:
+            _record_call("sourcing", started, error=e)
+            LLM_PARSE_FAILURES.labels(agent="sourcing").inc()
+            print(f"Failed to parse JSON stream from Gemini: {e}")
+            raise
+        except Exception as e:
+            _record_call("sourcing", started, error=e)
+            print(f"Error streaming candidates: {e}")
+            raise
+
 
 class MatchingAgent:
     """Ranks candidates with AI-powered fit scoring."""
 
+    def __init__(self, cache: Optional[LLMCache] = None):
+        self.cache = cache
+
     async def rank_candidates(self, job: Dict[str, Any], candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Score and rank all candidates for a job."""
         # Format candidates for prompt (with 0-based indices)
@@ -188,16 +342,18 @@ Return a JSON array ordered by score (highest first)."""
                 }
             }
 
-            response = await get_client().aio.models.generate_content(
-                model='gemini-3-flash-preview',
-                contents=prompt,
-                config=types.GenerateContentConfig(
+            text = await generate_text(
+                prompt,
+                types.GenerateContentConfig(
                     response_mime_type='application/json',
                     response_json_schema=list_schema
-                )
+                ),
+                cache=self.cache,
+                job_id=job.get('id'),
+                agent="matching"
             )
 
-            matches = json.loads(response.text)
+            matches = json.loads(text)
 
             # Add rank position
             for i, match in enumerate(matches):
@@ -205,8 +361,9 @@ Return a JSON array ordered by score (highest first)."""
 
             return matches
         except json.JSONDecodeError as e:
+            LLM_PARSE_FAILURES.labels(agent="matching").inc()
             print(f"Failed to parse JSON from Gemini: {e}")
-            print(f"Response: {response.text}")
+            print(f"Response was {_response_excerpt(text)}")
             raise
         except Exception as e:
             print(f"Error ranking candidates: {e}")
@@ -216,9 +373,15 @@ Return a JSON array ordered by score (highest first)."""
 class PitchWriterAgent:
     """Creates personalized outreach messages."""
 
+    def __init__(self, cache: Optional[LLMCache] = None):
+        self.cache = cache
+
     async def create_pitch(self, job: Dict[str, Any], candidate: Dict[str, Any],
-                    match: Dict[str, Any]) -> Dict[str, str]:
-        """Generate personalized outreach email."""
+                    match: Dict[str, Any], priority: int = PRIORITY_PIPELINE) -> Dict[str, str]:
+        """Generate personalized outreach email.
+
+        Pass PRIORITY_INTERACTIVE when a reviewer is waiting on the result.
+        """
         skills = json.loads(candidate['skills']) if isinstance(candidate['skills'], str) else candidate['skills']
         highlights = json.loads(match['key_highlights']) if isinstance(match['key_highlights'], str) else match['key_highlights']
 
@@ -259,20 +422,24 @@ Tone: Professional but warm. Adjust formality based on experience level.
 Return a JSON object with 'subject' and 'body' fields."""
 
         try:
-            response = await get_client().aio.models.generate_content(
-                model='gemini-3-flash-preview',
-                contents=prompt,
-                config=types.GenerateContentConfig(
+            text = await generate_text(
+                prompt,
+                types.GenerateContentConfig(
                     response_mime_type='application/json',
                     response_schema=EmailPitch
-                )
+                ),
+                cache=self.cache,
+                priority=priority,
+                job_id=job.get('id'),
+                agent="pitch"
             )
 
-            pitch = json.loads(response.text)
+            pitch = json.loads(text)
             return pitch
         except json.JSONDecodeError as e:
+            LLM_PARSE_FAILURES.labels(agent="pitch").inc()
             print(f"Failed to parse JSON from Gemini: {e}")
-            print(f"Response: {response.text}")
+            print(f"Response was {_response_excerpt(text)}")
             raise
         except Exception as e:
             print(f"Error creating pitch: {e}")
@@ -0,0 +1,128 @@
+"""Adaptive batch sizes for the sourcing and matching LLM calls.
+
+Each stage has a BatchSizer that learns from the calls it has made: how
+long a call takes (a fixed overhead plus a per-candidate cost, fitted by
+exponentially weighted least squares), how many output tokens a
+candidate costs, and how often responses fail to parse. It then picks:
+
+  first batch  the largest size predicted to finish within half of
+               PIPELINE_TARGET_TTFC_SECONDS (sourcing and matching each
+               get half), so the first card shows up quickly
+  later        the largest size predicted to finish within
+               PIPELINE_MAX_BATCH_SECONDS and to fit, with headroom, in
+               PIPELINE_MAX_OUTPUT_TOKENS, spreading the prompt overhead
+               over as many candidates as possible
+
+After the first batch, a matching batch that is short of its size waits
+up to one call's fitted overhead for more candidates to arrive.
+
+A parse failure halves a ceiling on the size and each clean call raises
+it by one, so sizes back off quickly where long outputs get truncated
+and recover slowly. Until the model has a few calls to go on, later
+batches use PIPELINE_BATCH_SIZE and first batches half of it.
+PIPELINE_ADAPTIVE_BATCHING=0 pins every batch to PIPELINE_BATCH_SIZE.
+"""
+
+import math
+import os
+from typing import Optional, Tuple
+
+from metrics import Gauge, Histogram, SIZE_BUCKETS
+
+BATCH_SIZE = int(os.environ.get("PIPELINE_BATCH_SIZE", "5"))
+ADAPTIVE = os.environ.get("PIPELINE_ADAPTIVE_BATCHING", "1") != "0"
+TARGET_TTFC_SECONDS = float(os.environ.get("PIPELINE_TARGET_TTFC_SECONDS", "6"))
+MAX_BATCH_SECONDS = float(os.environ.get("PIPELINE_MAX_BATCH_SECONDS", "20"))
+MAX_BATCH_SIZE = int(os.environ.get("PIPELINE_MAX_BATCH_SIZE", "15"))
+MAX_OUTPUT_TOKENS = int(os.environ.get("PIPELINE_MAX_OUTPUT_TOKENS", "8192"))
+MAX_LINGER_SECONDS = float(os.environ.get("PIPELINE_MAX_LINGER_SECONDS", "2"))
+# Predicted output is kept this far under the limit: candidates vary in length
+TOKEN_HEADROOM = 0.75
+# Weight an observation keeps after each newer one
+DECAY = 0.8
+MIN_OBSERVATIONS = 3
+
+BATCH_SIZE_CHOSEN = Histogram("pipeline_batch_size", "Batch sizes picked by the adaptive controller",
+                              ["stage", "phase"], buckets=SIZE_BUCKETS)
+BATCH_MODEL = Gauge("pipeline_batch_model", "What the adaptive batch controller has learned, per stage",
+                    ["stage", "param"])
+
+
+class BatchSizer:
+    """Picks batch sizes for one stage from the cost of its recent calls."""
+
+    def __init__(self, stage: str, initial: int = BATCH_SIZE, max_size: int = MAX_BATCH_SIZE,
+                 target_ttfc: float = TARGET_TTFC_SECONDS, max_batch_seconds: float = MAX_BATCH_SECONDS,
+                 max_output_tokens: int = MAX_OUTPUT_TOKENS, adaptive: bool = ADAPTIVE):
+        self.stage = stage
+        self.initial = initial
+        self.max_size = max(initial, max_size) if adaptive else initial
+        self.target_ttfc = target_ttfc
+        self.max_batch_seconds = max_batch_seconds
+        self.max_output_tokens = max_output_tokens
+        self.adaptive = adaptive
+        self.ceiling = self.max_size
+        self.tokens_per_candidate: Optional[float] = None
+        self.failure_rate = 0.0
+        self.observations = 0
+        # Decayed sums of weight, n, seconds, n*n and n*seconds
+        self._sums = [0.0] * 5
+        for param, read in (("overhead_seconds", lambda: self.model()[0]),
+                            ("seconds_per_candidate", lambda: self.model()[1]),
+                            ("tokens_per_candidate", lambda: self.tokens_per_candidate or 0),
+                            ("parse_failure_rate", lambda: self.failure_rate),
+                            ("ceiling", lambda: self.ceiling)):
+            BATCH_MODEL.labels(stage=stage, param=param).set_function(read)
+
+    def model(self) -> Tuple[float, float]:
+        """(overhead seconds, seconds per candidate); zeros until it can be fitted."""
+        w, n, y, nn, ny = self._sums
+        spread = w * nn - n * n
+        if self.observations < MIN_OBSERVATIONS or spread <= 1e-9 * w * w:
+            return 0.0, 0.0
+        per_candidate = max(0.0, (w * ny - n * y) / spread)
+        return max(0.0, (y - per_candidate * n) / w), per_candidate
+
+    def _fits(self, seconds: float) -> int:
+        overhead, per_candidate = self.model()
+        if per_candidate <= 0:
+            return self.max_size
+        return math.floor((seconds - overhead) / per_candidate)
+
+    def size(self, first: bool = False) -> int:
+        """Batch size for the next call; `first` for a run's first batch."""
+        if not self.adaptive:
+            return self.initial
+        if self.model() == (0.0, 0.0):
+            size = max(1, self.initial // 2) if first else self.initial
+        else:
+            size = self._fits(self.target_ttfc / 2 if first else self.max_batch_seconds)
+        if self.tokens_per_candidate:
+            size = min(size, math.floor(self.max_output_tokens * TOKEN_HEADROOM / self.tokens_per_candidate))
+        size = max(1, min(size, self.ceiling, self.max_size))
+        BATCH_SIZE_CHOSEN.labels(stage=self.stage, phase="first" if first else "steady").observe(size)
+        return size
+
+    def linger(self, first: bool = False) -> float:
+        """How long a short batch may wait for more candidates: up to one call's
+        fixed overhead, which is what sending them in a call of their own costs.
+        """
+        if first or not self.adaptive:
+            return 0.0
+        return min(self.model()[0], MAX_LINGER_SECONDS)
+
+    def observe(self, size: int, seconds: float, output_tokens: Optional[int] = None, failed: bool = False):
+        """Record one call: how many candidates it covered, how long it took and how it went."""
+        self.failure_rate = DECAY * self.failure_rate + (1 - DECAY) * failed
+        if failed:
+            # A truncated or garbled response says nothing reliable about latency
+            self.ceiling = max(1, size // 2)
+            return
+        self.ceiling = min(self.max_size, self.ceiling + 1)
+        self.observations += 1
+        self._sums = [DECAY * total + value for total, value in
+                      zip(self._sums, (1.0, size, seconds, size * size, size * seconds))]
+        if output_tokens and size:
+            per_candidate = output_tokens / size
+            self.tokens_per_candidate = (per_candidate if self.tokens_per_candidate is None else
+                                         DECAY * self.tokens_per_candidate + (1 - DECAY) * per_candidate)
@@ -0,0 +1,127 @@
+"""Fixed vs adaptive batch sizes, with the real agents on the fake LLM backend.
+
+Each scenario builds a fresh JobPipeline (so the controller starts cold)
+and runs several jobs back to back, reporting per job:
+
+  ttfc_s            time from run start to the first matched batch
+  total_s           whole run
+  sourcing_calls /  LLM calls made by each stage
+  matching_calls
+  parse_failures    responses that failed to parse (sourcing + matching)
+  sizes             batch sizes the sourcing and matching stages used
+
+Scenarios run with and without output truncation: with --truncate N the
+fake cuts responses off after N tokens, like a model hitting its output
+limit, which the adaptive controller has to learn from parse failures.
+
+Run from backend/:  python benchmarks/bench_batching.py [--count 25] [--jobs 3] [--truncate 1500]
+Fake LLM latency follows FAKE_LLM_LATENCY_MS / FAKE_LLM_TOKENS_PER_SECOND.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = str(Path(_tmpdir) / "batching.db")
+os.environ["LLM_BACKEND"] = "fake"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import agents  # noqa: E402
+import database  # noqa: E402
+from batching import BatchSizer  # noqa: E402
+from events import EventBus, BATCH_MATCHED  # noqa: E402
+from fake_llm import FakeClient  # noqa: E402
+from metrics import LLM_REQUEST_SECONDS, LLM_PARSE_FAILURES  # noqa: E402
+from pipeline import JobPipeline  # noqa: E402
+
+JOB = {"title": "Senior Backend Engineer", "company": "Acme", "company_website": "https://acme.com",
+       "description": "Build APIs", "required_skills": ["Python", "PostgreSQL", "AWS", "Docker"],
+       "experience_level": "Senior", "location": "Remote"}
+
+
+class RecordingSizer(BatchSizer):
+    """A BatchSizer that remembers the sizes it was asked to observe."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sizes = []
+
+    def observe(self, size, seconds, output_tokens=None, failed=False):
+        self.sizes.append(f"{size}{'!' if failed else ''}")
+        super().observe(size, seconds, output_tokens, failed)
+
+
+def calls(agent: str) -> int:
+    return sum(LLM_REQUEST_SECONDS.labels(agent=agent, outcome=outcome).count for outcome in ("ok", "error"))
+
+
+def parse_failures() -> float:
+    return sum(LLM_PARSE_FAILURES.labels(agent=agent).get() for agent in ("sourcing", "matching"))
+
+
+async def scenario(name: str, adaptive: bool, truncate: int, count: int, jobs: int) -> list:
+    agents._client = FakeClient(max_output_tokens=truncate)
+    events = EventBus()
+    pipeline = JobPipeline(agents.SourcingAgent(), agents.MatchingAgent(), agents.PitchWriterAgent(),
+                           events=events, adaptive_batching=adaptive)
+    pipeline.sourcing_sizer = RecordingSizer("sourcing", adaptive=adaptive)
+    pipeline.matching_sizer = RecordingSizer("matching", adaptive=adaptive)
+    first_match = {}
+    events.add_listener(lambda event: event.type == BATCH_MATCHED
+                        and first_match.setdefault(event.job_id, time.perf_counter()))
+
+    results = []
+    for n in range(jobs):
+        job_id = await database.create_job(**{**JOB, "company": f"Acme {name} {n}"})
+        job = await database.get_job(job_id)
+        before = (calls("sourcing"), calls("matching"), parse_failures())
+        pipeline.sourcing_sizer.sizes, pipeline.matching_sizer.sizes = [], []
+        started = time.perf_counter()
+        try:
+            await pipeline.run(job, count)
+            outcome = "done"
+        except Exception as error:
+            outcome = f"failed: {error}"
+        results.append({
+            "scenario": name, "job": n + 1, "outcome": outcome,
+            "ttfc_s": round(first_match.get(job_id, float("nan")) - started, 2),
+            "total_s": round(time.perf_counter() - started, 2),
+            "sourcing_calls": calls("sourcing") - before[0],
+            "matching_calls": calls("matching") - before[1],
+            "parse_failures": int(parse_failures() - before[2]),
+            "sizes": {"sourcing": " ".join(pipeline.sourcing_sizer.sizes),
+                      "matching": " ".join(pipeline.matching_sizer.sizes)},
+            "saved": (await database.get_job_stats(job_id))["total"],
+        })
+    return results
+
+
+async def main_async(args):
+    await database.init_db()
+    await database.open_pool()
+    for truncate in (0, args.truncate):
+        suffix = f" truncate={truncate}" if truncate else ""
+        for name, adaptive in ((f"fixed{suffix}", False), (f"adaptive{suffix}", True)):
+            for result in await scenario(name, adaptive, truncate, args.count, args.jobs):
+                print(json.dumps(result))
+    await database.close_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=25)
+    parser.add_argument("--jobs", type=int, default=3)
+    parser.add_argument("--truncate", type=int, default=1500,
+                        help="fake output limit in tokens for the truncation scenarios")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""by-status listings at 10k and 100k rows: whole list vs keyset pages.
+
+For each size, seeds a job whose candidates are all rejected and
+requests GET /api/jobs/{id}/candidates/by-status/rejected through httpx's
+ASGI transport:
+
+  legacy          the whole list as before pagination: fetchall, JSON
+                  columns parsed per row, dicts encoded by FastAPI
+  first_page      ?limit=100
+  deep_page       ?limit=100 from a cursor 90% of the way down
+  projected_page  ?limit=100&fields=id,name,current_role,score
+  streamed_10k    ?limit=10000, streamed from the database in chunks
+  full_walk       every page of 100, following X-Next-Cursor
+
+Reported: latency (median of --repeat runs; one run for legacy and
+full_walk), response bytes, and peak Python memory allocated while
+serving (tracemalloc, measured in a separate run).
+
+Run from backend/:  python benchmarks/bench_by_status.py [--sizes 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "by_status.db")
+os.environ["LLM_BACKEND"] = "fake"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+
+JOB = ("Senior Backend Engineer", "Acme", "https://acme.com", "Build APIs",
+       ["Python", "PostgreSQL", "AWS"], "Senior", "Remote")
+SKILLS = ["Python", "Go", "PostgreSQL", "AWS", "Kubernetes", "Terraform", "React", "Kafka", "Redis", "gRPC"]
+
+
+@main.app.get("/legacy/jobs/{job_id}/candidates/by-status/{status}")
+async def legacy_by_status(job_id: int, status: str):
+    """The endpoint before pagination, for comparison."""
+    async with database.connection() as db:
+        cursor = await db.execute(
+            """SELECT c.*, m.score, m.key_highlights FROM candidates c
+               JOIN matches m ON c.id = m.candidate_id
+               WHERE c.job_id = ? AND c.status = ? ORDER BY m.score DESC""",
+            (job_id, status)
+        )
+        rows = [dict(row) for row in await cursor.fetchall()]
+    candidates = []
+    for candidate_dict in rows:
+        skills = json.loads(candidate_dict['skills'])
+        key_highlights = json.loads(candidate_dict['key_highlights'])
+        candidates.append({
+            "id": candidate_dict['id'], "name": candidate_dict['name'],
+            "current_role": candidate_dict['current_role'], "current_company": candidate_dict['current_company'],
+            "years_experience": candidate_dict['years_experience'], "skills": skills,
+            "location": candidate_dict['location'], "email": candidate_dict['email'],
+            "linkedin_summary": candidate_dict['linkedin_summary'],
+            "linkedin_url": candidate_dict.get('linkedin_url'),
+            "company_website": candidate_dict.get('company_website'), "status": candidate_dict['status'],
+            "score": candidate_dict['score'], "key_highlights": key_highlights
+        })
+    return candidates
+
+
+async def seed_job(count: int) -> int:
+    rng = random.Random(count)
+    job_id = await database.create_job(*JOB)
+    for start in range(0, count, 10_000):
+        candidates = [{
+            "name": f"Candidate {i}", "current_role": "Backend Engineer", "current_company": "Initech",
+            "years_experience": rng.randint(2, 15), "skills": rng.sample(SKILLS, 6), "location": "Remote",
+            "email": f"c{job_id}-{i}@example.com",
+            "linkedin_summary": "Builds and runs backend services at scale. " * 4,
+            "linkedin_url": f"https://linkedin.com/in/c{job_id}-{i}", "company_website": "https://initech.com",
+        } for i in range(start, min(count, start + 10_000))]
+        async with database.transaction() as db:
+            ids = await database.create_candidates_bulk(job_id, candidates, db=db)
+            await database.create_matches_bulk(job_id, [
+                {"candidate_id": cid, "score": rng.randint(0, 100), "key_highlights": rng.sample(SKILLS, 3),
+                 "fit_reasoning": "Strong backend background.", "rank_position": 1}
+                for cid in ids
+            ], db=db)
+            await db.execute("UPDATE candidates SET status = 'rejected' WHERE job_id = ?", (job_id,))
+    return job_id
+
+
+async def full_walk(client, url: str) -> int:
+    total, params = 0, {"limit": 100}
+    while True:
+        response = await client.get(url, params=params)
+        total += len(response.content)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return total
+        params = {"limit": 100, "cursor": cursor}
+
+
+async def measure(request, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = await request()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    await request()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": round(statistics.median(timings) * 1000, 1), "bytes": size, "peak_mib": round(peak / 2 ** 20, 1)}
+
+
+async def run_size(client, size: int, repeat: int) -> list:
+    job_id = await seed_job(size)
+    url = f"/api/jobs/{job_id}/candidates/by-status/rejected"
+
+    async def get(path, **params):
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+        return len(response.content)
+
+    deep = (await client.get(url, params={"limit": int(size * 0.9)})).headers["x-next-cursor"]
+    total = (await client.get(url, params={"limit": 1})).headers["x-total-count"]
+    cases = {
+        "legacy": (lambda: get(f"/legacy/jobs/{job_id}/candidates/by-status/rejected"), 1),
+        "first_page": (lambda: get(url, limit=100), repeat),
+        "deep_page": (lambda: get(url, limit=100, cursor=deep), repeat),
+        "projected_page": (lambda: get(url, limit=100, fields="id,name,current_role,score"), repeat),
+        "streamed_10k": (lambda: get(url, limit=10_000), repeat),
+        "full_walk": (lambda: full_walk(client, url), 1),
+    }
+    results = []
+    for name, (request, runs) in cases.items():
+        results.append({"rows": size, "x_total_count": int(total), "case": name, **await measure(request, runs)})
+    return results
+
+
+async def run(args):
+    await database.init_db()
+    await database.open_pool()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench",
+                                 timeout=300) as client:
+        for size in args.sizes:
+            for result in await run_size(client, size, args.repeat):
+                print(json.dumps(result))
+    await database.close_pool()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,196 @@
+"""Stored card JSON vs building cards per request.
+
+Seeds one job with --candidates matched candidates, half of them
+rejected. The old endpoint code runs next to the current one for
+comparison (legacy_* below, copied from main.py before cards were
+stored). It parsed the JSON columns, rebuilt each card dict and let
+FastAPI encode it with jsonable_encoder.
+
+  serialization  CPU per response for the part after the query: a review
+                 window of 1 and of 10 cards, and the rejected list
+  endpoints      sequential requests/s through httpx's ASGI transport for
+                 GET candidates (?limit=10, re-served to one reviewer)
+                 and GET candidates/by-status/rejected, old vs current
+
+Run from backend/:  python benchmarks/bench_card_payloads.py [--candidates 1000] [--seconds 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "cards.db")
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["PITCH_PREFETCH_DEPTH"] = "0"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+
+JOB = ("Senior Backend Engineer", "Acme", "https://acme.com", "Build APIs",
+       ["Python", "PostgreSQL", "AWS"], "Senior", "Remote")
+SKILLS = ["Python", "Go", "PostgreSQL", "AWS", "Kubernetes", "Terraform", "React", "Kafka", "Redis", "gRPC"]
+
+
+def legacy_card(candidate):
+    skills = json.loads(candidate['skills']) if isinstance(candidate['skills'], str) else candidate['skills']
+    key_highlights = json.loads(candidate['key_highlights']) if isinstance(candidate['key_highlights'], str) else candidate['key_highlights']
+    return {
+        "candidate": {
+            "id": candidate['id'], "name": candidate['name'], "current_role": candidate['current_role'],
+            "current_company": candidate['current_company'], "years_experience": candidate['years_experience'],
+            "skills": skills, "location": candidate['location'], "email": candidate['email'],
+            "linkedin_summary": candidate['linkedin_summary'], "linkedin_url": candidate.get('linkedin_url'),
+            "company_website": candidate.get('company_website'), "status": candidate['status']
+        },
+        "match": {
+            "id": candidate['match_id'], "score": candidate['score'], "key_highlights": key_highlights,
+            "fit_reasoning": candidate['fit_reasoning'], "rank_position": candidate['rank_position']
+        }
+    }
+
+
+def legacy_list_item(candidate_dict):
+    skills = json.loads(candidate_dict['skills']) if isinstance(candidate_dict['skills'], str) else candidate_dict['skills']
+    key_highlights = json.loads(candidate_dict['key_highlights']) if isinstance(candidate_dict['key_highlights'], str) else candidate_dict['key_highlights']
+    return {
+        "id": candidate_dict['id'], "name": candidate_dict['name'], "current_role": candidate_dict['current_role'],
+        "current_company": candidate_dict['current_company'], "years_experience": candidate_dict['years_experience'],
+        "skills": skills, "location": candidate_dict['location'], "email": candidate_dict['email'],
+        "linkedin_summary": candidate_dict['linkedin_summary'], "linkedin_url": candidate_dict.get('linkedin_url'),
+        "company_website": candidate_dict.get('company_website'), "status": candidate_dict['status'],
+        "score": candidate_dict['score'], "key_highlights": key_highlights
+    }
+
+
+def fastapi_encode(content) -> bytes:
+    """What FastAPI does with a returned dict: jsonable_encoder, then JSONResponse."""
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+async def legacy_rows_by_status(job_id: int, status: str):
+    async with database.connection() as db:
+        cursor = await db.execute(
+            """SELECT c.*, m.score, m.key_highlights FROM candidates c
+               JOIN matches m ON c.id = m.candidate_id
+               WHERE c.job_id = ? AND c.status = ? ORDER BY m.score DESC""",
+            (job_id, status)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+@main.app.get("/legacy/jobs/{job_id}/candidates")
+async def legacy_candidates(job_id: int, reviewer_id: str = None, limit: int = 1):
+    window = await database.claim_candidates(job_id, reviewer_id=reviewer_id, limit=limit)
+    stats = await database.get_job_stats(job_id)
+    cards = [legacy_card(candidate) for candidate in window]
+    return {**cards[0], "candidates": cards, "stats": stats}
+
+
+@main.app.get("/legacy/jobs/{job_id}/candidates/by-status/{status}")
+async def legacy_by_status(job_id: int, status: str):
+    return [legacy_list_item(row) for row in await legacy_rows_by_status(job_id, status)]
+
+
+async def seed_job(count: int) -> int:
+    rng = random.Random(0)
+    job_id = await database.create_job(*JOB)
+    candidates = [{
+        "name": f"Candidate {i}", "current_role": "Backend Engineer", "current_company": "Initech",
+        "years_experience": rng.randint(2, 15), "skills": rng.sample(SKILLS, 6), "location": "Remote",
+        "email": f"c{i}@example.com", "linkedin_summary": "Builds and runs backend services at scale. " * 4,
+        "linkedin_url": f"https://linkedin.com/in/c{i}", "company_website": "https://initech.com",
+    } for i in range(count)]
+    async with database.transaction() as db:
+        ids = await database.create_candidates_bulk(job_id, candidates, db=db)
+        await database.create_matches_bulk(job_id, [
+            {"candidate_id": cid, "score": rng.randint(40, 99), "key_highlights": rng.sample(SKILLS, 3),
+             "fit_reasoning": "Strong backend background with the required stack. " * 2, "rank_position": 1}
+            for cid in ids
+        ], db=db)
+        await db.executemany("UPDATE candidates SET status = 'rejected' WHERE id = ?", [(cid,) for cid in ids[::2]])
+    return job_id
+
+
+def cpu_us(fn, seconds: float) -> float:
+    calls, started = 0, time.process_time()
+    while time.process_time() - started < seconds:
+        fn()
+        calls += 1
+    return (time.process_time() - started) / calls * 1e6
+
+
+async def serialization(job_id: int, seconds: float) -> list:
+    window = await database.claim_candidates(job_id, reviewer_id="cpu", limit=10)
+    legacy_rows = await legacy_rows_by_status(job_id, "rejected")
+    items = await database.list_candidates_by_status(job_id, "rejected")
+    stats = await database.get_job_stats(job_id)
+    cases = {
+        "window_1": (lambda: fastapi_encode({**legacy_card(window[0]), "stats": stats}),
+                     lambda: main._raw_json(main._cards(window[:1])[0], stats=stats).body),
+        "window_10": (lambda: fastapi_encode({"candidates": [legacy_card(c) for c in window], "stats": stats}),
+                      lambda: main._raw_json(candidates=main._json_array(main._cards(window)), stats=stats).body),
+        f"by_status_{len(items)}": (lambda: fastapi_encode([legacy_list_item(r) for r in legacy_rows]),
+                                    lambda: main._json_array([item.encode() for item in items])),
+    }
+    results = []
+    for name, (old, new) in cases.items():
+        assert json.loads(old()) == json.loads(new()), name
+        before, after = cpu_us(old, seconds), cpu_us(new, seconds)
+        results.append({"serialization": name, "before_us": round(before, 1), "after_us": round(after, 1),
+                        "speedup": round(before / after, 1), "bytes": len(new())})
+    return results
+
+
+async def throughput(client, job_id: int, seconds: float) -> list:
+    routes = {
+        "candidates_limit_10": (f"/legacy/jobs/{job_id}/candidates", f"/api/jobs/{job_id}/candidates",
+                                {"reviewer_id": "bench", "limit": 10}),
+        "by_status_rejected": (f"/legacy/jobs/{job_id}/candidates/by-status/rejected",
+                               f"/api/jobs/{job_id}/candidates/by-status/rejected", {}),
+    }
+    results = []
+    for name, (old, new, params) in routes.items():
+        rates = []
+        for url in (old, new):
+            requests, started = 0, time.perf_counter()
+            while time.perf_counter() - started < seconds:
+                (await client.get(url, params=params)).raise_for_status()
+                requests += 1
+            rates.append(requests / (time.perf_counter() - started))
+        results.append({"endpoint": name, "before_rps": round(rates[0], 1), "after_rps": round(rates[1], 1),
+                        "speedup": round(rates[1] / rates[0], 2)})
+    return results
+
+
+async def run(args):
+    await database.init_db()
+    await database.open_pool()
+    job_id = await seed_job(args.candidates)
+    for result in await serialization(job_id, args.seconds):
+        print(json.dumps(result))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        for result in await throughput(client, job_id, args.seconds):
+            print(json.dumps(result))
+    await database.close_pool()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=3.0, help="time spent on each measurement")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,95 @@
+"""Concurrent candidate claims: duplicates and throughput.
+
+Fires `claims` simultaneous get_next_candidate calls at one job through the
+shared pool and checks that no candidate is handed out twice. The old
+SELECT-then-UPDATE claim is run the same way for comparison. Also checks
+that an expired lease puts a card back in the queue.
+
+Run from backend/:  python benchmarks/bench_claims.py [claims]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = str(Path(_tmpdir) / "claims.db")
+os.environ.setdefault("DB_POOL_SIZE", "8")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+
+CANDIDATE = {
+    "name": "Ada", "current_role": "Engineer", "current_company": "Initech",
+    "years_experience": 5, "skills": ["Python"], "location": "Remote",
+    "email": "ada@example.com", "linkedin_summary": "Summary",
+}
+
+
+async def seed(candidates: int) -> int:
+    job_id = await database.create_job(
+        "Backend Engineer", "Acme", "https://acme.com", "Build APIs", ["Python"], "Senior", "Remote"
+    )
+    async with database.transaction() as db:
+        ids = await database.create_candidates_bulk(job_id, [CANDIDATE] * candidates, db=db)
+        await database.create_matches_bulk(job_id, [
+            {"candidate_id": c_id, "score": i % 100, "key_highlights": [], "fit_reasoning": "", "rank_position": 1}
+            for i, c_id in enumerate(ids)
+        ], db=db)
+    return job_id
+
+
+async def legacy_claim(job_id: int):
+    """The pre-lease claim: SELECT the next card, then UPDATE it separately."""
+    async with database.connection() as db:
+        cursor = await db.execute(
+            """SELECT c.id FROM candidates c JOIN matches m ON c.id = m.candidate_id
+               WHERE c.job_id = ? AND c.status = 'pending'
+               ORDER BY c.rank_score DESC, c.id ASC LIMIT 1""",
+            (job_id,)
+        )
+        row = await cursor.fetchone()
+    if row is None:
+        return None
+    async with database.connection() as db:
+        await db.execute("UPDATE candidates SET status = 'viewed' WHERE id = ?", (row['id'],))
+        await db.commit()
+    return {"id": row['id']}
+
+
+async def run(label: str, claim, claims: int) -> bool:
+    job_id = await seed(claims)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(claim(job_id, i) for i in range(claims)))
+    elapsed = time.perf_counter() - start
+    ids = [r["id"] for r in results if r]
+    duplicates = len(ids) - len(set(ids))
+    print(f"{label:<20} claims={claims} served={len(ids)} duplicates={duplicates} "
+          f"throughput={claims / elapsed:,.0f} claims/s")
+    return duplicates == 0
+
+
+async def check_lease_expiry() -> bool:
+    job_id = await seed(1)
+    first = await database.get_next_candidate(job_id, reviewer_id="a", lease_seconds=-1)
+    again = await database.get_next_candidate(job_id, reviewer_id="b")
+    held = await database.get_next_candidate(job_id, reviewer_id="c")
+    ok = first["id"] == again["id"] and held is None
+    print(f"expired lease reclaimed: {ok}")
+    return ok
+
+
+async def main(claims: int) -> int:
+    await database.init_db()
+    ok = await run("atomic claim", lambda job_id, i: database.get_next_candidate(job_id, f"r{i}"), claims)
+    await run("select-then-update", lambda job_id, i: legacy_claim(job_id), claims)
+    ok = await check_lease_expiry() and ok
+    await database.close_pool()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)))
@@ -0,0 +1,113 @@
+"""Benchmark per-request DB latency: connection-per-call vs the shared pool.
+
+Replays the queries behind one swipe (get_candidate, update_candidate_status,
+get_job_stats, get_next_candidate) against a temporary database.
+
+Run from backend/:  python benchmarks/bench_db_pool.py [swipes]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = str(Path(_tmpdir) / "bench.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiosqlite  # noqa: E402
+import database  # noqa: E402
+
+
+async def seed(candidates: int) -> int:
+    """Create one job with `candidates` matched candidates."""
+    job_id = await database.create_job(
+        "Backend Engineer", "Acme", "https://acme.com", "Build APIs",
+        ["Python", "SQL"], "Senior", "Remote"
+    )
+    async with database.transaction() as db:
+        ids = await database.create_candidates_bulk(job_id, [{
+            "name": f"Candidate {i}", "current_role": "Engineer", "current_company": "Initech",
+            "years_experience": 5, "skills": ["Python"], "location": "Remote",
+            "email": f"c{job_id}-{i}@example.com", "linkedin_summary": "Summary",
+        } for i in range(candidates)], db=db)
+        await database.create_matches_bulk(job_id, [
+            {"candidate_id": cid, "score": 50 + i % 50, "key_highlights": ["Python"],
+             "fit_reasoning": "Fit", "rank_position": i + 1}
+            for i, cid in enumerate(ids)
+        ], db=db)
+    return job_id
+
+
+async def legacy_swipe(job_id: int, candidate_id: int):
+    """One swipe using a fresh connection per query (the old behaviour)."""
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        await (await db.execute("SELECT * FROM candidates WHERE id = ?", (candidate_id,))).fetchone()
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        await db.execute("UPDATE candidates SET status = ? WHERE id = ?", ("rejected", candidate_id))
+        await db.commit()
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        await (await db.execute(
+            "SELECT COUNT(*), SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) FROM candidates WHERE job_id = ?",
+            (job_id,)
+        )).fetchone()
+    async with aiosqlite.connect(database.DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        row = await (await db.execute(
+            """SELECT c.id FROM candidates c JOIN matches m ON c.id = m.candidate_id
+               WHERE c.job_id = ? AND c.status = 'pending' ORDER BY m.rank_position ASC LIMIT 1""",
+            (job_id,)
+        )).fetchone()
+        if row:
+            await db.execute("UPDATE candidates SET status = 'viewed' WHERE id = ?", (row['id'],))
+            await db.commit()
+        return row['id'] if row else None
+
+
+async def pooled_swipe(job_id: int, candidate_id: int):
+    """One swipe through the pooled database helpers."""
+    await database.get_candidate(candidate_id)
+    await database.update_candidate_status(candidate_id, "rejected")
+    await database.get_job_stats(job_id)
+    nxt = await database.get_next_candidate(job_id)
+    return nxt['id'] if nxt else None
+
+
+async def run(label: str, swipe, job_id: int, swipes: int) -> dict:
+    current = (await database.get_next_candidate(job_id))['id']
+    timings = []
+    for _ in range(swipes):
+        start = time.perf_counter()
+        current = await swipe(job_id, current)
+        timings.append((time.perf_counter() - start) * 1000)
+        if current is None:
+            break
+    timings.sort()
+    result = {
+        "label": label,
+        "swipes": len(timings),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+    print(result)
+    return result
+
+
+async def main(swipes: int):
+    await database.init_db()
+    legacy_job = await seed(swipes + 1)
+    pooled_job = await seed(swipes + 1)
+
+    legacy = await run("connection-per-call", legacy_swipe, legacy_job, swipes)
+    pooled = await run("pooled", pooled_swipe, pooled_job, swipes)
+    print(f"Speedup (mean): {legacy['mean_ms'] / pooled['mean_ms']:.1f}x")
+    await database.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
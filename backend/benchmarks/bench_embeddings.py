@@ -0,0 +1,156 @@
+"""Candidate vector index: search latency and recall at 100k and 1M profiles.
+
+Builds a synthetic corpus of profiles drawn from role families (each with
+its own titles and skill pool, plus off-family noise skills), embeds it
+with embeddings.embed_candidates, and queries it with jobs from the same
+families. For brute force and IVF at several nprobe values it reports:
+
+  p50_ms / p99_ms   per-query search latency
+  recall_at_10      share of the exact (brute-force) top 10 IVF also returns
+  family_at_10      share of the top 10 from the query job's role family
+                    (how useful the neighbours are for seeding)
+
+plus embedding throughput, IVF training time and index memory.
+
+Run from backend/:  python benchmarks/bench_embeddings.py [--sizes 100000 1000000] [--queries 200]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from embeddings import EMBEDDING_DIM, VectorIndex, embed_candidates, embed_job  # noqa: E402
+
+FAMILIES = {
+    "backend": (["Backend Engineer", "Software Engineer", "API Developer", "Platform Engineer"],
+                ["Python", "Go", "Java", "PostgreSQL", "Redis", "Kafka", "Docker", "AWS", "gRPC", "Django"]),
+    "frontend": (["Frontend Engineer", "UI Developer", "Web Developer", "React Developer"],
+                 ["React", "TypeScript", "JavaScript", "CSS", "HTML", "GraphQL", "Next.js", "Webpack", "Figma"]),
+    "data": (["Data Engineer", "Analytics Engineer", "Data Analyst", "BI Developer"],
+             ["SQL", "Spark", "Airflow", "dbt", "Snowflake", "Tableau", "Excel", "Python", "BigQuery"]),
+    "ml": (["Machine Learning Engineer", "Data Scientist", "Research Engineer", "AI Engineer"],
+           ["PyTorch", "TensorFlow", "Python", "Kubernetes", "MLflow", "NumPy", "scikit-learn", "CUDA"]),
+    "mobile": (["iOS Engineer", "Android Engineer", "Mobile Developer", "Flutter Developer"],
+               ["Swift", "Kotlin", "Objective-C", "Flutter", "Dart", "React Native", "Xcode", "Firebase"]),
+    "devops": (["DevOps Engineer", "Site Reliability Engineer", "Cloud Engineer", "Infrastructure Engineer"],
+               ["Terraform", "Kubernetes", "AWS", "GCP", "Prometheus", "Ansible", "Linux", "Docker", "Bash"]),
+    "security": (["Security Engineer", "Penetration Tester", "Security Analyst", "AppSec Engineer"],
+                 ["Burp Suite", "OWASP", "SIEM", "Python", "Linux", "Cryptography", "IAM", "Splunk"]),
+    "design": (["Product Designer", "UX Designer", "UI Designer", "Design Lead"],
+               ["Figma", "Sketch", "User Research", "Prototyping", "Design Systems", "Illustrator"]),
+    "product": (["Product Manager", "Technical Product Manager", "Product Owner", "Group PM"],
+                ["Roadmapping", "A/B Testing", "SQL", "Jira", "Analytics", "Stakeholder Management"]),
+    "sales": (["Account Executive", "Sales Engineer", "Solutions Consultant", "SDR"],
+              ["Salesforce", "HubSpot", "Negotiation", "Cold Calling", "CRM", "Demos", "Pipeline Management"]),
+}
+SENIORITY = ["Junior", "", "Senior", "Staff", "Lead"]
+ALL_SKILLS = sorted({skill for _, skills in FAMILIES.values() for skill in skills})
+SUMMARY_WORDS = ("built scaled shipped led designed migrated owned improved launched maintained "
+                 "systems products services pipelines platforms customers users revenue reliability").split()
+NPROBES = (8, 16, 32)
+
+
+def profile(rng: random.Random, family: str) -> dict:
+    titles, skills = FAMILIES[family]
+    chosen = rng.sample(skills, rng.randint(3, min(6, len(skills)))) + rng.sample(ALL_SKILLS, rng.randint(0, 2))
+    title = f"{rng.choice(SENIORITY)} {rng.choice(titles)}".strip()
+    return {"current_role": title, "skills": chosen,
+            "linkedin_summary": f"{title} who " + " ".join(rng.choices(SUMMARY_WORDS, k=12))}
+
+
+def job(rng: random.Random, family: str) -> dict:
+    titles, skills = FAMILIES[family]
+    return {"title": f"{rng.choice(SENIORITY)} {rng.choice(titles)}".strip(),
+            "required_skills": rng.sample(skills, 4),
+            "description": " ".join(rng.choices(SUMMARY_WORDS, k=20))}
+
+
+def build(size: int, seed: int = 0):
+    """Index of `size` profiles (in 10 fake earlier jobs per family) and their family labels."""
+    rng = random.Random(seed)
+    names = list(FAMILIES)
+    index = VectorIndex(EMBEDDING_DIM)
+    families = np.zeros(size, dtype=np.int16)
+    embed_seconds = 0.0
+    for start in range(0, size, 50_000):
+        n = min(50_000, size - start)
+        labels = [rng.randrange(len(names)) for _ in range(n)]
+        profiles = [profile(rng, names[label]) for label in labels]
+        began = time.perf_counter()
+        vectors = embed_candidates(profiles)
+        embed_seconds += time.perf_counter() - began
+        index.add(range(start, start + n), [label * 10 + rng.randrange(10) for label in labels], vectors)
+        families[start:start + n] = labels
+    return index, families, embed_seconds
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def run(size: int, queries: int) -> list:
+    index, families, embed_seconds = build(size)
+    rng = random.Random(1)
+    names = list(FAMILIES)
+    labels = [rng.randrange(len(names)) for _ in range(queries)]
+    vectors = [embed_job(job(rng, names[label])) for label in labels]
+    print(f"size={size}: embedded at {size / embed_seconds:,.0f} profiles/s, "
+          f"index memory {index._vectors[:index.size].nbytes / 2**20:.0f} MiB vectors "
+          f"+ {(index._ids[:index.size].nbytes + index._jobs[:index.size].nbytes) / 2**20:.0f} MiB ids",
+          file=sys.stderr)
+
+    results = []
+    exact = []
+    timings = []
+    family_hits = []
+    for label, query in zip(labels, vectors):
+        began = time.perf_counter()
+        hits = index.search(query, 10)
+        timings.append(time.perf_counter() - began)
+        exact.append({hit[0] for hit in hits})
+        family_hits.append(np.mean([families[hit[0]] == label for hit in hits]))
+    results.append({"size": size, "mode": "brute_force", "p50_ms": round(percentile(timings, 50), 2),
+                    "p99_ms": round(percentile(timings, 99), 2), "recall_at_10": 1.0,
+                    "family_at_10": round(float(np.mean(family_hits)), 3)})
+
+    nlist = int(math.sqrt(size))
+    began = time.perf_counter()
+    index.train(nlist)
+    train_seconds = time.perf_counter() - began
+    for nprobe in NPROBES:
+        timings, recall, family_hits = [], [], []
+        for label, query, truth in zip(labels, vectors, exact):
+            began = time.perf_counter()
+            hits = index.search(query, 10, nprobe=nprobe)
+            timings.append(time.perf_counter() - began)
+            recall.append(len(truth & {hit[0] for hit in hits}) / len(truth))
+            family_hits.append(np.mean([families[hit[0]] == label for hit in hits]))
+        results.append({"size": size, "mode": f"ivf nlist={nlist} nprobe={nprobe}",
+                        "p50_ms": round(percentile(timings, 50), 2), "p99_ms": round(percentile(timings, 99), 2),
+                        "recall_at_10": round(float(np.mean(recall)), 3),
+                        "family_at_10": round(float(np.mean(family_hits)), 3),
+                        "train_s": round(train_seconds, 1)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    print(f"dim={EMBEDDING_DIM}, {args.queries} queries per configuration")
+    for size in args.sizes:
+        for result in run(size, args.queries):
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Fan-out latency and memory of the pipeline event bus.
+
+Attaches N concurrent SSE consumers (the same sse_stream generator the
+endpoint serves) to one job, publishes events, and measures the time from
+publish until every subscriber has the frame, plus memory per subscriber.
+Also checks that a reconnect with Last-Event-ID replays exactly the gap.
+
+Run from backend/:  python benchmarks/bench_events.py [subscribers ...]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from events import EventBus, sse_stream, BATCH_MATCHED  # noqa: E402
+
+EVENTS = 50
+JOB_ID = 1
+
+
+async def fan_out(subscribers: int) -> dict:
+    bus = EventBus()
+    all_received = asyncio.Event()
+    outstanding = 0
+
+    async def consume():
+        nonlocal outstanding
+        async for frame in sse_stream(bus, JOB_ID, heartbeat=60):
+            if frame.startswith("id:"):
+                outstanding -= 1
+                if outstanding == 0:
+                    all_received.set()
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(consume()) for _ in range(subscribers)]
+    await asyncio.sleep(0.05)  # let every consumer subscribe
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    latencies = []
+    for n in range(1, EVENTS + 1):
+        outstanding = subscribers
+        all_received.clear()
+        start = time.perf_counter()
+        bus.publish(JOB_ID, BATCH_MATCHED, candidates=5, stats={"total": n * 5})
+        await all_received.wait()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert bus.subscriber_count() == 0, "subscriptions leaked"
+
+    latencies.sort()
+    return {
+        "subscribers": subscribers,
+        "fanout_p50_ms": round(statistics.median(latencies), 3),
+        "fanout_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "memory_per_subscriber_kb": round(memory / subscribers / 1024, 2),
+    }
+
+
+async def check_replay() -> bool:
+    bus = EventBus()
+    for n in range(10):
+        bus.publish(JOB_ID, BATCH_MATCHED, n=n)
+    stream = sse_stream(bus, JOB_ID, last_event_id=6)
+    await anext(stream)  # retry directive
+    ids = [int((await anext(stream)).split("\n", 1)[0][4:]) for _ in range(4)]
+    await stream.aclose()
+    return ids == [7, 8, 9, 10]
+
+
+async def main(sizes):
+    for size in sizes:
+        print(await fan_out(size))
+    print(f"Last-Event-ID replay correct: {await check_replay()}")
+
+    # A 45s pipeline polled every 3s by /candidates plus /stats after each
+    # card, versus one long-lived SSE connection
+    print("Request volume while waiting on a 45s pipeline: ~15 polls vs 1 SSE connection")
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(a) for a in sys.argv[1:]] or [100, 500, 1000]))
@@ -0,0 +1,124 @@
+"""Benchmark the hot swipe queries with and without the 002 indexes.
+
+Builds a database with `candidates` rows spread over jobs of 1,000
+candidates each, times each query on the bare v1 schema, applies
+migrations/002_indexes.sql and times them again.
+
+Run from backend/:  python benchmarks/bench_indexes.py [candidates]
+"""
+
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CANDIDATES_PER_JOB = 1000
+STATUSES = ("pending", "viewed", "accepted", "rejected", "contacted")
+
+QUERIES = {
+    "next_candidate": (
+        """SELECT c.*, m.score, m.key_highlights, m.fit_reasoning, m.rank_position, m.id as match_id
+           FROM candidates c JOIN matches m ON c.id = m.candidate_id
+           WHERE c.job_id = ? AND c.status = 'pending'
+           ORDER BY m.rank_position ASC LIMIT 1""",
+        lambda job, cand: (job,),
+    ),
+    "job_stats": (
+        """SELECT COUNT(*), SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END),
+                  SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END)
+           FROM candidates WHERE job_id = ?""",
+        lambda job, cand: (job,),
+    ),
+    "by_status": (
+        """SELECT c.*, m.score, m.key_highlights
+           FROM candidates c JOIN matches m ON c.id = m.candidate_id
+           WHERE c.job_id = ? AND c.status = 'rejected'
+           ORDER BY m.score DESC""",
+        lambda job, cand: (job,),
+    ),
+    "match_by_candidate": ("SELECT * FROM matches WHERE candidate_id = ?", lambda job, cand: (cand,)),
+    "outreach_by_candidate": ("SELECT * FROM outreach WHERE candidate_id = ?", lambda job, cand: (cand,)),
+}
+
+
+def build(path: Path, total: int) -> int:
+    """Populate a v1-schema database; returns the number of jobs."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript((BACKEND_DIR / "schema.sql").read_text())
+    jobs = max(1, total // CANDIDATES_PER_JOB)
+    conn.executemany(
+        "INSERT INTO jobs (title, company, company_website, description, required_skills, experience_level, location) "
+        "VALUES ('Engineer', 'Acme', 'https://acme.com', 'd', '[]', 'Senior', 'Remote')",
+        [()] * jobs,
+    )
+    rng = random.Random(0)
+    skills = json.dumps(["Python", "SQL", "AWS"])
+    for start in range(0, total, 50_000):
+        n = min(50_000, total - start)
+        conn.executemany(
+            "INSERT INTO candidates (id, job_id, name, current_role, current_company, years_experience, skills, "
+            "location, email, linkedin_summary, status) VALUES (?, ?, 'Name', 'Engineer', 'Co', 5, ?, 'Remote', "
+            "'x@example.com', 'Summary', ?)",
+            ((start + i + 1, (start + i) % jobs + 1, skills, rng.choice(STATUSES)) for i in range(n)),
+        )
+        conn.executemany(
+            "INSERT INTO matches (job_id, candidate_id, score, key_highlights, fit_reasoning, rank_position) "
+            "VALUES (?, ?, ?, '[]', 'Fit', ?)",
+            (((start + i) % jobs + 1, start + i + 1, rng.randint(0, 100), rng.randint(1, 5)) for i in range(n)),
+        )
+        conn.executemany(
+            "INSERT INTO outreach (job_id, candidate_id, subject, body) VALUES (?, ?, 'Hi', 'Body')",
+            (((start + i) % jobs + 1, start + i + 1) for i in range(0, n, 10)),
+        )
+        conn.commit()
+    conn.close()
+    return jobs
+
+
+def time_queries(path: Path, jobs: int, total: int, iterations: int) -> dict:
+    conn = sqlite3.connect(path)
+    rng = random.Random(1)
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        timings = []
+        for _ in range(iterations):
+            args = params(rng.randint(1, jobs), rng.randint(1, total))
+            start = time.perf_counter()
+            conn.execute(sql, args).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = round(timings[len(timings) // 2], 3)
+    conn.close()
+    return results
+
+
+def main(total: int):
+    path = Path(tempfile.mkdtemp()) / "bench.db"
+    print(f"Building {total:,} candidates...")
+    start = time.perf_counter()
+    jobs = build(path, total)
+    print(f"Built in {time.perf_counter() - start:.1f}s ({jobs} jobs)")
+
+    before = time_queries(path, jobs, total, iterations=5)
+
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    conn.executescript((BACKEND_DIR / "migrations" / "002_indexes.sql").read_text())
+    conn.close()
+    print(f"Created indexes in {time.perf_counter() - start:.1f}s")
+
+    after = time_queries(path, jobs, total, iterations=200)
+
+    print(f"\n{'query':<24}{'no index p50 ms':>18}{'indexed p50 ms':>18}")
+    for name in QUERIES:
+        print(f"{name:<24}{before[name]:>18}{after[name]:>18}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,108 @@
+"""Benchmark job stats: aggregate scan vs trigger-maintained job_stats row.
+
+Builds jobs with `per_job` candidates each (with all migrations applied),
+then times the old COUNT/SUM(CASE ...) aggregate against the job_stats
+primary-key lookup. Also reports what the triggers add to bulk inserts and
+verifies the counters match the aggregate.
+
+Run from backend/:  python benchmarks/bench_job_stats.py [per_job] [jobs]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = str(Path(_tmpdir) / "stats.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+
+STATUSES = ("pending", "viewed", "accepted", "rejected", "contacted")
+
+AGGREGATE_SQL = """SELECT
+    COUNT(*) as total,
+    SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
+    SUM(CASE WHEN status = 'viewed' THEN 1 ELSE 0 END) as viewed,
+    SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END) as accepted,
+    SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END) as rejected,
+    SUM(CASE WHEN status = 'contacted' THEN 1 ELSE 0 END) as contacted
+   FROM candidates
+   WHERE job_id = ?"""
+
+LOOKUP_SQL = """SELECT total, pending, viewed, accepted, rejected, contacted
+   FROM job_stats WHERE job_id = ?"""
+
+INSERT_SQL = (
+    "INSERT INTO candidates (job_id, name, current_role, current_company, years_experience, skills, "
+    "location, email, linkedin_summary, status) VALUES (?, 'Name', 'Engineer', 'Co', 5, '[]', 'Remote', "
+    "'x@example.com', 'Summary', ?)"
+)
+
+
+def migrate(conn: sqlite3.Connection, upto: int):
+    for version, _, sql in database.load_migrations():
+        if version <= upto:
+            conn.executescript(sql)
+
+
+def insert_rows(conn: sqlite3.Connection, per_job: int, jobs: int) -> float:
+    rng = random.Random(0)
+    conn.executemany(
+        "INSERT INTO jobs (title, company, company_website, description, required_skills, experience_level, "
+        "location) VALUES ('Engineer', 'Acme', 'https://acme.com', 'd', '[]', 'Senior', 'Remote')",
+        [()] * jobs,
+    )
+    start = time.perf_counter()
+    conn.executemany(INSERT_SQL, ((j + 1, rng.choice(STATUSES)) for j in range(jobs) for _ in range(per_job)))
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def time_query(conn: sqlite3.Connection, sql: str, jobs: int, iterations: int) -> float:
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql, (i % jobs + 1,)).fetchone()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main(per_job: int, jobs: int):
+    plain = sqlite3.connect(Path(_tmpdir) / "plain.db")
+    migrate(plain, upto=4)
+    plain_insert = insert_rows(plain, per_job, jobs)
+
+    counted = sqlite3.connect(Path(_tmpdir) / "counted.db")
+    migrate(counted, upto=5)
+    counted_insert = insert_rows(counted, per_job, jobs)
+
+    rng = random.Random(1)
+    counted.executemany(
+        "UPDATE candidates SET status = ? WHERE id = ?",
+        ((rng.choice(STATUSES), rng.randint(1, per_job * jobs)) for _ in range(per_job))
+    )
+    counted.commit()
+    consistent = all(
+        counted.execute(AGGREGATE_SQL, (j,)).fetchone() == counted.execute(LOOKUP_SQL, (j,)).fetchone()
+        for j in range(1, jobs + 1)
+    )
+
+    aggregate_ms = time_query(counted, AGGREGATE_SQL, jobs, 200)
+    lookup_ms = time_query(counted, LOOKUP_SQL, jobs, 2000)
+    rows = per_job * jobs
+
+    print(f"{jobs} jobs x {per_job:,} candidates")
+    print(f"aggregate p50: {aggregate_ms:.3f} ms")
+    print(f"job_stats p50: {lookup_ms:.4f} ms ({aggregate_ms / lookup_ms:,.0f}x faster)")
+    print(f"insert {rows:,} rows: {plain_insert:.2f}s without triggers, {counted_insert:.2f}s with")
+    print(f"counters consistent after {per_job:,} status updates: {consistent}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,119 @@
+"""Hit rate and latency of the LLM response cache with a fake Gemini client.
+
+Replays a workload where some pitch/match requests repeat (re-runs of the
+same job, several reviewers accepting the same candidate), first without a
+cache and then with one, and reports Gemini calls made and mean latency.
+Then restarts the cache with an empty memory tier to show hits served from
+SQLite, and checks that the size cap evicts least recently used rows.
+
+Run from backend/:  python benchmarks/bench_llm_cache.py [--requests 400] [--repeat 0.6]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = str(Path(_tmpdir) / "llm_cache.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import agents  # noqa: E402
+import database  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+
+LLM_LATENCY_S = 0.02
+
+JOB = {
+    "id": 1, "title": "Backend Engineer", "company": "Acme", "company_website": "https://acme.com",
+    "required_skills": '["Python"]', "experience_level": "Senior", "location": "Remote",
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        await asyncio.sleep(LLM_LATENCY_S)
+        return FakeResponse(json.dumps({"subject": f"Hi {len(contents)}", "body": contents[-200:]}))
+
+
+class FakeClient:
+    def __init__(self):
+        self.models = FakeModels()
+        self.aio = self
+
+
+def workload(requests: int, repeat: float, seed: int = 0):
+    """Candidate ids to pitch; a `repeat` fraction re-uses an earlier one."""
+    rng = random.Random(seed)
+    seen = []
+    for n in range(requests):
+        if seen and rng.random() < repeat:
+            yield rng.choice(seen)
+        else:
+            seen.append(n)
+            yield n
+
+
+def candidate(n):
+    return ({"name": f"Candidate {n}", "current_role": "Engineer", "current_company": "Initech",
+             "years_experience": 5, "skills": ["Python"], "linkedin_summary": f"Summary {n}"},
+            {"score": 80, "key_highlights": ["Python"]})
+
+
+async def run(cache, ids) -> dict:
+    client = agents._client = FakeClient()
+    writer = agents.PitchWriterAgent(cache=cache)
+    start = time.perf_counter()
+    for n in ids:
+        await writer.create_pitch(JOB, *candidate(n))
+    elapsed = time.perf_counter() - start
+    return {"gemini_calls": client.models.calls, "mean_ms": round(elapsed / len(ids) * 1000, 3)}
+
+
+async def main(requests: int, repeat: float):
+    await database.init_db()
+    ids = list(workload(requests, repeat))
+
+    print({"mode": "uncached", **await run(None, ids)})
+    cache = LLMCache()
+    print({"mode": "cached", **await run(cache, ids), **cache.stats()})
+
+    # Fresh process: empty memory tier, same SQLite table
+    restarted = LLMCache()
+    result = await run(restarted, ids)
+    print({"mode": "after restart", **result, **restarted.stats()})
+
+    # Size cap: keep roughly a quarter of the rows, most recently used first
+    async with database.connection() as db:
+        cursor = await db.execute("SELECT COUNT(*), SUM(size) FROM llm_cache")
+        rows, size = await cursor.fetchone()
+    capped = LLMCache(max_bytes=size // 4)
+    await capped.evict()
+    async with database.connection() as db:
+        cursor = await db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache")
+        kept, kept_size = await cursor.fetchone()
+    print({"rows_before": rows, "rows_after_cap": kept, "bytes_after_cap": kept_size,
+           "cap_bytes": size // 4, "within_cap": kept_size <= size // 4})
+    await database.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--repeat", type=float, default=0.6, help="fraction of requests that repeat an earlier one")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.repeat))
@@ -0,0 +1,129 @@
+"""LLM scheduler behaviour against a simulated Gemini quota.
+
+Several jobs fire background sourcing/matching calls at once while a
+reviewer makes interactive pitch requests. The fake provider rejects
+requests with 429 above its own RPM and concurrency limits and fails a
+fraction of the rest with 503. Compared:
+
+  unscheduled: bare calls, as before (first error fails the caller)
+  fifo:        LLMScheduler with every call in one priority class
+  scheduled:   LLMScheduler with caps, buckets, retry and priorities
+
+Reports failed calls, provider 429s, peak concurrency and interactive
+latency (p50/max). Interactive requests are spread over the run so they
+arrive while background work is queued.
+
+Run from backend/:  python benchmarks/bench_llm_scheduler.py [--jobs 6]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from google.genai import errors  # noqa: E402
+
+from llm_scheduler import LLMScheduler, PRIORITY_INTERACTIVE, PRIORITY_PIPELINE, PRIORITY_SOURCING  # noqa: E402
+
+CALL_LATENCY_S = 0.05
+PROVIDER_RPM = 1200          # 20 requests/s
+PROVIDER_CONCURRENCY = 12
+ERROR_RATE = 0.03
+
+
+class FakeProvider:
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.peak = 0
+        self.window = []
+        self.rejected = 0
+
+    async def generate(self):
+        now = time.monotonic()
+        self.window = [t for t in self.window if now - t < 60 / PROVIDER_RPM * 20]
+        if len(self.window) >= 20 or self.in_flight >= PROVIDER_CONCURRENCY:
+            self.rejected += 1
+            raise errors.ClientError(429, {"error": {"message": "quota", "status": "RESOURCE_EXHAUSTED"}})
+        self.window.append(now)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(CALL_LATENCY_S * self.rng.uniform(0.5, 1.5))
+            if self.rng.random() < ERROR_RATE:
+                raise errors.ServerError(503, {"error": {"message": "overloaded", "status": "UNAVAILABLE"}})
+            return "ok"
+        finally:
+            self.in_flight -= 1
+
+
+async def workload(provider: FakeProvider, scheduler, jobs: int, calls_per_job: int, interactive: int,
+                   fifo: bool = False) -> dict:
+    failures = 0
+    latencies = []
+
+    async def call(priority, job_id):
+        if scheduler is None:
+            return await provider.generate()
+        return await scheduler.call(provider.generate, priority=PRIORITY_PIPELINE if fifo else priority,
+                                    job_id=job_id, tokens=2000)
+
+    async def background(job_id):
+        nonlocal failures
+
+        async def one(i):
+            nonlocal failures
+            try:
+                await call(PRIORITY_SOURCING if i % 3 == 0 else PRIORITY_PIPELINE, job_id)
+            except errors.APIError:
+                failures += 1
+        await asyncio.gather(*(one(i) for i in range(calls_per_job)))
+
+    async def reviewer():
+        nonlocal failures
+        await asyncio.sleep(0.2)
+        for _ in range(interactive):
+            start = time.perf_counter()
+            try:
+                await call(PRIORITY_INTERACTIVE, 0)
+                latencies.append((time.perf_counter() - start) * 1000)
+            except errors.APIError:
+                failures += 1
+            await asyncio.sleep(1.0)
+
+    start = time.perf_counter()
+    await asyncio.gather(reviewer(), *(background(j) for j in range(1, jobs + 1)))
+    latencies.sort()
+    return {
+        "failed_calls": failures,
+        "provider_429s": provider.rejected,
+        "peak_concurrency": provider.peak,
+        "interactive_ok": len(latencies),
+        "interactive_p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+        "interactive_max_ms": round(latencies[-1], 1) if latencies else None,
+        "total_s": round(time.perf_counter() - start, 2),
+    }
+
+
+async def main(jobs: int, calls_per_job: int, interactive: int):
+    print({"mode": "unscheduled", **await workload(FakeProvider(), None, jobs, calls_per_job, interactive)})
+    for mode in ("fifo", "scheduled"):
+        scheduler = LLMScheduler(max_concurrency=10, max_concurrency_per_job=4, requests_per_minute=1000,
+                                 tokens_per_minute=10_000_000, max_retries=6, retry_base=0.05, retry_max=1.0,
+                                 burst_seconds=1)
+        result = await workload(FakeProvider(), scheduler, jobs, calls_per_job, interactive, fifo=mode == "fifo")
+        print({"mode": mode, **result, **scheduler.stats()})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=6)
+    parser.add_argument("--calls-per-job", type=int, default=40)
+    parser.add_argument("--interactive", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.jobs, args.calls_per_job, args.interactive))
@@ -0,0 +1,136 @@
+"""Sequential loop vs staged pipeline, using stub agents with injected latency.
+
+Reports time-to-first-reviewable-candidate (first successful claim) and
+total pipeline time for 25 and 100 candidates. Latencies are modelled on
+typical Gemini round-trips, scaled by --scale to keep runs short.
+
+Run from backend/:  python benchmarks/bench_pipeline.py [--scale 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = str(Path(_tmpdir) / "pipeline.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+from pipeline import JobPipeline, PITCH_SCORE_THRESHOLD  # noqa: E402
+
+
+class StubAgents:
+    """Sourcing/matching/pitch stand-ins that sleep like the real LLM calls."""
+
+    def __init__(self, scale: float, seed: int = 0):
+        self.scale = scale
+        self.rng = random.Random(seed)
+
+    async def _latency(self, base: float, per_item: float = 0.0, items: int = 0):
+        await asyncio.sleep((base + per_item * items) * self.rng.uniform(0.8, 1.2) * self.scale)
+
+    async def generate_candidates(self, job, count=5):
+        await self._latency(2.0, 1.2, count)
+        return self._profiles(count)
+
+    def _profiles(self, count):
+        profiles = []
+        for _ in range(count):
+            # Unique contact details, or the dedup index would drop them
+            tag = f"{self.rng.random():.9f}"[2:]
+            profiles.append({
+                "name": f"Candidate {tag}", "current_role": "Engineer",
+                "current_company": "Initech", "years_experience": self.rng.randint(1, 15),
+                "skills": ["Python", "SQL"], "location": "Remote", "email": f"c{tag}@example.com",
+                "linkedin_summary": "Summary", "linkedin_url": f"https://linkedin.com/in/c{tag}",
+                "company_website": "https://initech.com",
+            })
+        return profiles
+
+    async def stream_candidates(self, job, count=5):
+        await self._latency(2.0)
+        for candidate in self._profiles(count):
+            await self._latency(0, 1.2, 1)
+            yield candidate
+
+    async def rank_candidates(self, job, candidates):
+        await self._latency(2.0, 0.8, len(candidates))
+        matches = [{
+            "candidate_index": i, "score": self.rng.randint(30, 99),
+            "key_highlights": ["Python"], "fit_reasoning": "Fit",
+        } for i in range(len(candidates))]
+        matches.sort(key=lambda m: -m["score"])
+        for i, m in enumerate(matches):
+            m["rank_position"] = i + 1
+        return matches
+
+    async def create_pitch(self, job, candidate, match):
+        await self._latency(3.0)
+        return {"subject": "Hello", "body": "..."}
+
+
+async def sequential_pipeline(job, count, agents, batch_size=5):
+    """The pre-staging loop: source, wait, match, wait, pitch, wait, repeat."""
+    processed = 0
+    while processed < count:
+        candidates = await agents.generate_candidates(job, count=min(batch_size, count - processed))
+        matches = await agents.rank_candidates(job, candidates)
+        async with database.transaction() as db:
+            ids = await database.create_candidates_bulk(job["id"], candidates, db=db)
+            await database.create_matches_bulk(
+                job["id"], [{**m, "candidate_id": ids[m["candidate_index"]]} for m in matches], db=db
+            )
+        top = [m for m in matches if m["score"] >= PITCH_SCORE_THRESHOLD]
+        pitches = await asyncio.gather(*(agents.create_pitch(job, candidates[m["candidate_index"]], m) for m in top))
+        await database.create_outreach_bulk(job["id"], [
+            {"candidate_id": ids[m["candidate_index"]], **p, "delivery_status": "generated"}
+            for m, p in zip(top, pitches)
+        ])
+        processed += len(candidates)
+        await asyncio.sleep(0.1)
+
+
+async def measure(label: str, count: int, run) -> dict:
+    job_id = await database.create_job(
+        "Backend Engineer", "Acme", "https://acme.com", "Build APIs", ["Python"], "Senior", "Remote"
+    )
+    job = await database.get_job(job_id)
+    start = time.perf_counter()
+    task = asyncio.create_task(run(job, count))
+
+    first = None
+    while first is None and not task.done():
+        if await database.get_next_candidate(job_id, reviewer_id="bench"):
+            first = time.perf_counter() - start
+        else:
+            await asyncio.sleep(0.005)
+    await task
+    total = time.perf_counter() - start
+    stats = await database.get_job_stats(job_id)
+    result = {"label": label, "count": count, "candidates": stats["total"],
+              "first_candidate_s": round(first or total, 3), "total_s": round(total, 3)}
+    print(result)
+    return result
+
+
+async def main(scale: float):
+    await database.init_db()
+    for count in (25, 100):
+        agents = StubAgents(scale)
+        pipeline = JobPipeline(agents, agents, agents)
+        seq = await measure("sequential", count, lambda job, n: sequential_pipeline(job, n, StubAgents(scale)))
+        staged = await measure("staged", count, pipeline.run)
+        print(f"  count={count}: first candidate {seq['first_candidate_s'] / staged['first_candidate_s']:.1f}x, "
+              f"total {seq['total_s'] / staged['total_s']:.1f}x faster\n")
+    await database.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=0.1, help="multiplier on modelled LLM latency")
+    asyncio.run(main(parser.parse_args().scale))
@@ -0,0 +1,149 @@
+"""Pitch prefetching vs eager and on-demand pitches, through the swipe endpoints.
+
+Each scenario seeds a fresh job with matched candidates (scores 40-99, no
+pitches) and has one reviewer swipe through it over httpx's ASGI
+transport: claim a card, read it for a random dwell time, then accept
+(score >= 60, with probability --accept-rate) or reject. The accept/reject
+sequence is the same in every scenario. Scenarios:
+
+  on_demand    no pitches ahead of time (PITCH_PREFETCH_DEPTH=0)
+  eager        a pitch for every match >= 75 written before review starts,
+               as the pipeline's pitch stage does
+  prefetch_K   pitches follow the review cursor, K cards ahead
+
+Reported per scenario: accept outcomes (hit / in_flight / miss), prefetch
+hit rate (hit + in_flight over accepts), accept latency p50/p95, pitch LLM
+calls, and wasted pitches (written for candidates who were not accepted).
+
+Run from backend/:  python benchmarks/bench_prefetch.py [--cards 30] [--dwell 2.0] [--depths 1 3 5]
+Pitch latency follows FAKE_LLM_LATENCY_MS / FAKE_LLM_TOKENS_PER_SECOND.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "prefetch.db")
+os.environ["LLM_BACKEND"] = "fake"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+from metrics import LLM_REQUEST_SECONDS  # noqa: E402
+from prefetch import PREFETCH_ACCEPTS  # noqa: E402
+
+JOB = ("Senior Backend Engineer", "Acme", "https://acme.com", "Build APIs",
+       ["Python", "PostgreSQL", "AWS"], "Senior", "Remote")
+PITCH_SCORE = 75
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000)
+
+
+def pitch_calls() -> int:
+    return sum(LLM_REQUEST_SECONDS.labels(agent="pitch", outcome=o).count for o in ("ok", "error"))
+
+
+async def seed_job(cards: int) -> int:
+    rng = random.Random(0)
+    job_id = await database.create_job(*JOB)
+    candidates = [{
+        "name": f"Candidate {job_id}-{i}", "current_role": "Backend Engineer", "current_company": "Initech",
+        "years_experience": rng.randint(2, 15), "skills": ["Python", "SQL", "AWS"], "location": "Remote",
+        "email": f"c{job_id}-{i}@example.com", "linkedin_summary": "Builds backend services.",
+        "linkedin_url": f"https://linkedin.com/in/c{job_id}-{i}", "company_website": "https://initech.com",
+    } for i in range(cards)]
+    async with database.transaction() as db:
+        ids = await database.create_candidates_bulk(job_id, candidates, db=db)
+        await database.create_matches_bulk(job_id, [
+            {"candidate_id": cid, "score": rng.randint(40, 99), "key_highlights": ["Python", "AWS"],
+             "fit_reasoning": "Solid backend background.", "rank_position": 1}
+            for cid in ids
+        ], db=db)
+    return job_id
+
+
+async def eager_pitches(job_id: int):
+    """What the pipeline's pitch stage does: a pitch for every strong match, up front."""
+    job = await database.get_job(job_id)
+    rows = await database.list_upcoming_candidates(job_id, 10_000)
+    strong = [row for row in rows if row["score"] >= PITCH_SCORE]
+    pitches = await asyncio.gather(*(main.pitch_writer_agent.create_pitch(job, row, row) for row in strong))
+    await database.create_outreach_bulk(job_id, [
+        {"candidate_id": row["id"], **pitch, "delivery_status": "generated"} for row, pitch in zip(strong, pitches)
+    ])
+
+
+async def scenario(client, name: str, depth: int, args) -> dict:
+    main.pitch_prefetcher.depth = depth
+    job_id = await seed_job(args.cards)
+    calls_before = pitch_calls()
+    before = {o: PREFETCH_ACCEPTS.labels(outcome=o).get() for o in ("hit", "in_flight", "miss")}
+    if name == "eager":
+        await eager_pitches(job_id)
+
+    rng = random.Random(1)
+    accepted, accept_seconds = set(), []
+    while True:
+        card = (await client.get(f"/api/jobs/{job_id}/candidates", params={"reviewer_id": "bench"})).json()
+        if not card["candidate"]:
+            break
+        candidate_id, score = card["candidate"]["id"], card["match"]["score"]
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * args.dwell)
+        if score >= 60 and rng.random() < args.accept_rate:
+            started = time.perf_counter()
+            response = await client.put(f"/api/candidates/{candidate_id}/accept")
+            accept_seconds.append(time.perf_counter() - started)
+            response.raise_for_status()
+            accepted.add(candidate_id)
+        else:
+            await client.put(f"/api/candidates/{candidate_id}/reject", params={"reviewer_id": "bench"})
+    await main.pitch_prefetcher.stop()
+
+    outcomes = {o: int(PREFETCH_ACCEPTS.labels(outcome=o).get() - before[o]) for o in before}
+    async with database.connection() as db:
+        cursor = await db.execute("SELECT candidate_id FROM outreach WHERE job_id = ?", (job_id,))
+        pitched = {row["candidate_id"] for row in await cursor.fetchall()}
+    return {
+        "scenario": name, "accepts": len(accept_seconds), **outcomes,
+        "hit_rate": round((outcomes["hit"] + outcomes["in_flight"]) / max(1, len(accept_seconds)), 2),
+        "accept_p50_ms": percentile(accept_seconds, 50), "accept_p95_ms": percentile(accept_seconds, 95),
+        "pitch_calls": pitch_calls() - calls_before,
+        "wasted_pitches": len(pitched - accepted),
+    }
+
+
+async def run(args):
+    await database.init_db()
+    await database.open_pool()
+    transport = httpx.ASGITransport(app=main.app)
+    scenarios = [("on_demand", 0), ("eager", 0)] + [(f"prefetch_{k}", k) for k in args.depths]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for name, depth in scenarios:
+            print(json.dumps(await scenario(client, name, depth, args)))
+    await database.close_pool()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--dwell", type=float, default=2.0, help="mean seconds spent reading a card")
+    parser.add_argument("--accept-rate", type=float, default=0.6)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 3, 5])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
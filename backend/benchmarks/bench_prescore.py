@@ -0,0 +1,169 @@
+"""Local pre-scoring vs full LLM scoring on a matching dataset.
+
+For each threshold, reports how many candidates skip the LLM, how many
+matching calls that saves at the pipeline's batch size, how many
+candidates the LLM would have rated as pitch-worthy (>= 75) were screened
+out, and how well the rankings agree with the LLM's:
+
+  spearman_prescore  rank correlation of the raw pre-score with LLM scores
+  spearman_combined  the pipeline's final order (LLM score above the
+                     threshold, heuristic score below) vs LLM scores
+  top10_overlap      share of the LLM's top 10 per job kept in the top 10
+
+Fixtures hold {"jobs": [{"job": {...}, "candidates": [...], "llm_scores": [...]}]}.
+The shipped one is a small synthetic sample (20 candidates for each of 4
+jobs) scored by the fake backend. Its scores follow skill overlap, much as
+the pre-scorer does. So on that sample the agreement figures only check
+that the pre-scorer is self-consistent, and say nothing about how well it
+tracks a real model. The skipped-call counts and the per-candidate cost
+still hold. For real agreement numbers, record a dataset with --record
+and a GEMINI_API_KEY; it uses the configured LLM_BACKEND.
+
+Run from backend/:  python benchmarks/bench_prescore.py [fixture.json]
+                    python benchmarks/bench_prescore.py --record out.json [--per-job 50]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from prescore import PRESCORE_THRESHOLD, prescore  # noqa: E402
+
+DEFAULT_FIXTURE = Path(__file__).parent / "fixtures" / "matching_dataset.json"
+THRESHOLDS = (0, 30, 35, 40, 45, 50, 55)
+PITCH_SCORE = 75
+
+RECORD_JOBS = [
+    {"title": "Senior Backend Engineer", "company": "Acme", "company_website": "https://acme.com",
+     "required_skills": ["Python", "PostgreSQL", "AWS", "Docker"], "experience_level": "Senior",
+     "location": "Remote"},
+    {"title": "Frontend Engineer", "company": "Globex", "company_website": "https://globex.com",
+     "required_skills": ["React", "TypeScript", "CSS", "GraphQL"], "experience_level": "Mid-level",
+     "location": "New York, NY"},
+    {"title": "Machine Learning Engineer", "company": "Initech", "company_website": "https://initech.com",
+     "required_skills": ["Python", "PyTorch", "Kubernetes", "SQL"], "experience_level": "Senior",
+     "location": "San Francisco, CA"},
+    {"title": "Junior Data Analyst", "company": "Umbrella", "company_website": "https://umbrella.com",
+     "required_skills": ["SQL", "Excel", "Tableau"], "experience_level": "Junior",
+     "location": "London, UK"},
+]
+
+
+def ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks with ties averaged (for Spearman)."""
+    order = np.argsort(values, kind="stable")
+    ranked = np.empty(len(values))
+    ranked[order] = np.arange(len(values))
+    for value in np.unique(values):
+        tied = values == value
+        ranked[tied] = ranked[tied].mean()
+    return ranked
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    if len(a) < 2:
+        return float("nan")
+    return float(np.corrcoef(ranks(a), ranks(b))[0, 1])
+
+
+def evaluate(dataset: dict, threshold: float, batch_size: int) -> dict:
+    local = calls = calls_saved = missed = pitch_worthy = 0
+    total = 0
+    rho_prescore, rho_combined, top10 = [], [], []
+    for entry in dataset["jobs"]:
+        llm = np.array(entry["llm_scores"], dtype=float)
+        scores = prescore(entry["job"], entry["candidates"])
+        below = scores < threshold
+        total += len(llm)
+        local += int(below.sum())
+        pitch_worthy += int((llm >= PITCH_SCORE).sum())
+        missed += int((below & (llm >= PITCH_SCORE)).sum())
+        # Batches in sourcing order, as the pipeline forms them
+        for start in range(0, len(llm), batch_size):
+            calls += 1
+            calls_saved += int(below[start:start + batch_size].all())
+        combined = np.where(below, scores, llm)
+        rho_prescore.append(spearman(scores, llm))
+        rho_combined.append(spearman(combined, llm))
+        k = min(10, len(llm))
+        best = set(np.argsort(-llm, kind="stable")[:k])
+        kept = set(np.argsort(-combined, kind="stable")[:k])
+        top10.append(len(best & kept) / k)
+    return {
+        "threshold": threshold,
+        "candidates_local_pct": round(100 * local / total, 1),
+        "llm_calls_saved": f"{calls_saved}/{calls}",
+        "pitch_worthy_missed": f"{missed}/{pitch_worthy}",
+        "spearman_prescore": round(float(np.nanmean(rho_prescore)), 3),
+        "spearman_combined": round(float(np.nanmean(rho_combined)), 3),
+        "top10_overlap": round(float(np.mean(top10)), 3),
+    }
+
+
+def timing(dataset: dict, repeats: int = 200) -> float:
+    """Microseconds per candidate to pre-score whole jobs at once."""
+    candidates = sum(len(entry["candidates"]) for entry in dataset["jobs"])
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for entry in dataset["jobs"]:
+            prescore(entry["job"], entry["candidates"])
+    return (time.perf_counter() - start) / repeats / candidates * 1e6
+
+
+async def record(path: Path, per_job: int, batch_size: int):
+    from dotenv import load_dotenv
+    load_dotenv()
+    from agents import SourcingAgent, MatchingAgent, LLM_BACKEND
+
+    sourcing, matching = SourcingAgent(), MatchingAgent()
+    jobs = []
+    for n, spec in enumerate(RECORD_JOBS):
+        job = {**spec, "id": n, "required_skills": json.dumps(spec["required_skills"])}
+        candidates = []
+        while len(candidates) < per_job:
+            candidates += await sourcing.generate_candidates(job, count=min(batch_size, per_job - len(candidates)))
+        scores = [None] * len(candidates)
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            for match in await matching.rank_candidates(job, batch):
+                if 0 <= match["candidate_index"] < len(batch):
+                    scores[start + match["candidate_index"]] = match["score"]
+        keep = [i for i, score in enumerate(scores) if score is not None]
+        jobs.append({"job": job, "candidates": [candidates[i] for i in keep],
+                     "llm_scores": [scores[i] for i in keep]})
+        print(f"Recorded {len(keep)} scored candidates for {job['title']}", file=sys.stderr)
+    path.write_text(json.dumps({"source": f"recorded with LLM_BACKEND={LLM_BACKEND}", "jobs": jobs}, indent=1))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixture", type=Path, nargs="?", default=DEFAULT_FIXTURE)
+    parser.add_argument("--record", type=Path, help="record a dataset to this path instead")
+    parser.add_argument("--per-job", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record, args.per_job, args.batch_size))
+        return
+
+    dataset = json.loads(args.fixture.read_text())
+    print(f"dataset: {args.fixture.name} ({dataset.get('source')}), "
+          f"{sum(len(e['candidates']) for e in dataset['jobs'])} candidates, {len(dataset['jobs'])} jobs")
+    if "fake" in dataset.get("source", ""):
+        print("scores come from the fake backend: spearman/top10 are a self-consistency check, not accuracy")
+    print(f"pre-score cost: {timing(dataset):.1f} us/candidate")
+    print(f"(configured threshold: {PRESCORE_THRESHOLD:g})")
+    for threshold in THRESHOLDS:
+        print(json.dumps(evaluate(dataset, threshold, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
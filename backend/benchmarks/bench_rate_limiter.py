@@ -0,0 +1,167 @@
+"""Rate limiter: per-check cost and memory with 1M distinct IPs.
+
+Scenarios (each in a fresh process, so RSS growth is its own):
+
+  legacy        the old per-key timestamp lists, pruned on every check
+  gcra_memory   rate_limiter.MemoryStore
+  gcra_sqlite   rate_limiter.SQLiteStore, fewer IPs (--sqlite-ips): every
+                check is a database upsert
+
+Each distinct IP makes one request; then one hot IP is checked --hot
+times against a limit of --hot times (the old check was O(limit)). For
+the memory store, once every key has gone idle, later checks carry the
+sweep along: reported are how many checks it takes, the slowest of them,
+the keys left, and what sweeping everything at once would cost.
+
+A last check runs --workers processes against one SQLite store, all
+hitting the same key: together they must be allowed exactly `limit`
+requests.
+
+Run from backend/:  python benchmarks/bench_rate_limiter.py [--ips 1000000] [--sqlite-ips 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "rate_limits.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+from rate_limiter import MemoryStore, RateLimiter, SQLiteStore  # noqa: E402
+
+LIMIT, WINDOW = 10, 3600
+
+
+class LegacyRateLimiter:
+    """rate_limiter.RateLimiter before GCRA, for comparison."""
+
+    def __init__(self):
+        self._requests = defaultdict(list)
+
+    async def check(self, action: str, ip: str, limit: int, window: int):
+        key = f"{action}:{ip}"
+        now = time.time()
+        self._requests[key] = [t for t in self._requests[key] if now - t < window]
+        if len(self._requests[key]) >= limit:
+            raise HTTPException(status_code=429, detail="Rate limit exceeded. Try again later.")
+        self._requests[key].append(now)
+
+
+def rss_mib() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def ip(n: int) -> str:
+    return f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}:{n >> 24}"
+
+
+async def measure(name: str, ips: int, hot: int) -> dict:
+    if name == "gcra_sqlite":
+        await database.init_db()
+        await database.open_pool()
+        limiter = RateLimiter(SQLiteStore())
+    else:
+        limiter = LegacyRateLimiter() if name == "legacy" else RateLimiter(MemoryStore())
+    rss_before = rss_mib()
+
+    started = time.perf_counter()
+    for n in range(ips):
+        await limiter.check("create_job", ip(n), LIMIT, WINDOW)
+    distinct_us = (time.perf_counter() - started) / ips * 1e6
+    rss_growth = rss_mib() - rss_before
+
+    started = time.perf_counter()
+    for _ in range(hot):
+        await limiter.check("hot", "203.0.113.7", hot, WINDOW)
+    hot_us = (time.perf_counter() - started) / hot * 1e6
+
+    result = {
+        "scenario": name, "ips": ips, "check_us": round(distinct_us, 2),
+        "rss_growth_mib": round(rss_growth, 1), "bytes_per_ip": round(rss_growth * 2 ** 20 / ips),
+        f"hot_check_us_limit_{hot}": round(hot_us, 2),
+    }
+    if name == "gcra_memory":
+        # Every key idle: the next checks carry the sweep along
+        store, later, slowest, checks = limiter.store, time.time() + WINDOW * 2, 0.0, 0
+        store._next_sweep = 0.0
+        while checks == 0 or store._unswept:
+            started = time.perf_counter()
+            await store.acquire(f"new:{checks}", later, WINDOW / LIMIT, WINDOW)
+            slowest = max(slowest, time.perf_counter() - started)
+            checks += 1
+        result.update(sweep_checks=checks, sweep_slowest_check_ms=round(slowest * 1000, 2),
+                      keys_after_sweep=len(store))
+        for n in range(ips):
+            store._tat[ip(n)] = 0.0
+            store._keys.append(ip(n))
+        started = time.perf_counter()
+        store.sweep(later)
+        result["full_sweep_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if name == "gcra_sqlite":
+        await database.close_pool()
+    return result
+
+
+def run_scenario(name: str, ips: int, hot: int, results):
+    results.put(asyncio.run(measure(name, ips, hot)))
+
+
+async def hammer(attempts: int, limit: int) -> int:
+    await database.open_pool(size=1)
+    limiter = RateLimiter(SQLiteStore())
+    allowed = 0
+    for _ in range(attempts):
+        try:
+            await limiter.check("shared", "198.51.100.1", limit, WINDOW)
+            allowed += 1
+        except HTTPException:
+            pass
+    await database.close_pool()
+    return allowed
+
+
+def run_hammer(attempts: int, limit: int, results):
+    results.put(asyncio.run(hammer(attempts, limit)))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ips", type=int, default=1_000_000)
+    parser.add_argument("--sqlite-ips", type=int, default=20_000)
+    parser.add_argument("--hot", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("fork")
+    for name, ips in (("legacy", args.ips), ("gcra_memory", args.ips), ("gcra_sqlite", args.sqlite_ips)):
+        results = ctx.Queue()
+        process = ctx.Process(target=run_scenario, args=(name, ips, args.hot, results))
+        process.start()
+        print(json.dumps(results.get()))
+        process.join()
+
+    limit, attempts = 100, 60
+    results = ctx.Queue()
+    workers = [ctx.Process(target=run_hammer, args=(attempts, limit, results)) for _ in range(args.workers)]
+    for process in workers:
+        process.start()
+    allowed = sum(results.get() for _ in workers)
+    for process in workers:
+        process.join()
+    print(json.dumps({"scenario": "shared_sqlite", "workers": args.workers, "attempts": attempts * args.workers,
+                      "limit": limit, "allowed": allowed, "ok": allowed == limit}))
+    return 0 if allowed == limit else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,168 @@
+"""Per-card swipes vs a buffered review window, over a slow link.
+
+One reviewer rejects every card of a seeded job through httpx's ASGI
+transport, with --rtt seconds of link latency added to each request.
+
+  per_card   GET one card, then PUT /reject for each, which returns the next
+  window_K   GET ?limit=K into a local buffer; swipes come off the buffer and
+             queued decisions go out in one POST /decisions (which refills
+             it) whenever the buffer is down to LOW_WATER cards
+
+Reported per scenario: HTTP requests, database helper calls, how long a
+swipe waited for the next card (p50/p95) and the session's wall time.
+Accepts are left out: they wait for a pitch either way.
+
+Run from backend/:  python benchmarks/bench_review_window.py [--cards 40] [--rtt 0.15] [--windows 5 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "window.db")
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["PITCH_PREFETCH_DEPTH"] = "0"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+from metrics import DB_QUERY_SECONDS  # noqa: E402
+
+JOB = ("Senior Backend Engineer", "Acme", "https://acme.com", "Build APIs",
+       ["Python", "PostgreSQL", "AWS"], "Senior", "Remote")
+LOW_WATER = 2
+
+
+class SlowTransport(httpx.ASGITransport):
+    """ASGI transport that adds a fixed round-trip time and counts requests."""
+
+    def __init__(self, app, rtt: float):
+        super().__init__(app=app)
+        self.rtt = rtt
+        self.requests = 0
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.rtt)
+        return await super().handle_async_request(request)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000)
+
+
+def db_calls() -> int:
+    return sum(child.count for child in DB_QUERY_SECONDS._children.values())
+
+
+async def seed_job(cards: int) -> int:
+    rng = random.Random(0)
+    job_id = await database.create_job(*JOB)
+    candidates = [{
+        "name": f"Candidate {job_id}-{i}", "current_role": "Backend Engineer", "current_company": "Initech",
+        "years_experience": rng.randint(2, 15), "skills": ["Python", "SQL"], "location": "Remote",
+        "email": f"c{job_id}-{i}@example.com", "linkedin_summary": "Builds backend services.",
+    } for i in range(cards)]
+    async with database.transaction() as db:
+        ids = await database.create_candidates_bulk(job_id, candidates, db=db)
+        await database.create_matches_bulk(job_id, [
+            {"candidate_id": cid, "score": rng.randint(40, 99), "key_highlights": [],
+             "fit_reasoning": "", "rank_position": 1}
+            for cid in ids
+        ], db=db)
+    return job_id
+
+
+async def per_card(client, job_id: int, args) -> list:
+    waits = []
+    card = (await client.get(f"/api/jobs/{job_id}/candidates", params={"reviewer_id": "bench"})).json()
+    while card:
+        await asyncio.sleep(args.dwell)
+        started = time.perf_counter()
+        response = await client.put(f"/api/candidates/{card['candidate']['id']}/reject",
+                                    params={"reviewer_id": "bench"})
+        waits.append(time.perf_counter() - started)
+        card = response.json()["next_candidate"]
+    return waits
+
+
+async def windowed(client, job_id: int, window: int, args) -> list:
+    response = await client.get(f"/api/jobs/{job_id}/candidates",
+                                params={"reviewer_id": "bench", "limit": window})
+    buffer = [card["candidate"]["id"] for card in response.json()["candidates"]]
+    decided, pending, waits = set(), [], []
+    flush = None
+
+    async def send(decisions):
+        data = (await client.post(f"/api/jobs/{job_id}/decisions", json={
+            "reviewer_id": "bench", "decisions": decisions, "limit": window
+        })).json()
+        for card in data["candidates"]:
+            if card["candidate"]["id"] not in decided and card["candidate"]["id"] not in buffer:
+                buffer.append(card["candidate"]["id"])
+
+    while buffer:
+        await asyncio.sleep(args.dwell)
+        started = time.perf_counter()
+        candidate_id = buffer.pop(0)
+        decided.add(candidate_id)
+        pending.append({"candidate_id": candidate_id, "decision": "reject"})
+        if len(buffer) <= LOW_WATER and (flush is None or flush.done()):
+            flush = asyncio.create_task(send(pending[:]))
+            pending.clear()
+        if not buffer and flush is not None:
+            await flush
+        waits.append(time.perf_counter() - started)
+    if pending:
+        await send(pending)
+    return waits
+
+
+async def scenario(name: str, window: int, args) -> dict:
+    job_id = await seed_job(args.cards)
+    transport = SlowTransport(main.app, args.rtt)
+    calls_before = db_calls()
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        if window:
+            waits = await windowed(client, job_id, window, args)
+        else:
+            waits = await per_card(client, job_id, args)
+    stats = await database.get_job_stats(job_id)
+    return {
+        "scenario": name, "swipes": len(waits), "rejected": stats["rejected"],
+        "requests": transport.requests, "db_calls": db_calls() - calls_before,
+        "swipe_wait_p50_ms": percentile(waits, 50), "swipe_wait_p95_ms": percentile(waits, 95),
+        "session_s": round(time.perf_counter() - started, 2),
+    }
+
+
+async def run(args):
+    await database.init_db()
+    await database.open_pool()
+    scenarios = [("per_card", 0)] + [(f"window_{k}", k) for k in args.windows]
+    for name, window in scenarios:
+        print(json.dumps(await scenario(name, window, args)))
+    await database.close_pool()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=40)
+    parser.add_argument("--rtt", type=float, default=0.15, help="seconds of link latency per request")
+    parser.add_argument("--dwell", type=float, default=0.3, help="seconds spent on each card")
+    parser.add_argument("--windows", type=int, nargs="+", default=[5, 10])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
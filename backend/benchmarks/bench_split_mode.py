@@ -0,0 +1,190 @@
+"""Swipe latency under pipeline load: pipelines in the API process vs in workers.
+
+Starts a real uvicorn server on a seeded temp database (fake LLM backend)
+and drives concurrent reviewers through GET /candidates and reject for a
+fixed time, in three scenarios:
+
+  idle     no pipeline runs
+  inline   PIPELINE_MODE=inline: the API process runs the queued pipelines
+  split    PIPELINE_MODE=external: `worker.py --processes N` runs them
+
+Under load, a batch of large pipeline runs is queued right before the
+swipes start. The fake LLM latency is kept low so that the pipelines'
+CPU work (prompt building, JSON parsing, DB writes) dominates; with
+real Gemini latencies the inline penalty is smaller but has the same shape.
+
+Run from backend/:  python benchmarks/bench_split_mode.py [--runs 8] [--duration 15]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from run_suite import BACKEND_DIR, percentile, seed  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def queue_runs(db_path: str, runs: int, count: int):
+    """Enqueue `runs` pipeline runs, each on a new job."""
+    conn = sqlite3.connect(db_path)
+    now = time.time()
+    for _ in range(runs):
+        job_id = conn.execute(
+            "INSERT INTO jobs (title, company, company_website, description, required_skills, experience_level, "
+            "location) VALUES ('Data Engineer', 'Globex', 'https://globex.com', 'Pipelines', "
+            "'[\"Python\", \"Spark\"]', 'Senior', 'Remote')"
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO pipeline_runs (job_id, requested, state, created_at, updated_at) "
+            "VALUES (?, ?, 'queued', ?, ?)",
+            (job_id, count, now, now)
+        )
+    conn.commit()
+    conn.close()
+
+
+def run_progress(db_path: str) -> dict:
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT COALESCE(SUM(produced), 0), COALESCE(SUM(state = 'done'), 0), COUNT(*) FROM pipeline_runs"
+    ).fetchone()
+    conn.close()
+    return {"candidates_produced": row[0], "runs_done": row[1], "runs": row[2]}
+
+
+async def wait_until_up(base_url: str, timeout: float = 30):
+    import httpx
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get("/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("API server did not start")
+
+
+async def swipe(base_url: str, jobs: int, reviewers: int, duration: float) -> dict:
+    import httpx
+    latencies = []
+    deadline = time.monotonic() + duration
+
+    async def reviewer(client, n: int):
+        job_id = n % jobs + 1
+        reviewer_id = f"reviewer-{n}"
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            card = (await client.get(f"/api/jobs/{job_id}/candidates", params={"reviewer_id": reviewer_id})).json()
+            latencies.append(time.perf_counter() - start)
+            if not card["candidate"]:
+                return
+            start = time.perf_counter()
+            await client.put(f"/api/candidates/{card['candidate']['id']}/reject", params={"reviewer_id": reviewer_id})
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=reviewers)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(reviewer(client, n) for n in range(reviewers)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+    }
+
+
+def scenario(name: str, args) -> dict:
+    db_path = str(Path(tempfile.mkdtemp()) / "split.db")
+    env = {
+        **os.environ,
+        "DB_PATH": db_path,
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": "1000000",
+        "LLM_CACHE_ENABLED": "0",
+        "PIPELINE_MODE": "external" if name in ("idle", "split") else "inline",
+        # Same total run concurrency in both modes
+        "PIPELINE_WORKERS": str(args.concurrency * (args.processes if name == "inline" else 1)),
+        "PIPELINE_POLL_SECONDS": "0.2",
+        "GEMINI_RPM": "1000000",
+        "GEMINI_TPM": "1000000000",
+        "GEMINI_MAX_CONCURRENCY": "64",
+        "GEMINI_MAX_CONCURRENCY_PER_JOB": "16",
+    }
+    subprocess.run([sys.executable, "-c", "import asyncio, database; asyncio.run(database.init_db())"],
+                   cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+    jobs = seed(db_path, args.candidates)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    quiet = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    processes = [subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, **quiet)]
+    try:
+        asyncio.run(wait_until_up(base_url))
+        if name == "split":
+            processes.append(subprocess.Popen(
+                [sys.executable, "worker.py", "--processes", str(args.processes),
+                 "--concurrency", str(args.concurrency)],
+                cwd=BACKEND_DIR, env=env, **quiet))
+        if name != "idle":
+            queue_runs(db_path, args.runs, args.run_candidates)
+        result = asyncio.run(swipe(base_url, jobs, args.reviewers, args.duration))
+        result.update(run_progress(db_path))
+        return result
+    finally:
+        for process in reversed(processes):
+            process.send_signal(signal.SIGINT)
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=10_000, help="seeded candidates to swipe through")
+    parser.add_argument("--runs", type=int, default=8, help="pipeline runs queued under load")
+    parser.add_argument("--run-candidates", type=int, default=200, help="candidates requested per run")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent runs per worker process")
+    parser.add_argument("--processes", type=int, default=2, help="worker processes in split mode")
+    parser.add_argument("--reviewers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15, help="seconds of swiping per scenario")
+    parser.add_argument("--llm-latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for name in ("idle", "inline", "split"):
+        results[name] = scenario(name, args)
+        print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    # Split mode only helps when the workers get cores of their own
+    print(json.dumps({"config": vars(args), "cpu_count": os.cpu_count(), "results": results}, indent=2))
+    inline, split = results["inline"]["p99_ms"], results["split"]["p99_ms"]
+    print(f"\nswipe p99: idle {results['idle']['p99_ms']} ms, inline {inline} ms, split {split} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Replay a chunked sourcing response through the streaming parser offline.
+
+Checks that JsonArrayStreamParser yields exactly what a full json.loads of
+the joined response gives (every profile passing CandidateProfile), and
+compares when the first candidate becomes available: as soon as its chunk
+arrives (streaming) vs after the last chunk (buffered).
+
+Fixtures hold {"chunks": [{"at_s": <seconds since request>, "text": ...}]}.
+Capture a real one with --record (needs GEMINI_API_KEY).
+
+Run from backend/:  python benchmarks/bench_streaming.py [fixture.json]
+                    python benchmarks/bench_streaming.py --record out.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents import CandidateProfile  # noqa: E402
+from json_stream import JsonArrayStreamParser  # noqa: E402
+
+DEFAULT_FIXTURE = Path(__file__).parent / "fixtures" / "sourcing_stream.json"
+
+SAMPLE_JOB = {
+    "id": 0,
+    "title": "Senior Backend Engineer",
+    "company": "Acme",
+    "company_website": "https://acme.com",
+    "required_skills": '["Python", "PostgreSQL", "AWS"]',
+    "experience_level": "Senior",
+    "location": "Remote",
+}
+
+
+def replay(chunks: list) -> dict:
+    parser = JsonArrayStreamParser()
+    streamed = []
+    first_at = None
+    for chunk in chunks:
+        for profile in parser.feed(chunk["text"]):
+            streamed.append(CandidateProfile.model_validate(profile).model_dump())
+            if first_at is None:
+                first_at = chunk["at_s"]
+
+    buffered = json.loads("".join(chunk["text"] for chunk in chunks))
+    return {
+        "candidates": len(streamed),
+        "matches_full_parse": parser.finished and streamed == buffered,
+        "first_candidate_streaming_s": first_at,
+        "first_candidate_buffered_s": chunks[-1]["at_s"],
+    }
+
+
+async def record(path: Path, count: int):
+    from dotenv import load_dotenv
+    from agents import MODEL, SourcingAgent, get_client
+
+    load_dotenv()
+    agent = SourcingAgent()
+    chunks = []
+    start = time.perf_counter()
+    stream = await get_client().aio.models.generate_content_stream(
+        model=MODEL,
+        contents=agent._build_prompt(SAMPLE_JOB, count),
+        config=agent._build_config()
+    )
+    async for chunk in stream:
+        chunks.append({"at_s": round(time.perf_counter() - start, 3), "text": chunk.text or ""})
+    path.write_text(json.dumps({"source": "recorded", "chunks": chunks}, indent=1))
+    print(f"Recorded {len(chunks)} chunks to {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixture", nargs="?", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--record", type=Path, help="capture a live sourcing stream to this file")
+    parser.add_argument("--count", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record, args.count))
+        return 0
+
+    result = replay(json.loads(args.fixture.read_text())["chunks"])
+    print(result)
+    return 0 if result["matches_full_parse"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
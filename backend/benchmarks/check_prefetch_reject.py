@@ -0,0 +1,109 @@
+"""Fail if rejecting a candidate while its prefetched pitch is being saved
+cancels the save or leaves a pooled connection mid-transaction.
+
+Each trial writes a pitch with a stub writer that finishes at a random
+moment around a concurrent reject (status update, then
+PitchPrefetcher.cancel, as the reject endpoint does). A pitch that was
+already written must run its save to the end: stored if the save got in
+first, discarded if the reject did. Afterwards every pooled connection
+must be idle and a new write transaction must go through.
+
+Run from backend/:  python benchmarks/check_prefetch_reject.py [--trials 200]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "prefetch_reject.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+from prefetch import PitchPrefetcher  # noqa: E402
+
+
+class StubWriter:
+    """Pitch writer that answers after a set delay."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.written = set()
+
+    async def create_pitch(self, job, candidate, match, priority=None):
+        await asyncio.sleep(self.delay)
+        self.written.add(candidate['id'])
+        return {"subject": f"Role at {job['company']}", "body": f"Hi {candidate['name']}"}
+
+
+async def seed(count: int) -> tuple:
+    job_id = await database.create_job("Backend Engineer", "Acme", "https://acme.com", "Build APIs",
+                                       ["Python"], "Senior", "Remote")
+    async with database.transaction() as db:
+        ids = await database.create_candidates_bulk(job_id, [{
+            "name": f"Candidate {i}", "current_role": "Engineer", "current_company": "Initech",
+            "years_experience": 5, "skills": ["Python"], "location": "Remote",
+            "email": f"c{i}@example.com", "linkedin_summary": "Summary",
+        } for i in range(count)], db=db)
+        await database.create_matches_bulk(job_id, [
+            {"candidate_id": cid, "score": 90, "key_highlights": [], "fit_reasoning": "", "rank_position": 1}
+            for cid in ids
+        ], db=db)
+    return await database.get_job(job_id), ids
+
+
+async def trial(prefetcher: PitchPrefetcher, writer: StubWriter, job, candidate_id: int,
+                rng: random.Random) -> str:
+    writer.delay = rng.random() * 0.002
+    row = {"id": candidate_id, "name": f"Candidate {candidate_id}", "score": 90}
+    task = asyncio.create_task(prefetcher._generate(job, row))
+    prefetcher._tasks[candidate_id] = task
+    await asyncio.sleep(rng.random() * 0.002)
+    await database.update_candidate_status(candidate_id, "rejected")
+    prefetcher.cancel(candidate_id)
+    written = candidate_id in writer.written
+    try:
+        outreach_id = await task
+    except asyncio.CancelledError:
+        return "cancelled_while_saving" if written else "cancelled"
+    return "saved" if outreach_id else "discarded"
+
+
+async def run(trials: int) -> int:
+    await database.init_db()
+    await database.open_pool()
+    try:
+        job, ids = await seed(trials)
+        writer = StubWriter()
+        prefetcher = PitchPrefetcher(writer, depth=1)
+        rng = random.Random(0)
+        outcomes = {}
+        for candidate_id in ids:
+            outcome = await trial(prefetcher, writer, job, candidate_id, rng)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        leaked = 0
+        for db in database._pool._connections:
+            await db.execute("SELECT 1")
+            leaked += db.in_transaction
+        await asyncio.wait_for(database.update_candidate_status(ids[0], "pending"), 10)
+    finally:
+        await database.close_pool()
+
+    failed = leaked or outcomes.get("cancelled_while_saving", 0)
+    print(f"{trials} rejects: {outcomes}, connections left in a transaction: {leaked}")
+    print("FAIL" if failed else "OK")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=200)
+    return asyncio.run(run(parser.parse_args().trials))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Fail if any query on a hot path does a full table scan.
+
+Exercises every database helper the API, the pipeline and the workers use
+(plus the dedup key lookups and the LLM cache) against a small seeded
+database, records the SQL actually sent to SQLite, and runs EXPLAIN QUERY
+PLAN on each statement, INSERT ... SELECT and upserts included. Exits
+non-zero if a plan contains a SCAN step.
+
+Left out on purpose: check_job_stats and LLM cache eviction, maintenance
+jobs that aggregate whole tables.
+
+Run from backend/:  python benchmarks/check_query_plans.py
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DB_PATH"] = str(Path(_tmpdir) / "plans.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+from dedup import DedupIndex, find_existing_keys  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+
+# Statements that never read a table
+IGNORED_PREFIXES = ("PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "SELECT LAST_INSERT_ROWID")
+
+# SCAN steps over something other than a stored table
+BENIGN_SCANS = ("SCAN CONSTANT ROW", "SCAN (subquery")
+
+
+async def exercise_helpers():
+    """Call every helper behind the API endpoints at least once."""
+    job_id = await database.create_job(
+        "Backend Engineer", "Acme", "https://acme.com", "Build APIs",
+        ["Python"], "Senior", "Remote"
+    )
+    candidate = {
+        "name": "Ada", "current_role": "Engineer", "current_company": "Initech",
+        "years_experience": 5, "skills": ["Python"], "location": "Remote",
+        "email": "ada@example.com", "linkedin_summary": "Summary",
+    }
+    async with database.transaction() as db:
+        ids = await database.create_candidates_bulk(job_id, [candidate, candidate], db=db)
+        await database.create_matches_bulk(job_id, [
+            {"candidate_id": c_id, "score": 80, "key_highlights": [], "fit_reasoning": "", "rank_position": i + 1}
+            for i, c_id in enumerate(ids)
+        ], db=db)
+    await database.create_outreach_bulk(job_id, [{"candidate_id": ids[0], "subject": "Hi", "body": "..."}])
+
+    await database.get_job(job_id)
+    await database.list_upcoming_candidates(job_id, 3)
+    nxt = await database.get_next_candidate(job_id)
+    await database.get_next_candidate(job_id, reviewer_id="reviewer-1")
+    window = await database.claim_candidates(job_id, reviewer_id="reviewer-1", limit=5)
+    await database.apply_decisions(job_id, [(window[0]["id"], "rejected")], reviewer_id="reviewer-1", limit=5)
+    await database.get_job_stats(job_id)
+    await database.get_candidate(nxt["id"])
+    await database.update_candidate_status(nxt["id"], "accepted")
+    await database.save_prefetched_pitch(job_id, nxt["id"], "Hi", "...")
+    outreach = await database.get_outreach_by_candidate_id(nxt["id"])
+    await database.get_match_by_candidate_id(nxt["id"])
+    await database.get_outreach(outreach["id"])
+    await database.update_outreach_content(outreach["id"], "Hi", "...")
+    await database.update_outreach_status(outreach["id"], "sent")
+    await database.list_candidates_by_status(job_id, "accepted")
+    end = await database.candidate_page_end(job_id, "viewed", 1)
+    await database.list_candidates_by_status(job_id, "viewed", 1, end=end, fields=["id", "score"])
+    await database.list_candidates_by_status(job_id, "viewed", 1, after=end)
+    await database.rate_limit_acquire("create_job:127.0.0.1", 0.0, 360.0, 3600.0)
+    await database.rate_limit_acquire("create_job:127.0.0.1", 0.0, 3600.0, 3600.0)
+    await database.prune_rate_limits(0.0)
+    await database.create_outreach(job_id, ids[1], "Hi", "...")
+
+    # Pipeline: dedup keys, saved batches and the embedding index
+    dedup = DedupIndex()
+    await dedup.admit(job_id, {**candidate, "email": "grace@example.com", "name": "Grace"})
+    await find_existing_keys(job_id, [("email", "ada@example.com")])
+    await database.add_job_duplicates(job_id, 1)
+    rows = await database.list_candidate_embeddings(0, 10)
+    await database.set_candidate_embeddings([(b"\0" * 4, rows[0]["id"])])
+    await database.get_candidates_by_ids(ids)
+
+    # Run queue and the worker -> API event relay
+    run_id = await database.enqueue_pipeline_run(job_id, 10)
+    await database.claim_pipeline_run("worker-1", 60.0)
+    await database.renew_pipeline_run_lease(run_id, "worker-1", 60.0)
+    async with database.transaction() as db:
+        await database.checkpoint_pipeline_run(db, run_id, "worker-1", 1, 60.0)
+    await database.get_pipeline_run(run_id)
+    await database.list_pipeline_runs(job_id)
+    await database.release_pipeline_runs("worker-1")
+    await database.claim_pipeline_run("worker-1", 60.0)
+    await database.finish_pipeline_run(run_id, "worker-1", "done")
+    await database.append_pipeline_events([{"job_id": job_id, "type": "batch_sourced", "data": {}}])
+    await database.list_pipeline_events_after(0)
+    await database.latest_pipeline_event_id()
+    await database.prune_pipeline_events(0.0)
+
+    cache = LLMCache()
+    await cache.put("key", "{}")
+    cache._memory.clear()
+    await cache.get("key")
+
+
+async def collect_statements() -> list:
+    await database.init_db()
+    pool = await database.open_pool(size=1)
+    statements = []
+    for db in pool._connections:
+        await db.set_trace_callback(statements.append)
+    await exercise_helpers()
+    await database.close_pool()
+    return statements
+
+
+def find_scans(statements: list) -> list:
+    """Return (sql, plan detail) for every statement whose plan scans a table."""
+    conn = sqlite3.connect(database.DB_PATH)
+    seen = set()
+    scans = []
+    for sql in statements:
+        sql = sql.strip()
+        if sql in seen or sql.upper().startswith(IGNORED_PREFIXES):
+            continue
+        seen.add(sql)
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+            detail = row[3]
+            if detail.startswith("SCAN") and not detail.startswith(BENIGN_SCANS):
+                scans.append((sql, detail))
+    conn.close()
+    return scans
+
+
+def main() -> int:
+    statements = asyncio.run(collect_statements())
+    scans = find_scans(statements)
+    checked = len({s.strip() for s in statements})
+    for sql, detail in scans:
+        print(f"SCAN: {detail}\n  {' '.join(sql.split())}\n")
+    print(f"Checked {checked} distinct statements, {len(scans)} full scans")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""End-to-end benchmark suite: pipeline plus the swipe endpoints, as JSON.
+
+For each database size a fresh child process seeds a temp SQLite file
+(jobs of 1,000 candidates each, mostly pending) and then, in-process and
+with the fake LLM backend:
+
+  pipeline   runs process_job_pipeline for one new job
+  statements calls each endpoint sequentially and counts the SQL
+             statements SQLite executed per request (triggers included)
+  swipes     runs concurrent reviewers through GET /candidates, then
+             reject, or accept + POST /outreach/send, via httpx's ASGI
+             transport; reports throughput and p50/p95/p99 per endpoint
+
+plus the child's peak RSS. Each size runs in its own process so peak RSS
+is not inherited from a previous size.
+
+Run from backend/:  python benchmarks/run_suite.py [--sizes 1000 100000 1000000] [--out results.json]
+Compare two runs:   python benchmarks/run_suite.py --compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CANDIDATES_PER_JOB = 1000
+PENDING_SHARE = 0.9
+OUTREACH_SHARE = 0.1   # candidates with a pre-generated pitch
+ACCEPT_SHARE = 0.3
+STATEMENT_SAMPLES = 20
+
+
+def percentile(ordered: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list, in ms."""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 3)
+
+
+def seed(db_path: str, total: int) -> int:
+    """Bulk-load `total` matched candidates; returns the number of jobs."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    jobs = max(1, total // CANDIDATES_PER_JOB)
+    conn.executemany(
+        "INSERT INTO jobs (title, company, company_website, description, required_skills, experience_level, location) "
+        "VALUES ('Backend Engineer', 'Acme', 'https://acme.com', 'Build APIs', '[\"Python\", \"SQL\"]', "
+        "'Senior', 'Remote')",
+        [()] * jobs,
+    )
+    rng = random.Random(0)
+    skills = json.dumps(["Python", "SQL", "AWS"])
+    highlights = json.dumps(["Python", "Distributed systems", "Mentoring"])
+    for start in range(0, total, 50_000):
+        rows = []
+        for i in range(start, min(total, start + 50_000)):
+            score = rng.randint(30, 99)
+            status = "pending" if rng.random() < PENDING_SHARE else rng.choice(("accepted", "rejected", "contacted"))
+            rows.append((i + 1, i % jobs + 1, f"Candidate {i}", skills, status, score))
+        conn.executemany(
+            "INSERT INTO candidates (id, job_id, name, current_role, current_company, years_experience, skills, "
+            "location, email, linkedin_summary, linkedin_url, company_website, status, rank_score) "
+            "VALUES (?, ?, ?, 'Engineer', 'Initech', 6, ?, 'Remote', 'c@example.com', "
+            "'Builds backend services.', 'https://linkedin.com/in/c', 'https://initech.com', ?, ?)",
+            rows,
+        )
+        conn.executemany(
+            "INSERT INTO matches (job_id, candidate_id, score, key_highlights, fit_reasoning, rank_position) "
+            "VALUES (?, ?, ?, ?, 'Strong backend fit.', 1)",
+            ((job_id, c_id, score, highlights) for c_id, job_id, _, _, _, score in rows),
+        )
+        conn.executemany(
+            "INSERT INTO outreach (job_id, candidate_id, subject, body, delivery_status) "
+            "VALUES (?, ?, 'Hello', 'Pre-generated pitch', 'generated')",
+            ((job_id, c_id) for c_id, job_id, *_ in rows if rng.random() < OUTREACH_SHARE),
+        )
+        conn.commit()
+    conn.close()
+    return jobs
+
+
+class StatementCounter:
+    """Counts statements executed on every pool connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, sql: str):
+        self.count += 1
+
+    async def attach(self, pool):
+        for db in pool._connections:
+            await db.set_trace_callback(self)
+
+
+async def bench_pipeline(main, database, counter: StatementCounter, count: int) -> dict:
+    job_id = await database.create_job(
+        "Backend Engineer", "Acme", "https://acme.com", "Build APIs", ["Python", "SQL"], "Senior", "Remote"
+    )
+    before = counter.count
+    start = time.perf_counter()
+    await main.process_job_pipeline(job_id, count)
+    elapsed = time.perf_counter() - start
+    stats = await database.get_job_stats(job_id)
+    return {
+        "candidates": stats["total"],
+        "total_s": round(elapsed, 3),
+        "candidates_per_s": round(stats["total"] / elapsed, 1),
+        "statements_per_candidate": round((counter.count - before) / max(1, stats["total"]), 2),
+    }
+
+
+async def bench_statements(client, counter: StatementCounter, job_id: int) -> dict:
+    """Sequential calls, so the statement counter is attributable."""
+    samples = {"candidates": [], "reject": [], "accept": [], "outreach_send": []}
+
+    async def measure(name, method, url, **kwargs):
+        before = counter.count
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        samples[name].append(counter.count - before)
+        return response.json()
+
+    for n in range(STATEMENT_SAMPLES):
+        card = await measure("candidates", "GET", f"/api/jobs/{job_id}/candidates", params={"reviewer_id": "stmt"})
+        if not card["candidate"]:
+            break
+        candidate_id = card["candidate"]["id"]
+        if n % 2:
+            await measure("reject", "PUT", f"/api/candidates/{candidate_id}/reject")
+        else:
+            accepted = await measure("accept", "PUT", f"/api/candidates/{candidate_id}/accept")
+            await measure("outreach_send", "POST", "/api/outreach/send", json={
+                "outreach_id": accepted["outreach_id"], "subject": "Hi", "body": "Body"})
+    return {name: round(sum(v) / len(v), 2) for name, v in samples.items() if v}
+
+
+async def bench_swipes(client, jobs: int, reviewers: int, swipes: int) -> dict:
+    latencies = {"candidates": [], "reject": [], "accept": [], "outreach_send": []}
+    remaining = swipes
+    rng = random.Random(1)
+
+    async def timed(name, method, url, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies[name].append(time.perf_counter() - start)
+        response.raise_for_status()
+        return response.json()
+
+    async def reviewer(n: int):
+        nonlocal remaining
+        job_id = n % jobs + 1
+        reviewer_id = f"reviewer-{n}"
+        while remaining > 0:
+            remaining -= 1
+            card = await timed("candidates", "GET", f"/api/jobs/{job_id}/candidates",
+                               params={"reviewer_id": reviewer_id})
+            if not card["candidate"]:
+                return
+            candidate_id = card["candidate"]["id"]
+            if rng.random() < ACCEPT_SHARE:
+                accepted = await timed("accept", "PUT", f"/api/candidates/{candidate_id}/accept")
+                await timed("outreach_send", "POST", "/api/outreach/send", json={
+                    "outreach_id": accepted["outreach_id"], "subject": accepted["pitch"]["subject"],
+                    "body": accepted["pitch"]["body"]})
+            else:
+                await timed("reject", "PUT", f"/api/candidates/{candidate_id}/reject",
+                            params={"reviewer_id": reviewer_id})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(reviewer(n) for n in range(reviewers)))
+    elapsed = time.perf_counter() - start
+    requests = sum(len(v) for v in latencies.values())
+    result = {"requests": requests, "requests_per_s": round(requests / elapsed, 1), "endpoints": {}}
+    for name, values in latencies.items():
+        values.sort()
+        result["endpoints"][name] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+        }
+    return result
+
+
+async def run_size(args) -> dict:
+    import httpx
+    import database
+    import main
+
+    await database.init_db()
+    seed_start = time.perf_counter()
+    jobs = seed(database.DB_PATH, args.size)
+    seed_s = time.perf_counter() - seed_start
+
+    pool = await database.open_pool()
+    # aiosqlite's threads are not daemons: a failure that skipped closing
+    # the pool would leave the child hanging instead of exiting
+    try:
+        counter = StatementCounter()
+        await counter.attach(pool)
+
+        result = {"size": args.size, "jobs": jobs, "seed_s": round(seed_s, 2)}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            result["statements_per_request"] = await bench_statements(client, counter, jobs)
+            result["swipes"] = await bench_swipes(client, jobs, args.reviewers, args.swipes)
+        result["pipeline"] = await bench_pipeline(main, database, counter, args.pipeline_count)
+    finally:
+        await main.pitch_prefetcher.stop()
+        await database.close_pool()
+    # ru_maxrss is in KiB on Linux
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+def child(args):
+    os.environ["DB_PATH"] = str(Path(tempfile.mkdtemp()) / "suite.db")
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ.setdefault("FAKE_LLM_LATENCY_MS", str(args.llm_latency_ms))
+    os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "100000")
+    sys.path.insert(0, str(BACKEND_DIR))
+    # The app and the demo mailer print per request; keep stdout for JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(run_size(args))
+    print(json.dumps(result))
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path: Path, new_path: Path):
+    """Print p95/throughput/RSS deltas between two suite outputs."""
+    old = {r["size"]: r for r in json.loads(old_path.read_text())["results"]}
+    new = {r["size"]: r for r in json.loads(new_path.read_text())["results"]}
+    for size in sorted(old.keys() & new.keys()):
+        a, b = old[size], new[size]
+        print(f"size={size}")
+        print(f"  swipe requests/s: {a['swipes']['requests_per_s']} -> {b['swipes']['requests_per_s']}")
+        for name, stats in b["swipes"]["endpoints"].items():
+            before = a["swipes"]["endpoints"].get(name, {}).get("p95_ms")
+            print(f"  {name} p95 ms: {before} -> {stats['p95_ms']}")
+        print(f"  pipeline total s: {a['pipeline']['total_s']} -> {b['pipeline']['total_s']}")
+        print(f"  peak RSS MB: {a['peak_rss_mb']} -> {b['peak_rss_mb']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)  # child mode
+    parser.add_argument("--swipes", type=int, default=500)
+    parser.add_argument("--reviewers", type=int, default=8)
+    parser.add_argument("--pipeline-count", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds allowed per size")
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.size is not None:
+        child(args)
+        return
+
+    results = []
+    for size in args.sizes:
+        try:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--size", str(size), "--swipes", str(args.swipes),
+                 "--reviewers", str(args.reviewers), "--pipeline-count", str(args.pipeline_count),
+                 "--llm-latency-ms", str(args.llm_latency_ms)],
+                capture_output=True, text=True, timeout=args.timeout,
+            )
+        except subprocess.TimeoutExpired as e:
+            sys.stderr.write(e.stderr.decode() if isinstance(e.stderr, bytes) else e.stderr or "")
+            print(f"size={size} timed out after {args.timeout:g}s", file=sys.stderr)
+            sys.exit(1)
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            sys.exit(proc.returncode)
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        print(f"size={size} done", file=sys.stderr)
+
+    report = json.dumps({"revision": git_revision(), "python": sys.version.split()[0],
+                         "swipes": args.swipes, "reviewers": args.reviewers, "results": results}, indent=2)
+    if args.out:
+        args.out.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
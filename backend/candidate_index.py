@@ -0,0 +1,164 @@
+"""Cross-job candidate reuse through the local embedding index.
+
+The API process keeps every stored profile's embedding in a VectorIndex,
+loaded in the background at startup and topped up with newer rows every
+EMBEDDING_REFRESH_SECONDS. When a job is created, the closest profiles
+from other jobs are copied into it (deduplicated, scored locally) before
+any LLM sourcing starts, so the first card is ready as soon as the job
+exists. Profiles saved since the last refresh are not considered yet.
+"""
+
+import asyncio
+import math
+import os
+from typing import Any, Dict, List
+
+from database import (
+    transaction, list_candidate_embeddings, set_candidate_embeddings, get_candidates_by_ids,
+    create_candidates_bulk, create_matches_bulk
+)
+from dedup import DedupIndex, dedup_index, candidate_keys, save_keys
+from embeddings import (
+    EMBEDDING_DIM, VectorIndex, embed_candidates, embed_job, to_blob, from_blobs, blob_fits
+)
+from metrics import Counter
+from prescore import prescore, local_match
+
+SEED_K = int(os.environ.get("EMBEDDING_SEED_K", "10"))
+SEED_MIN_SCORE = float(os.environ.get("EMBEDDING_SEED_MIN_SCORE", "0.5"))
+# Switch from brute force to IVF search once the index holds this many rows
+# (brute force costs ~1 ms per 1k rows)
+IVF_MIN_ROWS = int(os.environ.get("EMBEDDING_IVF_MIN_ROWS", "50000"))
+IVF_NPROBE = int(os.environ.get("EMBEDDING_IVF_NPROBE", "16"))
+REFRESH_SECONDS = float(os.environ.get("EMBEDDING_REFRESH_SECONDS", "10"))
+LOAD_BATCH = 10000
+
+CANDIDATES_SEEDED = Counter("candidates_seeded_total", "Candidates copied into new jobs from similar jobs")
+
+
+class CandidateIndex:
+    """The vector index plus how far into the candidates table it has read."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.index = VectorIndex(dim)
+        self.dim = dim
+        self.last_id = 0
+        self.loaded = False
+        # Guards the index against adds during a search; held only briefly
+        self._lock = asyncio.Lock()
+        # One refresh at a time
+        self._refreshing = asyncio.Lock()
+
+    async def refresh(self):
+        """Add candidates saved since the last refresh (all of them the first time).
+
+        Rows without a usable embedding (saved before embeddings existed, or
+        with another EMBEDDING_DIM) are embedded and written back. Reading
+        and embedding happen outside the search lock, so lookups only wait
+        for each batch to be added.
+        """
+        async with self._refreshing:
+            while True:
+                rows = await list_candidate_embeddings(self.last_id, LOAD_BATCH)
+                if not rows:
+                    break
+                stale = [row for row in rows if not blob_fits(row['embedding'], self.dim)]
+                if stale:
+                    blobs = [to_blob(v) for v in embed_candidates(stale, self.dim)]
+                    await set_candidate_embeddings([(blob, row['id']) for blob, row in zip(blobs, stale)])
+                    for blob, row in zip(blobs, stale):
+                        row['embedding'] = blob
+                async with self._lock:
+                    self.index.add([row['id'] for row in rows], [row['job_id'] for row in rows],
+                                   from_blobs([row['embedding'] for row in rows], self.dim))
+                self.last_id = rows[-1]['id']
+                if len(rows) < LOAD_BATCH:
+                    break
+            if not self.index.trained and self.index.size >= IVF_MIN_ROWS:
+                started = asyncio.get_running_loop().time()
+                async with self._lock:
+                    await asyncio.to_thread(self.index.train, int(math.sqrt(self.index.size)))
+                print(f"Trained IVF candidate index over {self.index.size} profiles in "
+                      f"{asyncio.get_running_loop().time() - started:.1f}s")
+            self.loaded = True
+
+    async def load(self):
+        """Startup load; failures only disable seeding."""
+        try:
+            await self.refresh()
+            print(f"Candidate index loaded: {self.index.size} profiles")
+        except Exception as e:
+            print(f"Failed to load candidate index: {e}")
+
+    async def run(self, interval: float = REFRESH_SECONDS):
+        """Load, then keep the index topped up until cancelled."""
+        await self.load()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Failed to refresh candidate index: {e}")
+
+    async def similar(self, job: Dict[str, Any], k: int) -> List[tuple]:
+        """(candidate_id, job_id, cosine) of the closest profiles from other jobs.
+
+        Searches in a thread, holding the lock so no rows are added meanwhile.
+        """
+        async with self._lock:
+            nprobe = IVF_NPROBE if self.index.trained else 0
+            return await asyncio.to_thread(self.index.search, embed_job(job, self.dim), k,
+                                           exclude_job=job['id'], nprobe=nprobe)
+
+
+async def seed_job(job: Dict[str, Any], index: CandidateIndex, k: int = SEED_K,
+                   min_score: float = SEED_MIN_SCORE, dedup: DedupIndex = dedup_index) -> int:
+    """Copy up to `k` similar existing profiles into a new job; returns how many.
+
+    Each copy is a new pending candidate with a locally computed match, so
+    it can be served before the pipeline has produced anything.
+    """
+    if k <= 0 or not index.loaded:
+        return 0
+    # Over-fetch: the same person often appears under several earlier jobs
+    hits = [hit for hit in await index.similar(job, k * 4) if hit[2] >= min_score]
+    similarity = {candidate_id: score for candidate_id, _, score in hits}
+
+    picked: List[Dict[str, Any]] = []
+    seen = set()
+    for row in await get_candidates_by_ids([candidate_id for candidate_id, _, _ in hits]):
+        keys = candidate_keys(row)
+        if seen.intersection(keys):
+            continue
+        seen.update(keys)
+        if await dedup.admit(job['id'], row) is None:
+            picked.append(row)
+            if len(picked) == k:
+                break
+    if not picked:
+        return 0
+
+    scores = prescore(job, picked)
+    order = sorted(range(len(picked)), key=lambda i: -scores[i])
+    try:
+        async with transaction() as db:
+            candidate_ids = await create_candidates_bulk(job['id'], picked, db=db,
+                                                         embeddings=[row['embedding'] for row in picked])
+            await save_keys(db, job['id'], [(kind, key, candidate_id)
+                                            for row, candidate_id in zip(picked, candidate_ids)
+                                            for kind, key in candidate_keys(row)])
+            await create_matches_bulk(job['id'], [
+                {**local_match(job, picked[i], i, scores[i], fit_reasoning=(
+                    f"Carried over from a similar earlier role ({similarity[picked[i]['id']]:.0%} profile "
+                    f"similarity) and scored locally on skills, experience and location.")),
+                 'candidate_id': candidate_ids[i], 'rank_position': rank + 1}
+                for rank, i in enumerate(order)
+            ], db=db)
+    except Exception:
+        dedup.forget(job['id'])
+        raise
+    CANDIDATES_SEEDED.inc(len(picked))
+    return len(picked)
+
+
+candidate_index = CandidateIndex()
@@ -0,0 +1,43 @@
+"""Verify (and optionally rebuild) the trigger-maintained job_stats counters.
+
+Usage:
+    python check_stats.py           # report drifted jobs, exit 1 if any
+    python check_stats.py --rebuild # overwrite drifted rows with actual counts
+"""
+
+import argparse
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database import init_db, check_job_stats, close_pool
+
+
+async def main(rebuild: bool) -> int:
+    await init_db()
+    try:
+        drifted = await check_job_stats(rebuild=rebuild)
+    finally:
+        await close_pool()
+
+    for entry in drifted:
+        print(f"Job {entry['job_id']}: stored {entry['stored']} != actual {entry['actual']}")
+
+    if not drifted:
+        print("✓ job_stats consistent")
+        return 0
+    if rebuild:
+        print(f"✓ Rebuilt stats for {len(drifted)} job(s)")
+        return 0
+    print(f"✗ {len(drifted)} job(s) drifted; rerun with --rebuild to fix")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="rewrite drifted counters")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.rebuild)))
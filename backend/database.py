@@ -1,32 +1,231 @@
 """Database connection and CRUD operations."""
 
 import aiosqlite
+import asyncio
 import json
-from typing import List, Optional, Dict, Any
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from metrics import DB_QUERY_SECONDS, timed
 
 import os
 
 DB_PATH = Path(os.environ.get("DB_PATH", Path(__file__).parent / "recruiter.db"))
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "4"))
+CLAIM_LEASE_SECONDS = int(os.environ.get("CLAIM_LEASE_SECONDS", "600"))
+
+# Applied to every pooled connection. WAL lets readers proceed while the
+# pipeline writes; synchronous=NORMAL is durable enough under WAL.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",     # ~16 MB page cache per connection
+    "PRAGMA mmap_size = 268435456",   # 256 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Size of sqlite3's per-connection prepared statement cache. Connections are
+# long-lived, so every helper's SQL is compiled once and then reused.
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived aiosqlite connections."""
+
+    def __init__(self, path: Path, size: int = DB_POOL_SIZE):
+        self.path = path
+        self.size = max(1, size)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._connections: List[aiosqlite.Connection] = []
+        self.write_lock = asyncio.Lock()
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE)
+        db.row_factory = aiosqlite.Row
+        for pragma in PRAGMAS:
+            await db.execute(pragma)
+        self._connections.append(db)
+        return db
+
+    async def open(self):
+        """Open all connections and apply pragmas."""
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._connect())
+
+    async def close(self):
+        """Close every connection owned by the pool."""
+        for db in self._connections:
+            await db.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+
+    async def _release(self, db: aiosqlite.Connection, rollback: bool):
+        """Return a connection to the pool with no transaction open.
+
+        A connection that cannot be rolled back is closed and replaced
+        rather than reused.
+        """
+        if rollback:
+            try:
+                await db.rollback()
+            except Exception as e:
+                print(f"Replacing pooled connection after failed rollback: {e}")
+                self._connections.remove(db)
+                try:
+                    await db.close()
+                except Exception:
+                    pass
+                db = await self._connect()
+        self._idle.put_nowait(db)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection, waiting if all are in use."""
+        db = await self._idle.get()
+        clean = False
+        try:
+            yield db
+            clean = True
+        finally:
+            # After an error or cancellation a statement (say, BEGIN) may
+            # still be running on the connection's thread, so in_transaction
+            # can't be trusted: always roll back, queued behind it. Shielded,
+            # so the connection only goes back once that has run.
+            await asyncio.shield(self._release(db, rollback=not clean or db.in_transaction))
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def open_pool(size: int = DB_POOL_SIZE) -> ConnectionPool:
+    """Create the shared connection pool (called from the app lifespan)."""
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            pool = ConnectionPool(DB_PATH, size)
+            await pool.open()
+            _pool = pool
+    return _pool
+
+
+async def close_pool():
+    """Close the shared connection pool."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def connection() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a pooled connection, opening the pool on first use."""
+    pool = _pool or await open_pool()
+    async with pool.acquire() as db:
+        yield db
+
+
+@asynccontextmanager
+async def transaction() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a pooled connection and run the block as one write transaction.
+
+    SQLite allows one writer at a time; queueing writers on an in-process
+    lock is much cheaper than letting them spin in SQLite's busy handler.
+    """
+    pool = _pool or await open_pool()
+    async with pool.write_lock:
+        async with pool.acquire() as db:
+            try:
+                await db.execute("BEGIN IMMEDIATE")
+                yield db
+                await db.commit()
+            except BaseException:
+                # Also on cancellation, which can land while BEGIN (or COMMIT)
+                # is still running on the connection's thread; the rollback
+                # is queued behind it and shielded so it always runs
+                await asyncio.shield(db.rollback())
+                raise
+
+
+async def _insert_many(db: aiosqlite.Connection, sql: str, rows: List[tuple]) -> List[int]:
+    """executemany an INSERT and return the new row ids in input order.
+
+    Must run inside a write transaction: holding the write lock means
+    AUTOINCREMENT hands out consecutive ids ending at last_insert_rowid().
+    """
+    if not rows:
+        return []
+    await db.executemany(sql, rows)
+    cursor = await db.execute("SELECT last_insert_rowid()")
+    last_id = (await cursor.fetchone())[0]
+    first_id = last_id - len(rows) + 1
+    return list(range(first_id, last_id + 1))
+
+
+SCHEMA_PATH = Path(__file__).parent / "schema.sql"
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def load_migrations() -> List[tuple]:
+    """Return (version, name, sql) for every migration, oldest first.
+
+    schema.sql is version 1; later changes live in migrations/NNN_name.sql.
+    """
+    migrations = [(1, SCHEMA_PATH.name, SCHEMA_PATH.read_text())]
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        version = int(path.name.split("_", 1)[0])
+        migrations.append((version, path.name, path.read_text()))
+    return migrations
 
 
 async def init_db():
-    """Initialize database with schema."""
-    schema_path = Path(__file__).parent / "schema.sql"
-    schema = schema_path.read_text()
-
+    """Bring the database schema up to date, applying pending migrations."""
     print(f"Initializing database at: {DB_PATH}")
     async with aiosqlite.connect(DB_PATH) as db:
-        await db.executescript(schema)
+        await db.execute("PRAGMA journal_mode = WAL")
+        await db.execute(
+            """CREATE TABLE IF NOT EXISTS schema_version (
+                   version INTEGER PRIMARY KEY,
+                   name TEXT NOT NULL,
+                   applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+               )"""
+        )
         await db.commit()
 
-
+        cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current = (await cursor.fetchone())[0]
+
+        for version, name, sql in load_migrations():
+            if version <= current:
+                continue
+            # Claiming the version row first makes a concurrent runner fail
+            # fast on the primary key instead of applying the migration twice
+            script = (
+                f"BEGIN IMMEDIATE;\n"
+                f"INSERT INTO schema_version (version, name) VALUES ({version}, '{name}');\n"
+                f"{sql}\n"
+                f"COMMIT;"
+            )
+            try:
+                await db.executescript(script)
+            except aiosqlite.IntegrityError:
+                await db.rollback()
+                continue
+            except Exception:
+                await db.rollback()
+                raise
+            print(f"Applied migration {name}")
+
+
+@timed(DB_QUERY_SECONDS, op="create_job")
 async def create_job(title: str, company: str, company_website: str, description: str, required_skills: List[str],
                      experience_level: str, location: str) -> int:
     """Create a new job posting."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection() as db:
         cursor = await db.execute(
             """INSERT INTO jobs (title, company, company_website, description, required_skills, experience_level, location)
                VALUES (?, ?, ?, ?, ?, ?, ?)""",
@@ -36,10 +235,10 @@ async def create_job(title: str, company: str, company_website: str, description
         return cursor.lastrowid
 
 
+@timed(DB_QUERY_SECONDS, op="get_job")
 async def get_job(job_id: int) -> Optional[Dict[str, Any]]:
     """Get job by ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with connection() as db:
         cursor = await db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
         row = await cursor.fetchone()
         if row:
@@ -47,71 +246,180 @@ async def get_job(job_id: int) -> Optional[Dict[str, Any]]:
         return None
 
 
-async def create_candidate(job_id: int, name: str, current_role: str, current_company: str,
-                          years_experience: int, skills: List[str], location: str,
-                          email: str, linkedin_summary: str, linkedin_url: str = None,
-                          company_website: str = None) -> int:
-    """Create a new candidate."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """INSERT INTO candidates
-               (job_id, name, current_role, current_company, years_experience,
-                skills, location, email, linkedin_summary, linkedin_url, company_website)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (job_id, name, current_role, current_company, years_experience,
-             json.dumps(skills), location, email, linkedin_summary, linkedin_url, company_website)
-        )
-        await db.commit()
-        return cursor.lastrowid
-
-
-async def create_match(job_id: int, candidate_id: int, score: int,
-                      key_highlights: List[str], fit_reasoning: str, rank_position: int) -> int:
-    """Create a match record."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """INSERT INTO matches
-               (job_id, candidate_id, score, key_highlights, fit_reasoning, rank_position)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (job_id, candidate_id, score, json.dumps(key_highlights), fit_reasoning, rank_position)
-        )
-        await db.commit()
-        return cursor.lastrowid
-
-
-async def get_next_candidate(job_id: int) -> Optional[Dict[str, Any]]:
-    """Get the highest-ranked pending candidate and mark as viewed."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-
-        # Get next pending candidate with highest rank
-        cursor = await db.execute(
-            """SELECT c.*, m.score, m.key_highlights, m.fit_reasoning, m.rank_position, m.id as match_id
-               FROM candidates c
-               JOIN matches m ON c.id = m.candidate_id
-               WHERE c.job_id = ? AND c.status = 'pending'
-               ORDER BY m.rank_position ASC
-               LIMIT 1""",
-            (job_id,)
-        )
-        row = await cursor.fetchone()
-
-        if row:
-            candidate = dict(row)
-            # Mark as viewed
-            await db.execute(
-                "UPDATE candidates SET status = 'viewed' WHERE id = ?",
-                (candidate['id'],)
+@timed(DB_QUERY_SECONDS, op="create_candidates_bulk")
+async def create_candidates_bulk(job_id: int, candidates: List[Dict[str, Any]],
+                                 db: aiosqlite.Connection = None,
+                                 embeddings: Optional[List[bytes]] = None) -> List[int]:
+    """Create many candidates in one transaction; returns ids in input order.
+
+    Pass `db` from `transaction()` to join a larger unit of work, and
+    `embeddings` (one blob per candidate) to store their vectors.
+    """
+    embeddings = embeddings or [None] * len(candidates)
+    rows = [
+        (job_id, c['name'], c['current_role'], c['current_company'], c['years_experience'],
+         c['skills'] if isinstance(c['skills'], str) else json.dumps(c['skills']),
+         c['location'], c['email'], c['linkedin_summary'],
+         c.get('linkedin_url'), c.get('company_website'), embedding)
+        for c, embedding in zip(candidates, embeddings)
+    ]
+    sql = """INSERT INTO candidates
+             (job_id, name, current_role, current_company, years_experience,
+              skills, location, email, linkedin_summary, linkedin_url, company_website, embedding)
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+    if db is not None:
+        return await _insert_many(db, sql, rows)
+    async with transaction() as db:
+        return await _insert_many(db, sql, rows)
+
+
+@timed(DB_QUERY_SECONDS, op="create_matches_bulk")
+async def create_matches_bulk(job_id: int, matches: List[Dict[str, Any]],
+                              db: aiosqlite.Connection = None) -> List[int]:
+    """Create many match records in one transaction; returns ids in input order.
+
+    Each match dict needs candidate_id, score, key_highlights, fit_reasoning
+    and rank_position. Also enqueues the candidates by setting their
+    rank_score, which get_next_candidate orders by.
+    """
+    if db is None:
+        async with transaction() as db:
+            # Unwrapped so the call is timed once, not twice
+            return await create_matches_bulk.__wrapped__(job_id, matches, db=db)
+
+    rows = [
+        (job_id, m['candidate_id'], m['score'], json.dumps(m['key_highlights']),
+         m['fit_reasoning'], m['rank_position'])
+        for m in matches
+    ]
+    match_ids = await _insert_many(
+        db,
+        """INSERT INTO matches
+           (job_id, candidate_id, score, key_highlights, fit_reasoning, rank_position)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        rows
+    )
+    await db.executemany(
+        "UPDATE candidates SET rank_score = ? WHERE id = ?",
+        [(m['score'], m['candidate_id']) for m in matches]
+    )
+    return match_ids
+
+
+async def _claim_window(db: aiosqlite.Connection, job_id: int, reviewer_id: Optional[str],
+                        limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+    """Claim up to `limit` cards in one UPDATE ... RETURNING; see claim_candidates."""
+    now = time.time()
+    params = {"job_id": job_id, "reviewer_id": reviewer_id, "now": now,
+              "expires": now + lease_seconds, "limit": limit}
+    # Best of: cards the reviewer already holds (kept first, so a client's
+    # buffer stays put), top pending cards, top cards whose lease has expired
+    cursor = await db.execute(
+        """UPDATE candidates
+           SET status = 'viewed', claimed_by = :reviewer_id, claim_expires_at = :expires
+           WHERE id IN (
+               SELECT id FROM (
+                   SELECT * FROM (
+                       SELECT id, rank_score, 1 AS held FROM candidates
+                       WHERE job_id = :job_id AND status = 'viewed' AND rank_score IS NOT NULL
+                         AND claimed_by = :reviewer_id AND claim_expires_at >= :now
+                       ORDER BY rank_score DESC, id ASC
+                       LIMIT :limit
+                   )
+                   UNION ALL
+                   SELECT * FROM (
+                       SELECT id, rank_score, 0 AS held FROM candidates
+                       WHERE job_id = :job_id AND status = 'pending' AND rank_score IS NOT NULL
+                       ORDER BY rank_score DESC, id ASC
+                       LIMIT :limit
+                   )
+                   UNION ALL
+                   SELECT * FROM (
+                       SELECT id, rank_score, 0 AS held FROM candidates
+                       WHERE job_id = :job_id AND status = 'viewed' AND rank_score IS NOT NULL
+                         AND claim_expires_at < :now
+                       ORDER BY rank_score DESC, id ASC
+                       LIMIT :limit
+                   )
+               )
+               ORDER BY held DESC, rank_score DESC, id ASC
+               LIMIT :limit
+           )
+           RETURNING id""",
+        params
+    )
+    ids = [row['id'] for row in await cursor.fetchall()]
+    if not ids:
+        return []
+
+    cursor = await db.execute(
+        f"""SELECT c.*, m.score, m.key_highlights, m.fit_reasoning, m.rank_position, m.id as match_id
+            FROM candidates c
+            JOIN matches m ON c.id = m.candidate_id
+            WHERE c.id IN ({','.join('?' * len(ids))})
+            ORDER BY c.rank_score DESC, c.id ASC""",
+        ids
+    )
+    return [dict(row) for row in await cursor.fetchall()]
+
+
+@timed(DB_QUERY_SECONDS, op="claim_candidates")
+async def claim_candidates(job_id: int, reviewer_id: str = None, limit: int = 1,
+                           lease_seconds: int = CLAIM_LEASE_SECONDS) -> List[Dict[str, Any]]:
+    """Atomically claim the next `limit` highest-ranked candidates for review.
+
+    Ranking is global across batches: best score first, earliest-sourced on
+    ties, served straight off idx_candidates_queue. The claim is a single
+    UPDATE ... RETURNING, so concurrent reviewers never get the same card.
+    Claimed cards are 'viewed' under a lease; once it expires they can be
+    claimed again. Cards the reviewer already holds a live lease on come
+    back first (with the lease renewed), so a repeated call returns the
+    same window topped up with new cards.
+    """
+    async with transaction() as db:
+        return await _claim_window(db, job_id, reviewer_id, limit, lease_seconds)
+
+
+@timed(DB_QUERY_SECONDS, op="get_next_candidate")
+async def get_next_candidate(job_id: int, reviewer_id: str = None,
+                             lease_seconds: int = CLAIM_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+    """Claim the single next candidate (see claim_candidates)."""
+    window = await claim_candidates(job_id, reviewer_id, limit=1, lease_seconds=lease_seconds)
+    return window[0] if window else None
+
+
+@timed(DB_QUERY_SECONDS, op="apply_decisions")
+async def apply_decisions(job_id: int, decisions: List[Tuple[int, str]], reviewer_id: str = None,
+                          limit: int = 1, lease_seconds: int = CLAIM_LEASE_SECONDS
+                          ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+    """Apply (candidate_id, status) decisions and claim the refreshed window.
+
+    Everything runs in one transaction: the status updates, the claim (as
+    claim_candidates) and the stats read. Decisions for candidates of
+    another job, or already contacted, are skipped. Returns the updated
+    candidate rows, the window and the job's stats.
+    """
+    async with transaction() as db:
+        applied = []
+        for candidate_id, status in decisions:
+            cursor = await db.execute(
+                """UPDATE candidates SET status = ?
+                   WHERE id = ? AND job_id = ? AND status != 'contacted'
+                   RETURNING *""",
+                (status, candidate_id, job_id)
             )
-            await db.commit()
-            return candidate
-
-        return None
+            row = await cursor.fetchone()
+            if row:
+                applied.append(dict(row))
+        window = await _claim_window(db, job_id, reviewer_id, limit, lease_seconds) if limit > 0 else []
+        stats = await _job_stats(db, job_id)
+    return applied, window, stats
 
 
+@timed(DB_QUERY_SECONDS, op="update_candidate_status")
 async def update_candidate_status(candidate_id: int, status: str):
     """Update candidate status."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection() as db:
         await db.execute(
             "UPDATE candidates SET status = ? WHERE id = ?",
             (status, candidate_id)
@@ -119,10 +427,10 @@ async def update_candidate_status(candidate_id: int, status: str):
         await db.commit()
 
 
+@timed(DB_QUERY_SECONDS, op="get_candidate")
 async def get_candidate(candidate_id: int) -> Optional[Dict[str, Any]]:
     """Get candidate by ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with connection() as db:
         cursor = await db.execute("SELECT * FROM candidates WHERE id = ?", (candidate_id,))
         row = await cursor.fetchone()
         if row:
@@ -130,10 +438,130 @@ async def get_candidate(candidate_id: int) -> Optional[Dict[str, Any]]:
         return None
 
 
+@timed(DB_QUERY_SECONDS, op="get_match_by_candidate_id")
+async def get_match_by_candidate_id(candidate_id: int) -> Optional[Dict[str, Any]]:
+    """Get match record by candidate ID."""
+    async with connection() as db:
+        cursor = await db.execute("SELECT * FROM matches WHERE candidate_id = ?", (candidate_id,))
+        row = await cursor.fetchone()
+        if row:
+            return dict(row)
+        return None
+
+
+# Fields of a by-status listing item, in output order, as SQL over a candidates row
+CANDIDATE_LIST_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "current_role": "current_role",
+    "current_company": "current_company",
+    "years_experience": "years_experience",
+    "skills": "json(skills)",
+    "location": "location",
+    "email": "email",
+    "linkedin_summary": "linkedin_summary",
+    "linkedin_url": "linkedin_url",
+    "company_website": "company_website",
+    "status": "status",
+    "score": "rank_score",
+    "key_highlights": "json_extract(card, '$.match.key_highlights')",
+}
+
+
+def _status_page_sql(select: str, after: Optional[Tuple[int, int]], end: Optional[Tuple[int, int]]) -> str:
+    """A page of a job's matched candidates with one status, in (score DESC,
+    id ASC) order, strictly after the `after` key and up to the `end` key.
+    Served off idx_candidates_queue (rank_score is the match score)."""
+    where = ["job_id = :job_id", "status = :status", "rank_score IS NOT NULL"]
+    if after is not None:
+        where.append("(rank_score < :after_score OR (rank_score = :after_score AND id > :after_id))")
+    if end is not None:
+        where.append("(rank_score > :end_score OR (rank_score = :end_score AND id <= :end_id))")
+    return f"""SELECT {select} FROM candidates
+               WHERE {' AND '.join(where)}
+               ORDER BY rank_score DESC, id ASC
+               LIMIT :limit OFFSET :offset"""
+
+
+def _status_page_params(job_id: int, status: str, limit: int, after: Optional[Tuple[int, int]],
+                        end: Optional[Tuple[int, int]] = None, offset: int = 0) -> Dict[str, Any]:
+    params = {"job_id": job_id, "status": status, "limit": limit, "offset": offset}
+    if after is not None:
+        params["after_score"], params["after_id"] = after
+    if end is not None:
+        params["end_score"], params["end_id"] = end
+    return params
+
+
+def _list_item_sql(fields: Optional[List[str]]) -> str:
+    fields = fields or list(CANDIDATE_LIST_FIELDS)
+    return "json_object(" + ", ".join(f"'{name}', {CANDIDATE_LIST_FIELDS[name]}" for name in fields) + ")"
+
+
+@timed(DB_QUERY_SECONDS, op="candidate_page_end")
+async def candidate_page_end(job_id: int, status: str, limit: int,
+                             after: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+    """The (score, id) key of the page's last row if more rows follow it
+    (the next page's cursor), else None. Walks only the index."""
+    async with connection() as db:
+        cursor = await db.execute(
+            _status_page_sql("rank_score, id", after, None),
+            _status_page_params(job_id, status, 2, after, offset=limit - 1)
+        )
+        rows = await cursor.fetchall()
+    return (rows[0]['rank_score'], rows[0]['id']) if len(rows) == 2 else None
+
+
+async def iter_candidates_by_status(job_id: int, status: str, limit: int,
+                                    after: Optional[Tuple[int, int]] = None,
+                                    end: Optional[Tuple[int, int]] = None,
+                                    fields: Optional[List[str]] = None,
+                                    chunk: int = 500) -> AsyncIterator[List[str]]:
+    """A page of candidates with the given status as ready-to-send JSON
+    objects (see CANDIDATE_LIST_FIELDS), `chunk` at a time.
+
+    Each chunk is its own keyset query on a briefly borrowed connection,
+    resuming after the previous chunk's last key, so a caller streaming a
+    large page to a slow client never holds a pooled connection meanwhile.
+    """
+    select = f"{_list_item_sql(fields)}, rank_score, id"
+    remaining = limit
+    while remaining != 0:
+        size = chunk if remaining < 0 else min(chunk, remaining)
+        async with connection() as db:
+            cursor = await db.execute(
+                _status_page_sql(select, after, end),
+                _status_page_params(job_id, status, size, after, end)
+            )
+            rows = await cursor.fetchall()
+        if rows:
+            yield [row[0] for row in rows]
+        if len(rows) < size:
+            break
+        after = (rows[-1]['rank_score'], rows[-1]['id'])
+        if remaining > 0:
+            remaining -= len(rows)
+
+
+@timed(DB_QUERY_SECONDS, op="list_candidates_by_status")
+async def list_candidates_by_status(job_id: int, status: str, limit: int = -1,
+                                    after: Optional[Tuple[int, int]] = None,
+                                    end: Optional[Tuple[int, int]] = None,
+                                    fields: Optional[List[str]] = None) -> List[str]:
+    """Get candidates for a job with the given status, best score first,
+    as ready-to-send JSON objects (all of them unless `limit` is given)."""
+    items = []
+    async for chunk in iter_candidates_by_status(job_id, status, limit, after, end, fields,
+                                                 chunk=limit if limit > 0 else 500):
+        items.extend(chunk)
+    return items
+
+
+@timed(DB_QUERY_SECONDS, op="create_outreach")
 async def create_outreach(job_id: int, candidate_id: int, subject: str, body: str,
                          delivery_status: str = "pending", error_message: str = None) -> int:
     """Create outreach record."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection() as db:
         cursor = await db.execute(
             """INSERT INTO outreach (job_id, candidate_id, subject, body, delivery_status, error_message)
                VALUES (?, ?, ?, ?, ?, ?)""",
@@ -143,10 +571,31 @@ async def create_outreach(job_id: int, candidate_id: int, subject: str, body: st
         return cursor.lastrowid
 
 
+@timed(DB_QUERY_SECONDS, op="create_outreach_bulk")
+async def create_outreach_bulk(job_id: int, outreach: List[Dict[str, Any]],
+                               db: aiosqlite.Connection = None) -> List[int]:
+    """Create many outreach records in one transaction; returns ids in input order.
+
+    Each dict needs candidate_id, subject and body; delivery_status defaults
+    to "pending".
+    """
+    rows = [
+        (job_id, o['candidate_id'], o['subject'], o['body'],
+         o.get('delivery_status', 'pending'), o.get('error_message'))
+        for o in outreach
+    ]
+    sql = """INSERT INTO outreach (job_id, candidate_id, subject, body, delivery_status, error_message)
+             VALUES (?, ?, ?, ?, ?, ?)"""
+    if db is not None:
+        return await _insert_many(db, sql, rows)
+    async with transaction() as db:
+        return await _insert_many(db, sql, rows)
+
+
+@timed(DB_QUERY_SECONDS, op="get_outreach")
 async def get_outreach(outreach_id: int) -> Optional[Dict[str, Any]]:
     """Get outreach record by ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with connection() as db:
         cursor = await db.execute("SELECT * FROM outreach WHERE id = ?", (outreach_id,))
         row = await cursor.fetchone()
         if row:
@@ -154,10 +603,10 @@ async def get_outreach(outreach_id: int) -> Optional[Dict[str, Any]]:
         return None
 
 
+@timed(DB_QUERY_SECONDS, op="get_outreach_by_candidate_id")
 async def get_outreach_by_candidate_id(candidate_id: int) -> Optional[Dict[str, Any]]:
     """Get outreach record by candidate ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with connection() as db:
         cursor = await db.execute("SELECT * FROM outreach WHERE candidate_id = ?", (candidate_id,))
         row = await cursor.fetchone()
         if row:
@@ -165,9 +614,10 @@ async def get_outreach_by_candidate_id(candidate_id: int) -> Optional[Dict[str,
         return None
 
 
+@timed(DB_QUERY_SECONDS, op="update_outreach_content")
 async def update_outreach_content(outreach_id: int, subject: str, body: str):
     """Update outreach content (e.g. after user edits)."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection() as db:
         await db.execute(
             """UPDATE outreach
                SET subject = ?, body = ?
@@ -177,10 +627,11 @@ async def update_outreach_content(outreach_id: int, subject: str, body: str):
         await db.commit()
 
 
+@timed(DB_QUERY_SECONDS, op="update_outreach_status")
 async def update_outreach_status(outreach_id: int, status: str, sent_at: datetime = None,
                                 error_message: str = None):
     """Update outreach delivery status."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection() as db:
         await db.execute(
             """UPDATE outreach
                SET delivery_status = ?, sent_at = ?, error_message = ?
@@ -190,27 +641,356 @@ async def update_outreach_status(outreach_id: int, status: str, sent_at: datetim
         await db.commit()
 
 
-async def get_job_stats(job_id: int) -> Dict[str, int]:
-    """Get statistics for a job."""
-    async with aiosqlite.connect(DB_PATH) as db:
+@timed(DB_QUERY_SECONDS, op="list_candidate_embeddings")
+async def list_candidate_embeddings(after_id: int, limit: int = 10000) -> List[Dict[str, Any]]:
+    """(id, job_id, embedding) of candidates after `after_id`, in id order.
+
+    Candidates saved before embeddings existed come back with the fields
+    needed to embed them and a NULL embedding.
+    """
+    async with connection() as db:
         cursor = await db.execute(
-            """SELECT
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
-                SUM(CASE WHEN status = 'viewed' THEN 1 ELSE 0 END) as viewed,
-                SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END) as accepted,
-                SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END) as rejected,
-                SUM(CASE WHEN status = 'contacted' THEN 1 ELSE 0 END) as contacted
-               FROM candidates
-               WHERE job_id = ?""",
+            """SELECT id, job_id, embedding,
+                      CASE WHEN embedding IS NULL THEN current_role END AS current_role,
+                      CASE WHEN embedding IS NULL THEN skills END AS skills,
+                      CASE WHEN embedding IS NULL THEN linkedin_summary END AS linkedin_summary
+               FROM candidates WHERE id > ? ORDER BY id LIMIT ?""",
+            (after_id, limit)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+@timed(DB_QUERY_SECONDS, op="set_candidate_embeddings")
+async def set_candidate_embeddings(rows: List[tuple]):
+    """Store (embedding, candidate_id) pairs."""
+    async with transaction() as db:
+        await db.executemany("UPDATE candidates SET embedding = ? WHERE id = ?", rows)
+
+
+@timed(DB_QUERY_SECONDS, op="get_candidates_by_ids")
+async def get_candidates_by_ids(candidate_ids: List[int]) -> List[Dict[str, Any]]:
+    """Candidate rows for `candidate_ids`, in the given order (missing ids skipped)."""
+    if not candidate_ids:
+        return []
+    async with connection() as db:
+        cursor = await db.execute(
+            f"SELECT * FROM candidates WHERE id IN ({', '.join('?' * len(candidate_ids))})",
+            candidate_ids
+        )
+        rows = {row['id']: dict(row) for row in await cursor.fetchall()}
+    return [rows[i] for i in candidate_ids if i in rows]
+
+
+@timed(DB_QUERY_SECONDS, op="list_upcoming_candidates")
+async def list_upcoming_candidates(job_id: int, limit: int) -> List[Dict[str, Any]]:
+    """The next `limit` pending candidates in serving order, with their match
+    and whether an outreach draft already exists (`has_pitch`)."""
+    async with connection() as db:
+        cursor = await db.execute(
+            """SELECT c.*, m.score, m.key_highlights, m.fit_reasoning,
+                      EXISTS (SELECT 1 FROM outreach o WHERE o.candidate_id = c.id) AS has_pitch
+               FROM candidates c
+               JOIN matches m ON m.candidate_id = c.id
+               WHERE c.job_id = ? AND c.status = 'pending' AND c.rank_score IS NOT NULL
+               ORDER BY c.rank_score DESC, c.id ASC
+               LIMIT ?""",
+            (job_id, limit)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+@timed(DB_QUERY_SECONDS, op="save_prefetched_pitch")
+async def save_prefetched_pitch(job_id: int, candidate_id: int, subject: str, body: str) -> Optional[int]:
+    """Store a prefetched pitch as a 'generated' draft; returns its id.
+
+    Nothing is stored (None) if the candidate was rejected meanwhile or
+    already has an outreach record.
+    """
+    async with transaction() as db:
+        cursor = await db.execute(
+            """INSERT INTO outreach (job_id, candidate_id, subject, body, delivery_status)
+               SELECT ?, ?, ?, ?, 'generated'
+               WHERE EXISTS (SELECT 1 FROM candidates WHERE id = ? AND status != 'rejected')
+                 AND NOT EXISTS (SELECT 1 FROM outreach WHERE candidate_id = ?)
+               RETURNING id""",
+            (job_id, candidate_id, subject, body, candidate_id, candidate_id)
+        )
+        row = await cursor.fetchone()
+    return row['id'] if row else None
+
+
+class LeaseLostError(Exception):
+    """The worker no longer holds the lease on a pipeline run."""
+
+
+@timed(DB_QUERY_SECONDS, op="enqueue_pipeline_run")
+async def enqueue_pipeline_run(job_id: int, requested: int) -> int:
+    """Queue a pipeline run for `requested` candidates; returns its id."""
+    now = time.time()
+    async with transaction() as db:
+        cursor = await db.execute(
+            """INSERT INTO pipeline_runs (job_id, requested, state, created_at, updated_at)
+               VALUES (?, ?, 'queued', ?, ?)""",
+            (job_id, requested, now, now)
+        )
+        return cursor.lastrowid
+
+
+@timed(DB_QUERY_SECONDS, op="claim_pipeline_run")
+async def claim_pipeline_run(worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+    """Atomically lease the oldest runnable run: queued, or running with an expired lease."""
+    now = time.time()
+    async with transaction() as db:
+        cursor = await db.execute(
+            """UPDATE pipeline_runs
+               SET state = 'running', claimed_by = :worker_id, lease_expires_at = :expires,
+                   attempts = attempts + 1, updated_at = :now
+               WHERE id = (
+                   SELECT MIN(id) FROM (
+                       SELECT * FROM (
+                           SELECT id FROM pipeline_runs WHERE state = 'queued' ORDER BY id LIMIT 1
+                       )
+                       UNION ALL
+                       SELECT * FROM (
+                           SELECT id FROM pipeline_runs
+                           WHERE state = 'running' AND lease_expires_at < :now
+                           ORDER BY id LIMIT 1
+                       )
+                   )
+               )
+               RETURNING *""",
+            {"worker_id": worker_id, "now": now, "expires": now + lease_seconds}
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+
+@timed(DB_QUERY_SECONDS, op="renew_pipeline_run_lease")
+async def renew_pipeline_run_lease(run_id: int, worker_id: str, lease_seconds: float) -> bool:
+    """Extend a held lease; False if the run was taken over or finished."""
+    now = time.time()
+    async with transaction() as db:
+        cursor = await db.execute(
+            """UPDATE pipeline_runs SET lease_expires_at = ?, updated_at = ?
+               WHERE id = ? AND claimed_by = ? AND state = 'running'""",
+            (now + lease_seconds, now, run_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+
+async def checkpoint_pipeline_run(db: aiosqlite.Connection, run_id: int, worker_id: str,
+                                  candidates: int, lease_seconds: float):
+    """Record a saved batch inside the transaction that saved it.
+
+    Raises LeaseLostError (rolling the batch back with it) if another worker
+    has taken the run over, so a batch is never counted twice.
+    """
+    now = time.time()
+    cursor = await db.execute(
+        """UPDATE pipeline_runs
+           SET produced = produced + ?, batches_completed = batches_completed + 1,
+               lease_expires_at = ?, updated_at = ?
+           WHERE id = ? AND claimed_by = ? AND state = 'running'""",
+        (candidates, now + lease_seconds, now, run_id, worker_id)
+    )
+    if cursor.rowcount != 1:
+        raise LeaseLostError(f"Lease on pipeline run {run_id} lost")
+
+
+@timed(DB_QUERY_SECONDS, op="finish_pipeline_run")
+async def finish_pipeline_run(run_id: int, worker_id: str, state: str, error: str = None) -> bool:
+    """Move a held run to 'done', 'failed' or back to 'queued' (to retry)."""
+    now = time.time()
+    async with transaction() as db:
+        cursor = await db.execute(
+            """UPDATE pipeline_runs
+               SET state = ?, error = ?, claimed_by = NULL, lease_expires_at = NULL, updated_at = ?,
+                   finished_at = CASE WHEN ? IN ('done', 'failed') THEN ? END
+               WHERE id = ? AND claimed_by = ? AND state = 'running'""",
+            (state, error, now, state, now, run_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+
+@timed(DB_QUERY_SECONDS, op="release_pipeline_runs")
+async def release_pipeline_runs(worker_id: str) -> int:
+    """Requeue every run a worker holds (on graceful shutdown)."""
+    async with transaction() as db:
+        cursor = await db.execute(
+            """UPDATE pipeline_runs
+               SET state = 'queued', claimed_by = NULL, lease_expires_at = NULL, updated_at = ?
+               WHERE claimed_by = ? AND state = 'running'""",
+            (time.time(), worker_id)
+        )
+        return cursor.rowcount
+
+
+@timed(DB_QUERY_SECONDS, op="get_pipeline_run")
+async def get_pipeline_run(run_id: int) -> Optional[Dict[str, Any]]:
+    """A pipeline run by id, or None."""
+    async with connection() as db:
+        cursor = await db.execute("SELECT * FROM pipeline_runs WHERE id = ?", (run_id,))
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+
+@timed(DB_QUERY_SECONDS, op="list_pipeline_runs")
+async def list_pipeline_runs(job_id: int) -> List[Dict[str, Any]]:
+    """A job's runs, newest first."""
+    async with connection() as db:
+        cursor = await db.execute(
+            "SELECT * FROM pipeline_runs WHERE job_id = ? ORDER BY id DESC",
             (job_id,)
         )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+@timed(DB_QUERY_SECONDS, op="append_pipeline_events")
+async def append_pipeline_events(events: List[Dict[str, Any]]):
+    """Persist events ({job_id, type, data}) for API processes to relay."""
+    now = time.time()
+    async with transaction() as db:
+        await db.executemany(
+            "INSERT INTO pipeline_events (job_id, type, data, created_at) VALUES (?, ?, ?, ?)",
+            [(e['job_id'], e['type'], json.dumps(e['data']), now) for e in events]
+        )
+
+
+@timed(DB_QUERY_SECONDS, op="list_pipeline_events_after")
+async def list_pipeline_events_after(after_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+    """Persisted events newer than `after_id`, oldest first."""
+    async with connection() as db:
+        cursor = await db.execute(
+            "SELECT * FROM pipeline_events WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+@timed(DB_QUERY_SECONDS, op="latest_pipeline_event_id")
+async def latest_pipeline_event_id() -> int:
+    """Id of the newest pipeline event, 0 if there are none."""
+    async with connection() as db:
+        cursor = await db.execute("SELECT COALESCE(MAX(id), 0) FROM pipeline_events")
+        return (await cursor.fetchone())[0]
+
+
+@timed(DB_QUERY_SECONDS, op="prune_pipeline_events")
+async def prune_pipeline_events(older_than: float) -> int:
+    """Delete persisted events created before `older_than` (unix time)."""
+    async with transaction() as db:
+        cursor = await db.execute("DELETE FROM pipeline_events WHERE created_at < ?", (older_than,))
+        return cursor.rowcount
+
+
+@timed(DB_QUERY_SECONDS, op="rate_limit_acquire")
+async def rate_limit_acquire(key: str, now: float, interval: float, window: float) -> float:
+    """GCRA step for one key (see rate_limiter.py): 0 if the request is
+    allowed (and recorded), else seconds until it would be."""
+    params = {"key": key, "now": now, "interval": interval, "window": window}
+    async with transaction() as db:
+        cursor = await db.execute(
+            """INSERT INTO rate_limits (key, tat) VALUES (:key, :now + :interval)
+               ON CONFLICT (key) DO UPDATE SET tat = max(tat, :now) + :interval
+               WHERE max(tat, :now) + :interval - :now <= :window
+               RETURNING tat""",
+            params
+        )
+        if await cursor.fetchone():
+            return 0.0
+        cursor = await db.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,))
         row = await cursor.fetchone()
-        return {
-            "total": row[0] or 0,
-            "pending": row[1] or 0,
-            "viewed": row[2] or 0,
-            "accepted": row[3] or 0,
-            "rejected": row[4] or 0,
-            "contacted": row[5] or 0
-        }
+    return max(row['tat'], now) + interval - now - window
+
+
+@timed(DB_QUERY_SECONDS, op="prune_rate_limits")
+async def prune_rate_limits(now: float) -> int:
+    """Drop rate limiter keys that have been idle long enough to hold no state."""
+    async with transaction() as db:
+        cursor = await db.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+        return cursor.rowcount
+
+
+STAT_COLUMNS = ("total", "pending", "viewed", "accepted", "rejected", "contacted")
+
+
+async def _job_stats(db: aiosqlite.Connection, job_id: int) -> Dict[str, Any]:
+    cursor = await db.execute(
+        """SELECT total, pending, viewed, accepted, rejected, contacted, duplicates
+           FROM job_stats
+           WHERE job_id = ?""",
+        (job_id,)
+    )
+    row = await cursor.fetchone()
+    stats = dict(row) if row else {column: 0 for column in STAT_COLUMNS + ("duplicates",)}
+    sourced = stats['total'] + stats['duplicates']
+    stats['dedup_rate'] = round(stats['duplicates'] / sourced, 4) if sourced else 0.0
+    return stats
+
+
+@timed(DB_QUERY_SECONDS, op="get_job_stats")
+async def get_job_stats(job_id: int) -> Dict[str, Any]:
+    """Get statistics for a job (maintained by triggers on candidates).
+
+    Also reports sourced profiles dropped as duplicates, and their share
+    of everything sourced (dedup_rate).
+    """
+    async with connection() as db:
+        return await _job_stats(db, job_id)
+
+
+@timed(DB_QUERY_SECONDS, op="add_job_duplicates")
+async def add_job_duplicates(job_id: int, count: int, db: aiosqlite.Connection = None):
+    """Count sourced profiles dropped as duplicates of the job's candidates."""
+    sql = """INSERT INTO job_stats (job_id, duplicates) VALUES (?, ?)
+             ON CONFLICT (job_id) DO UPDATE SET duplicates = duplicates + excluded.duplicates"""
+    if db is not None:
+        await db.execute(sql, (job_id, count))
+        return
+    async with transaction() as db:
+        await db.execute(sql, (job_id, count))
+
+
+@timed(DB_QUERY_SECONDS, op="check_job_stats")
+async def check_job_stats(rebuild: bool = False) -> List[Dict[str, Any]]:
+    """Compare job_stats with a fresh aggregate over candidates.
+
+    Returns one entry per job whose counters have drifted, with the stored
+    and actual values. With rebuild=True, drifted rows are overwritten with
+    the actual counts in the same transaction.
+    """
+    async with transaction() as db:
+        cursor = await db.execute(
+            """SELECT job_id,
+                      COUNT(*) AS total,
+                      SUM(status IS 'pending') AS pending,
+                      SUM(status IS 'viewed') AS viewed,
+                      SUM(status IS 'accepted') AS accepted,
+                      SUM(status IS 'rejected') AS rejected,
+                      SUM(status IS 'contacted') AS contacted
+               FROM candidates
+               GROUP BY job_id"""
+        )
+        actual = {row['job_id']: dict(row) for row in await cursor.fetchall()}
+        cursor = await db.execute("SELECT * FROM job_stats")
+        stored = {row['job_id']: dict(row) for row in await cursor.fetchall()}
+
+        drifted = []
+        for job_id in sorted(actual.keys() | stored.keys()):
+            zero = {"job_id": job_id, **{column: 0 for column in STAT_COLUMNS}}
+            expected = actual.get(job_id, zero)
+            current = stored.get(job_id, zero)
+            if any(expected[column] != current[column] for column in STAT_COLUMNS):
+                drifted.append({"job_id": job_id, "stored": current, "actual": expected})
+
+        if rebuild and drifted:
+            await db.executemany(
+                """INSERT INTO job_stats (job_id, total, pending, viewed, accepted, rejected, contacted)
+                   VALUES (:job_id, :total, :pending, :viewed, :accepted, :rejected, :contacted)
+                   ON CONFLICT (job_id) DO UPDATE SET
+                       total = excluded.total, pending = excluded.pending, viewed = excluded.viewed,
+                       accepted = excluded.accepted, rejected = excluded.rejected,
+                       contacted = excluded.contacted""",
+                [entry["actual"] for entry in drifted]
+            )
+        return drifted
@@ -0,0 +1,170 @@
+"""Per-job candidate deduplication across batches and source-more runs.
+
+Each sourced profile is reduced to up to three keys: normalized email,
+normalized LinkedIn URL, and a fuzzy name+company fingerprint (first and
+last name without titles, middle names, accents or punctuation; company
+without legal suffixes). A profile sharing any key with one already
+seen for the job is a duplicate.
+
+Keys of saved candidates live in candidate_keys (migrations/009), whose
+primary key is the source of truth across processes. Active jobs also
+keep their keys in memory, so sourcing can drop duplicates as they stream
+in, before any matching or pitch call is paid for.
+"""
+
+import asyncio
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from database import connection, transaction
+from metrics import Counter
+
+ACTIVE_JOBS = int(os.environ.get("DEDUP_ACTIVE_JOBS", "256"))
+
+Key = Tuple[str, str]  # (kind, normalized value)
+
+CANDIDATES_DEDUPLICATED = Counter("pipeline_candidates_deduplicated_total",
+                                  "Sourced profiles dropped as duplicates, by the key that matched", ["key"])
+
+_NAME_AFFIXES = {"dr", "mr", "mrs", "ms", "miss", "prof", "jr", "sr", "ii", "iii", "iv", "phd", "md", "mba"}
+_COMPANY_SUFFIXES = {"inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+                     "gmbh", "plc", "ag", "sa", "bv", "the"}
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(value: str) -> List[str]:
+    ascii_value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode()
+    return _WORD.findall(ascii_value.lower())
+
+
+def normalize_email(email: str) -> Optional[str]:
+    """Lowercased address without a +tag; None if it is not an address."""
+    email = (email or "").strip().lower()
+    local, at, domain = email.partition("@")
+    if not at or not local or "." not in domain:
+        return None
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def normalize_linkedin(url: str) -> Optional[str]:
+    """linkedin.com/in/<slug> form (no scheme, www, query or trailing slash); None if not a profile URL."""
+    url = (url or "").strip().lower()
+    url = re.sub(r"^[a-z]+://", "", url).split("?", 1)[0].split("#", 1)[0].rstrip("/")
+    if url.startswith("www."):
+        url = url[4:]
+    return url if url.startswith("linkedin.com/") and len(url) > len("linkedin.com/in/") else None
+
+
+def name_company_fingerprint(name: str, company: str) -> Optional[str]:
+    """First and last name at company, e.g. 'jane doe|acme' for 'Dr. Jane A. Doe' at 'Acme, Inc.'."""
+    names = [w for w in _words(name) if w not in _NAME_AFFIXES]
+    companies = [w for w in _words(company) if w not in _COMPANY_SUFFIXES]
+    if not names or not companies:
+        return None
+    return f"{names[0]} {names[-1]}|{' '.join(companies)}"
+
+
+def candidate_keys(candidate: Dict[str, Any]) -> List[Key]:
+    keys = []
+    email = normalize_email(candidate.get('email'))
+    if email:
+        keys.append(("email", email))
+    linkedin = normalize_linkedin(candidate.get('linkedin_url'))
+    if linkedin:
+        keys.append(("linkedin", linkedin))
+    fingerprint = name_company_fingerprint(candidate.get('name'), candidate.get('current_company'))
+    if fingerprint:
+        keys.append(("name_company", fingerprint))
+    return keys
+
+
+async def find_existing_keys(job_id: int, keys: Iterable[Key], db=None) -> Set[Key]:
+    """Which of `keys` are already taken by a saved candidate of the job."""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return set()
+    sql = (f"SELECT kind, key FROM candidate_keys WHERE job_id = ? AND (kind, key) IN "
+           f"(VALUES {', '.join(['(?, ?)'] * len(keys))})")
+    params = [job_id] + [part for key in keys for part in key]
+    if db is not None:
+        cursor = await db.execute(sql, params)
+        return {tuple(row) for row in await cursor.fetchall()}
+    async with connection() as db:
+        cursor = await db.execute(sql, params)
+        return {tuple(row) for row in await cursor.fetchall()}
+
+
+async def save_keys(db, job_id: int, rows: List[Tuple[str, str, int]]):
+    """Record (kind, key, candidate_id) rows inside the batch's save transaction."""
+    await db.executemany(
+        "INSERT OR IGNORE INTO candidate_keys (job_id, kind, key, candidate_id) VALUES (?, ?, ?, ?)",
+        [(job_id, kind, key, candidate_id) for kind, key, candidate_id in rows]
+    )
+
+
+async def _load_keys(job_id: int) -> Set[Key]:
+    """A job's saved keys, backfilling candidates saved before the index existed."""
+    async with connection() as db:
+        cursor = await db.execute("SELECT kind, key FROM candidate_keys WHERE job_id = ?", (job_id,))
+        keys = {tuple(row) for row in await cursor.fetchall()}
+        cursor = await db.execute(
+            """SELECT id, name, current_company, email, linkedin_url FROM candidates
+               WHERE job_id = ? AND NOT EXISTS (
+                   SELECT 1 FROM candidate_keys k WHERE k.candidate_id = candidates.id
+               )""",
+            (job_id,)
+        )
+        missing = [dict(row) for row in await cursor.fetchall()]
+    if missing:
+        rows = [(kind, key, c['id']) for c in missing for kind, key in candidate_keys(c)]
+        async with transaction() as db:
+            await save_keys(db, job_id, rows)
+        keys.update((kind, key) for kind, key, _ in rows)
+    return keys
+
+
+class DedupIndex:
+    """In-memory key sets for the most recently active jobs."""
+
+    def __init__(self, active_jobs: int = ACTIVE_JOBS):
+        self.active_jobs = active_jobs
+        self._jobs: "OrderedDict[int, Set[Key]]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+
+    async def _keys(self, job_id: int) -> Set[Key]:
+        keys = self._jobs.get(job_id)
+        if keys is not None:
+            self._jobs.move_to_end(job_id)
+            return keys
+        # One load per job even when several sourcing workers ask at once
+        loading = self._loading.get(job_id)
+        if loading is None:
+            loading = self._loading[job_id] = asyncio.ensure_future(_load_keys(job_id))
+            loading.add_done_callback(lambda _: self._loading.pop(job_id, None))
+        keys = await asyncio.shield(loading)
+        # Concurrent callers share the loaded set rather than each storing a copy
+        keys = self._jobs.setdefault(job_id, keys)
+        while len(self._jobs) > max(1, self.active_jobs):
+            self._jobs.popitem(last=False)
+        return keys
+
+    async def admit(self, job_id: int, candidate: Dict[str, Any]) -> Optional[str]:
+        """Reserve the candidate's keys; returns the matching key kind if it is a duplicate."""
+        keys = await self._keys(job_id)
+        own = candidate_keys(candidate)
+        for key in own:
+            if key in keys:
+                CANDIDATES_DEDUPLICATED.labels(key=key[0]).inc()
+                return key[0]
+        keys.update(own)
+        return None
+
+    def forget(self, job_id: int):
+        """Drop a job's keys (e.g. after a failed run left reservations unsaved)."""
+        self._jobs.pop(job_id, None)
+
+
+dedup_index = DedupIndex()
@@ -0,0 +1,210 @@
+"""Hashed bag-of-words embeddings and a NumPy vector index.
+
+Profiles and jobs are embedded into the same space without a model:
+tokens from the role/title, skills and summary/description are hashed
+(crc32, signed) into EMBEDDING_DIM buckets with per-field weights and
+L2-normalized, so cosine similarity is a dot product. Skills also get a
+whole-skill token, so "Node.js" matches "Node.js" and not just "node".
+
+VectorIndex stores vectors as float16 and searches brute force in
+chunks, or, once trained, IVF-style: rows are bucketed under k-means
+centroids and a query scans only the `nprobe` nearest buckets.
+"""
+
+import json
+import os
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_DIM = int(os.environ.get("EMBEDDING_DIM", "256"))
+
+# Field weights: skills say most about fit, then role, then free text
+SKILL_WEIGHT = 2.0
+ROLE_WEIGHT = 1.5
+TEXT_WEIGHT = 1.0
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the their to we with who will "
+    "you your years year experience team teams work working role".split()
+)
+# Brute-force scan granularity: bounds the float32 copy made per step
+_CHUNK_ROWS = 65536
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+def _skill_list(skills: Any) -> List[str]:
+    return json.loads(skills) if isinstance(skills, str) else list(skills or [])
+
+
+def _weighted_tokens(role: str, skills: Iterable[str], text: str) -> List[Tuple[str, float]]:
+    weighted = [(token, ROLE_WEIGHT) for token in _tokens(role)]
+    for skill in skills:
+        weighted.append(("skill:" + re.sub(r"[^a-z0-9+#]", "", skill.lower()), SKILL_WEIGHT))
+        weighted.extend((token, TEXT_WEIGHT) for token in _tokens(skill))
+    weighted.extend((token, TEXT_WEIGHT) for token in _tokens(text))
+    return weighted
+
+
+def _embed(docs: List[List[Tuple[str, float]]], dim: int) -> np.ndarray:
+    rows, cols, values = [], [], []
+    for row, doc in enumerate(docs):
+        for token, weight in doc:
+            h = zlib.crc32(token.encode())
+            rows.append(row)
+            cols.append(h % dim)
+            values.append(weight if h & 0x80000000 else -weight)
+    vectors = np.zeros((len(docs), dim), dtype=np.float32)
+    np.add.at(vectors, (rows, cols), values)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def embed_candidates(candidates: List[Dict[str, Any]], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """(n, dim) unit vectors over role, skills and LinkedIn summary."""
+    return _embed([_weighted_tokens(c.get('current_role'), _skill_list(c.get('skills')), c.get('linkedin_summary'))
+                   for c in candidates], dim)
+
+
+def embed_job(job: Dict[str, Any], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Unit vector for a job in the candidates' space (title ~ role, description ~ summary)."""
+    return _embed([_weighted_tokens(job.get('title'), _skill_list(job.get('required_skills')),
+                                    job.get('description'))], dim)[0]
+
+
+def to_blob(vector: np.ndarray) -> bytes:
+    return vector.astype(np.float16).tobytes()
+
+
+def blob_fits(blob: Optional[bytes], dim: int = EMBEDDING_DIM) -> bool:
+    """Whether a stored blob is a vector of the current dimension."""
+    return blob is not None and len(blob) == dim * 2
+
+
+def from_blobs(blobs: List[bytes], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    return np.frombuffer(b"".join(blobs), dtype=np.float16).reshape(len(blobs), dim)
+
+
+class VectorIndex:
+    """Append-only cosine index of (id, job_id, vector) rows."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.size = 0
+        self._vectors = np.zeros((1024, dim), dtype=np.float16)
+        self._ids = np.zeros(1024, dtype=np.int64)
+        self._jobs = np.zeros(1024, dtype=np.int64)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+
+    def add(self, ids: Iterable[int], job_ids: Iterable[int], vectors: np.ndarray):
+        ids = np.asarray(list(ids), dtype=np.int64)
+        job_ids = np.asarray(list(job_ids), dtype=np.int64)
+        n = len(ids)
+        if self.size + n > len(self._ids):
+            capacity = max(self.size + n, 2 * len(self._ids))
+            for name in ("_vectors", "_ids", "_jobs"):
+                old = getattr(self, name)
+                new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, name, new)
+        start = self.size
+        self._vectors[start:start + n] = vectors
+        self._ids[start:start + n] = ids
+        self._jobs[start:start + n] = job_ids
+        self.size += n
+        if self._centroids is not None:
+            self._assign(self._centroids, self._lists, start, self.size)
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def train(self, nlist: int, iterations: int = 10, sample: int = 50_000, seed: int = 0):
+        """Cluster a sample with k-means and bucket every row under its centroid.
+
+        The buckets are built before they are published, so searches may
+        run (brute force) while this trains in a thread; rows must not be
+        added until it returns.
+        """
+        rng = np.random.default_rng(seed)
+        size = self.size
+        rows = rng.choice(size, size=min(sample, size), replace=False)
+        data = self._vectors[rows].astype(np.float32)
+        centroids = data[rng.choice(len(data), size=min(nlist, len(data)), replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = data[assignment == c]
+                if len(members):
+                    mean = members.mean(axis=0)
+                    centroids[c] = mean / (np.linalg.norm(mean) or 1)
+        lists: List[List[int]] = [[] for _ in range(len(centroids))]
+        self._assign(centroids, lists, 0, size)
+        self._list_arrays = {}
+        self._lists = lists
+        self._centroids = centroids
+
+    def _assign(self, centroids: np.ndarray, lists: List[List[int]], start: int, stop: int):
+        for offset in range(start, stop, _CHUNK_ROWS):
+            end = min(stop, offset + _CHUNK_ROWS)
+            nearest = np.argmax(self._vectors[offset:end].astype(np.float32) @ centroids.T, axis=1)
+            for c in np.unique(nearest):
+                lists[c].extend((offset + np.flatnonzero(nearest == c)).tolist())
+                self._list_arrays.pop(int(c), None)
+
+    def _candidate_rows(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        probe = np.argsort(-(self._centroids @ query))[:nprobe]
+        arrays = []
+        for c in probe:
+            c = int(c)
+            if c not in self._list_arrays:
+                self._list_arrays[c] = np.asarray(self._lists[c], dtype=np.int64)
+            arrays.append(self._list_arrays[c])
+        return np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int64)
+
+    def search(self, query: np.ndarray, k: int, exclude_job: int = None,
+               nprobe: int = 0) -> List[Tuple[int, int, float]]:
+        """Top-k (id, job_id, cosine) rows, best first.
+
+        nprobe > 0 on a trained index scans only that many IVF buckets;
+        otherwise every row is scored.
+        """
+        query = query.astype(np.float32)
+        if self.size == 0 or k <= 0:
+            return []
+        if nprobe and self.trained:
+            rows = self._candidate_rows(query, nprobe)
+            scores = self._vectors[rows].astype(np.float32) @ query
+            if exclude_job is not None:
+                scores[self._jobs[rows] == exclude_job] = -np.inf
+            return self._top(rows, scores, k)
+
+        best_rows, best_scores = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        for offset in range(0, self.size, _CHUNK_ROWS):
+            end = min(self.size, offset + _CHUNK_ROWS)
+            scores = self._vectors[offset:end].astype(np.float32) @ query
+            if exclude_job is not None:
+                scores[self._jobs[offset:end] == exclude_job] = -np.inf
+            if len(scores) > k:
+                keep = np.argpartition(-scores, k)[:k]
+            else:
+                keep = np.arange(len(scores))
+            best_rows = np.concatenate([best_rows, offset + keep])
+            best_scores = np.concatenate([best_scores, scores[keep]])
+        return self._top(best_rows, best_scores, k)
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, int, float]]:
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k)[:k]
+            rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(self._ids[rows[i]]), int(self._jobs[rows[i]]), float(scores[i]))
+                for i in order if np.isfinite(scores[i])]
@@ -0,0 +1,171 @@
+"""In-process pub/sub for pipeline progress events.
+
+Publishers (the pipeline) never block: each subscriber has a bounded
+buffer, and a subscriber that falls behind is closed rather than slowing
+everyone down. Recent events are kept per job so a reconnecting client can
+replay what it missed from its Last-Event-ID.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+HISTORY_SIZE = int(os.environ.get("EVENTS_HISTORY_SIZE", "256"))
+HISTORY_JOBS = int(os.environ.get("EVENTS_HISTORY_JOBS", "1000"))
+SUBSCRIBER_BUFFER = int(os.environ.get("EVENTS_SUBSCRIBER_BUFFER", "64"))
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_RETRY_MS = 3000
+
+# Event types published for a job
+BATCH_SOURCED = "batch_sourced"
+BATCH_MATCHED = "batch_matched"
+PITCH_READY = "pitch_ready"
+PIPELINE_DONE = "pipeline_done"
+PIPELINE_FAILED = "pipeline_failed"
+
+
+class Event:
+    """One published event; `id` increases monotonically across the bus."""
+
+    __slots__ = ("id", "job_id", "type", "data")
+
+    def __init__(self, id: int, job_id: int, type: str, data: Dict[str, Any]):
+        self.id = id
+        self.job_id = job_id
+        self.type = type
+        self.data = data
+
+    def to_sse(self) -> str:
+        """Encode as a Server-Sent Events frame."""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class Subscription:
+    """A subscriber's bounded view of one job's events."""
+
+    def __init__(self, bus: "EventBus", job_id: int, buffer: int):
+        self.bus = bus
+        self.job_id = job_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        self.overflowed = False
+
+    def _offer(self, event: Event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: end the stream so the client reconnects
+            # and replays from history instead of silently missing events
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Next event, or None on timeout. Raises OverflowError once lagged."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is None:
+            raise OverflowError("Subscriber fell behind")
+        return event
+
+    def close(self):
+        self.bus._unsubscribe(self)
+
+
+class EventBus:
+    """Fans pipeline events out to per-job subscribers."""
+
+    def __init__(self, history_size: int = HISTORY_SIZE, subscriber_buffer: int = SUBSCRIBER_BUFFER,
+                 history_jobs: int = HISTORY_JOBS):
+        self.history_size = history_size
+        self.subscriber_buffer = subscriber_buffer
+        self.history_jobs = history_jobs
+        self._ids = itertools.count(1)
+        # Per-job replay buffers, least recently published first
+        self._history: "OrderedDict[int, Deque[Event]]" = OrderedDict()
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._listeners: List[Callable[[Event], None]] = []
+
+    def add_listener(self, listener: Callable[[Event], None]):
+        """Also hand every published event to `listener` (must not block)."""
+        self._listeners.append(listener)
+
+    def publish(self, job_id: int, type: str, **data) -> Event:
+        """Record an event and hand it to every subscriber of the job."""
+        event = Event(next(self._ids), job_id, type, {"job_id": job_id, **data})
+        history = self._history.get(job_id)
+        if history is None:
+            history = self._history[job_id] = deque(maxlen=self.history_size)
+            if len(self._history) > self.history_jobs:
+                self._history.popitem(last=False)
+        else:
+            self._history.move_to_end(job_id)
+        history.append(event)
+        for subscription in self._subscribers.get(job_id, ()):
+            subscription._offer(event)
+        for listener in self._listeners:
+            listener(event)
+        return event
+
+    def subscribe(self, job_id: int) -> Subscription:
+        subscription = Subscription(self, job_id, self.subscriber_buffer)
+        self._subscribers.setdefault(job_id, set()).add(subscription)
+        return subscription
+
+    def replay(self, job_id: int, last_event_id: Optional[int]) -> List[Event]:
+        """Events for the job newer than `last_event_id` (all kept ones if None).
+
+        An id newer than anything published (e.g. from before a restart)
+        replays the whole history.
+        """
+        history = list(self._history.get(job_id, ()))
+        if last_event_id is None or not history or last_event_id > history[-1].id:
+            return history
+        return [event for event in history if event.id > last_event_id]
+
+    def subscriber_count(self, job_id: int = None) -> int:
+        if job_id is not None:
+            return len(self._subscribers.get(job_id, ()))
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def _unsubscribe(self, subscription: Subscription):
+        subs = self._subscribers.get(subscription.job_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self._subscribers[subscription.job_id]
+
+
+async def sse_stream(bus: EventBus, job_id: int, last_event_id: Optional[int] = None,
+                     heartbeat: float = SSE_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """Server-Sent Events frames for a job: missed events, then live ones.
+
+    Sends a comment line as heartbeat when idle so proxies keep the
+    connection open. Ends if the subscriber overflows its buffer; the
+    browser then reconnects with Last-Event-ID and replays from history.
+    """
+    # Subscribe and snapshot history with no await in between, so no event
+    # can fall into the gap or be delivered twice
+    subscription = bus.subscribe(job_id)
+    backlog = bus.replay(job_id, last_event_id)
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        for event in backlog:
+            yield event.to_sse()
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            yield ": heartbeat\n\n" if event is None else event.to_sse()
+    except OverflowError:
+        return
+    finally:
+        subscription.close()
+
+
+event_bus = EventBus()
@@ -0,0 +1,306 @@
+"""Offline stand-in for the Gemini client (LLM_BACKEND=fake).
+
+Implements the part of the google-genai interface the agents use
+(`client.aio.models.generate_content` and `generate_content_stream`) and
+answers with JSON that satisfies the request's response schema. Content
+is derived from the prompt: sourcing returns as many profiles as asked
+for with a mix of strong/medium/weak skill fits, matching scores every
+"Candidate Index" by overlap with the required skills, and pitches
+address the named candidate.
+
+Responses are seeded by (FAKE_LLM_SEED, prompt, how many times that prompt
+was seen), so a run is reproducible regardless of how calls interleave.
+Latency is log-normal around FAKE_LLM_LATENCY_MS plus output tokens at
+FAKE_LLM_TOKENS_PER_SECOND; FAKE_LLM_ERROR_RATE injects 429/503 errors.
+FAKE_LLM_MAX_OUTPUT_TOKENS (or the request's max_output_tokens) cuts
+longer responses off mid-JSON, as a model hitting its output limit does.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from google.genai import errors
+from pydantic import BaseModel
+
+SEED = int(os.environ.get("FAKE_LLM_SEED", "0"))
+LATENCY_MS = float(os.environ.get("FAKE_LLM_LATENCY_MS", "800"))
+LATENCY_SIGMA = float(os.environ.get("FAKE_LLM_LATENCY_SIGMA", "0.4"))
+TOKENS_PER_SECOND = float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "250"))
+ERROR_RATE = float(os.environ.get("FAKE_LLM_ERROR_RATE", "0"))
+CHUNK_CHARS = int(os.environ.get("FAKE_LLM_CHUNK_CHARS", "80"))
+MAX_OUTPUT_TOKENS = int(os.environ.get("FAKE_LLM_MAX_OUTPUT_TOKENS", "0"))
+
+FIRST_NAMES = ["Ava", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas",
+               "Kemi", "Liam", "Maya", "Nikhil", "Olga", "Priya", "Quinn", "Rosa", "Sam", "Tariq",
+               "Uma", "Victor", "Wen", "Ximena", "Yusuf", "Zoe"]
+LAST_NAMES = ["Adams", "Banerjee", "Chen", "Diaz", "Eriksen", "Fischer", "Garcia", "Haddad", "Ito",
+              "Jones", "Kowalski", "Lopez", "Mensah", "Nakamura", "Okafor", "Patel", "Rossi",
+              "Schmidt", "Tanaka", "Usman", "Vargas", "Wright", "Yilmaz", "Zhang"]
+COMPANIES = ["Northwind", "Globex", "Initech", "Umbrella Labs", "Stark Systems", "Hooli", "Vandelay",
+             "Wayne Data", "Cyberdyne", "Soylent Cloud", "Pied Piper", "Tyrell Analytics"]
+ROLES = ["Software Engineer", "Senior Software Engineer", "Backend Engineer", "Full-Stack Engineer",
+         "Staff Engineer", "Platform Engineer", "Data Engineer", "Engineering Manager"]
+LOCATIONS = ["Remote", "London, UK", "San Francisco, CA", "New York, NY", "Berlin, Germany",
+             "Toronto, Canada", "Austin, TX", "Bangalore, India", "Amsterdam, Netherlands"]
+EXTRA_SKILLS = ["Python", "Go", "TypeScript", "React", "Node.js", "PostgreSQL", "Redis", "Kafka",
+                "AWS", "GCP", "Kubernetes", "Docker", "Terraform", "GraphQL", "Rust", "Java"]
+
+
+class _Usage:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class FakeResponse:
+    """The attributes of GenerateContentResponse the backend reads."""
+
+    def __init__(self, text: str, usage: Optional[_Usage] = None):
+        self.text = text
+        self.usage_metadata = usage
+
+
+class _PromptFacts:
+    """What the fake needs to know from a prompt, pulled out with regexes."""
+
+    def __init__(self, prompt: str):
+        match = re.search(r"Generate (\d+)", prompt)
+        indices = re.findall(r"^Candidate Index (\d+)", prompt, re.MULTILINE)
+        self.count = int(match.group(1)) if match else len(indices) or 3
+        required = re.search(r"^Required Skills: (.*)$", prompt, re.MULTILINE)
+        self.required_skills = _split_list(required.group(1)) if required else []
+        self.candidate_skills = [_split_list(s) for s in re.findall(r"^Skills: (.*)$", prompt, re.MULTILINE)]
+        company = re.search(r"^Company: ([^(\n]*)", prompt, re.MULTILINE)
+        self.company = company.group(1).strip() if company else "our company"
+        title = re.search(r"^(?:Job )?Title: (.*)$", prompt, re.MULTILINE)
+        self.title = title.group(1).strip() if title else "this role"
+        name = re.search(r"^Name: (.*)$", prompt, re.MULTILINE)
+        self.name = name.group(1).strip() if name else None
+
+
+def _split_list(text: str) -> List[str]:
+    return [s.strip() for s in text.split(",") if s.strip()]
+
+
+class FakeModels:
+    """Schema-driven generate_content / generate_content_stream."""
+
+    def __init__(self, seed: int = SEED, latency_ms: float = LATENCY_MS, latency_sigma: float = LATENCY_SIGMA,
+                 tokens_per_second: float = TOKENS_PER_SECOND, error_rate: float = ERROR_RATE,
+                 chunk_chars: int = CHUNK_CHARS, max_output_tokens: int = MAX_OUTPUT_TOKENS):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.chunk_chars = chunk_chars
+        self.max_output_tokens = max_output_tokens
+        self._seen: Dict[str, int] = {}
+        self.calls = 0
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None) -> FakeResponse:
+        rng, prompt = self._start(model, contents)
+        text = self._respond(rng, prompt, config)
+        output_tokens = len(text) // 4
+        await asyncio.sleep(self._latency(rng) + output_tokens / self.tokens_per_second)
+        self._maybe_fail(rng)
+        return FakeResponse(text, _Usage(len(prompt) // 4, output_tokens))
+
+    async def generate_content_stream(self, model: str, contents: Any, config: Any = None) -> AsyncIterator[FakeResponse]:
+        rng, prompt = self._start(model, contents)
+        text = self._respond(rng, prompt, config)
+        await asyncio.sleep(self._latency(rng))
+        self._maybe_fail(rng)
+        return self._chunks(rng, text, len(prompt) // 4)
+
+    async def _chunks(self, rng: random.Random, text: str, prompt_tokens: int) -> AsyncIterator[FakeResponse]:
+        sent = 0
+        while sent < len(text):
+            size = max(1, int(self.chunk_chars * rng.uniform(0.5, 1.5)))
+            piece = text[sent:sent + size]
+            sent += len(piece)
+            await asyncio.sleep(len(piece) / 4 / self.tokens_per_second)
+            # Like Gemini, only the final chunk carries usage
+            usage = _Usage(prompt_tokens, len(text) // 4) if sent >= len(text) else None
+            yield FakeResponse(piece, usage)
+
+    def _start(self, model: str, contents: Any):
+        prompt = contents if isinstance(contents, str) else json.dumps(contents, default=str)
+        digest = hashlib.sha256(f"{self.seed}:{model}:{prompt}".encode()).hexdigest()
+        occurrence = self._seen.get(digest, 0)
+        self._seen[digest] = occurrence + 1
+        self.calls += 1
+        return random.Random(f"{digest}:{occurrence}"), prompt
+
+    def _latency(self, rng: random.Random) -> float:
+        return self.latency_ms / 1000 * math.exp(self.latency_sigma * rng.gauss(0, 1))
+
+    def _maybe_fail(self, rng: random.Random):
+        if rng.random() < self.error_rate:
+            if rng.random() < 0.5:
+                raise errors.ClientError(429, {"error": {"message": "Resource exhausted (fake)",
+                                                         "status": "RESOURCE_EXHAUSTED"}})
+            raise errors.ServerError(503, {"error": {"message": "Model overloaded (fake)", "status": "UNAVAILABLE"}})
+
+    def _respond(self, rng: random.Random, prompt: str, config: Any) -> str:
+        text = self._generate(rng, prompt, config)
+        limits = [n for n in (self.max_output_tokens, getattr(config, "max_output_tokens", None)) if n]
+        return text[:min(limits) * 4] if limits else text
+
+    def _generate(self, rng: random.Random, prompt: str, config: Any) -> str:
+        schema = None
+        if config is not None:
+            schema = getattr(config, "response_json_schema", None) or getattr(config, "response_schema", None)
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            schema = schema.model_json_schema()
+        if schema is None:
+            return "OK"
+        return json.dumps(_Generator(rng, _PromptFacts(prompt), schema).top_level())
+
+
+class _Generator:
+    """Builds a value matching a JSON schema, filling fields by name."""
+
+    def __init__(self, rng: random.Random, facts: _PromptFacts, schema: Dict[str, Any]):
+        self.rng = rng
+        self.facts = facts
+        self.schema = schema
+        self.defs = schema.get("$defs", {})
+
+    def top_level(self) -> Any:
+        schema = self._resolve(self.schema)
+        if schema.get("type") != "array":
+            return self.value(schema, None, {})
+        items = [self.value(schema.get("items", {}), None, {"index": i}) for i in range(self.facts.count)]
+        # Matching responses are asked for best-first
+        if items and isinstance(items[0], dict) and "score" in items[0]:
+            items.sort(key=lambda item: -item["score"])
+        return items
+
+    def _resolve(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        ref = schema.get("$ref")
+        if ref:
+            schema = self.defs.get(ref.rsplit("/", 1)[-1], {})
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [s for s in schema[key] if s.get("type") != "null"]
+                schema = self._resolve(options[0]) if options else {"type": "null"}
+        return schema
+
+    def value(self, schema: Dict[str, Any], field: Optional[str], ctx: Dict[str, Any]) -> Any:
+        schema = self._resolve(schema)
+        kind = schema.get("type")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), "null")
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        if kind == "object":
+            obj: Dict[str, Any] = {}
+            for name, sub in schema.get("properties", {}).items():
+                obj[name] = self.value(sub, name, {**ctx, "obj": obj})
+            return obj
+        if kind == "array":
+            return self._array(schema.get("items", {}), field, ctx)
+        if kind == "integer":
+            return self._integer(field, ctx)
+        if kind == "number":
+            return round(self.rng.uniform(0, 100), 2)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "null":
+            return None
+        return self._string(field, ctx)
+
+    def _array(self, items: Dict[str, Any], field: Optional[str], ctx: Dict[str, Any]) -> List[Any]:
+        if field == "skills":
+            return self._skills()
+        if field == "key_highlights":
+            return self._highlights(ctx)
+        return [self.value(items, None, ctx) for _ in range(self.rng.randint(2, 4))]
+
+    def _integer(self, field: Optional[str], ctx: Dict[str, Any]) -> int:
+        if field == "candidate_index":
+            return ctx.get("index", 0)
+        if field == "years_experience":
+            return self.rng.randint(1, 20)
+        if field == "score":
+            index = ctx.get("index", 0)
+            skills = self.facts.candidate_skills[index] if index < len(self.facts.candidate_skills) else []
+            required = {s.lower() for s in self.facts.required_skills}
+            overlap = len(required & {s.lower() for s in skills}) / len(required) if required else 0.5
+            return max(0, min(100, round(35 + 55 * overlap + self.rng.uniform(-8, 8))))
+        return self.rng.randint(0, 100)
+
+    def _skills(self) -> List[str]:
+        required = list(self.facts.required_skills)
+        tier = self.rng.random()  # 40% strong, 40% medium, 20% weak fits
+        if tier < 0.4:
+            keep = max(0, len(required) - self.rng.randint(0, 1))
+        elif tier < 0.8:
+            keep = len(required) // 2
+        else:
+            keep = min(1, len(required))
+        skills = self.rng.sample(required, keep)
+        extras = [s for s in EXTRA_SKILLS if s not in skills]
+        return skills + self.rng.sample(extras, self.rng.randint(1, 3))
+
+    def _highlights(self, ctx: Dict[str, Any]) -> List[str]:
+        index = ctx.get("index", 0)
+        skills = self.facts.candidate_skills[index] if index < len(self.facts.candidate_skills) else []
+        required = {s.lower() for s in self.facts.required_skills}
+        matched = [s for s in skills if s.lower() in required]
+        highlights = [f"Hands-on {s} experience" for s in matched[:2]]
+        highlights.append(f"Background relevant to {self.facts.company}")
+        if len(matched) < len(required):
+            highlights.append("Missing some required skills")
+        return highlights[:4]
+
+    def _string(self, field: Optional[str], ctx: Dict[str, Any]) -> str:
+        obj = ctx.get("obj", {})
+        rng = self.rng
+        if field == "name":
+            return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        slug = obj.get("name", "alex-doe").lower().replace(" ", "-")
+        company = obj.get("current_company") or rng.choice(COMPANIES)
+        if field == "current_role":
+            return rng.choice(ROLES)
+        if field == "current_company":
+            return rng.choice(COMPANIES)
+        if field == "location":
+            return rng.choice(LOCATIONS)
+        if field == "email":
+            return f"{slug.replace('-', '.')}@example.com"
+        if field == "linkedin_url":
+            return f"https://linkedin.com/in/{slug}"
+        if field == "company_website":
+            return f"https://{company.lower().replace(' ', '')}.com"
+        if field == "linkedin_summary":
+            return (f"{obj.get('current_role', 'Engineer')} at {company} with "
+                    f"{obj.get('years_experience', 5)} years building production systems "
+                    f"in {', '.join(obj.get('skills', [])[:3]) or 'several stacks'}.")
+        if field == "fit_reasoning":
+            return (f"Candidate {ctx.get('index', 0)} covers part of the {self.facts.title} requirements. "
+                    f"Their experience would transfer well to {self.facts.company}.")
+        if field == "subject":
+            return f"{self.facts.title} at {self.facts.company}"
+        if field == "body":
+            first = (self.facts.name or "there").split()[0]
+            return (f"Hi {first},\n\nYour background caught our eye and we think you would be a great fit "
+                    f"for the {self.facts.title} role at {self.facts.company}.\n\n"
+                    f"Would you be open to a 20-minute call next week?\n\nBest,\nThe {self.facts.company} team")
+        return f"{field or 'value'} {rng.randint(1, 9999)}"
+
+
+class FakeClient:
+    """Drop-in for genai.Client's async interface (`client.aio.models`)."""
+
+    def __init__(self, **options):
+        self.models = FakeModels(**options)
+        self.aio = self
@@ -0,0 +1,81 @@
+"""Incremental parser for a JSON array arriving in arbitrary text chunks."""
+
+import json
+from typing import Any, List
+
+
+class JsonArrayStreamParser:
+    """Yields each top-level element of a JSON array as soon as it is complete.
+
+    Feed it chunks of text in order; `feed` returns the elements finished by
+    that chunk. Only the top-level array is tracked incrementally; each
+    element is decoded with `json.loads` once its closing character arrives.
+
+        parser = JsonArrayStreamParser()
+        parser.feed('[{"a": 1}, {"a"')   # -> [{'a': 1}]
+        parser.feed(': 2}]')              # -> [{'a': 2}]
+    """
+
+    def __init__(self):
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._element: List[str] = []
+
+    @property
+    def finished(self) -> bool:
+        """True once the closing bracket of the top-level array was seen."""
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return any elements it completed."""
+        completed = []
+        for char in chunk:
+            if self._finished:
+                if not char.isspace():
+                    raise json.JSONDecodeError("Extra data after array", chunk, 0)
+                continue
+
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                elif not char.isspace():
+                    raise json.JSONDecodeError("Expected '[' at start of array", chunk, 0)
+                continue
+
+            if self._in_string:
+                self._element.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0 and char in ",]":
+                # End of a top-level element (scalars end here too)
+                self._flush(completed)
+                if char == "]":
+                    self._finished = True
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+            if self._element or not char.isspace():
+                self._element.append(char)
+            if self._depth == 0 and char in "}]":
+                self._flush(completed)
+        return completed
+
+    def _flush(self, completed: List[Any]):
+        text = "".join(self._element).strip()
+        self._element = []
+        if text:
+            completed.append(json.loads(text))
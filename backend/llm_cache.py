@@ -0,0 +1,169 @@
+"""Content-addressed cache for LLM responses.
+
+Responses are keyed on a hash of (model, prompt, response schema, config),
+so any call that would send exactly the same request reuses the earlier
+answer. Two tiers: an in-memory LRU for hot entries and a SQLite table
+(migrations/006_llm_cache.sql) that survives restarts, with a TTL and a
+total-size cap enforced by evicting the least recently used rows.
+
+Agents opt in by being given a cache; sourcing stays uncached so repeated
+runs produce fresh candidates.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from database import connection, transaction
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE", "1") == "1"
+MEMORY_ENTRIES = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "512"))
+TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Size-cap enforcement needs a SUM over the table, so run it every N writes
+EVICT_EVERY = 50
+
+
+def cache_key(model: str, prompt: str, config: Any = None) -> str:
+    """Stable sha256 over everything that determines the response."""
+    schema = None
+    settings: Dict[str, Any] = {}
+    if config is not None:
+        schema = getattr(config, "response_json_schema", None) or getattr(config, "response_schema", None)
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            schema = schema.model_json_schema()
+        settings = config.model_dump(mode="json", exclude_none=True,
+                                     exclude={"response_schema", "response_json_schema"})
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "schema": schema, "config": settings},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) response cache with hit/miss counters."""
+
+    def __init__(self, memory_entries: int = MEMORY_ENTRIES, ttl_seconds: int = TTL_SECONDS,
+                 max_bytes: int = MAX_BYTES, persistent: bool = True):
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.persistent = persistent
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (response, created_at)
+        self._writes = 0
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+        }
+
+    async def get(self, key: str) -> Optional[str]:
+        """Cached response text for `key`, or None."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            response, created_at = entry
+            if now - created_at < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return response
+            del self._memory[key]
+            self.counters["expired"] += 1
+
+        if self.persistent:
+            try:
+                async with connection() as db:
+                    cursor = await db.execute(
+                        "UPDATE llm_cache SET last_used_at = ? WHERE key = ? AND created_at > ? "
+                        "RETURNING response, created_at",
+                        (now, key, now - self.ttl_seconds)
+                    )
+                    row = await cursor.fetchone()
+                    await db.commit()
+            except Exception as e:
+                print(f"LLM cache read failed: {e}")
+                row = None
+            if row is not None:
+                self.counters["disk_hits"] += 1
+                self._remember(key, row["response"], row["created_at"])
+                return row["response"]
+
+        self.counters["misses"] += 1
+        return None
+
+    async def put(self, key: str, response: str):
+        """Store a response in both tiers."""
+        now = time.time()
+        self._remember(key, response, now)
+        if not self.persistent:
+            return
+        try:
+            async with transaction() as db:
+                await db.execute(
+                    """INSERT INTO llm_cache (key, response, size, created_at, last_used_at)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT (key) DO UPDATE SET
+                           response = excluded.response, size = excluded.size,
+                           created_at = excluded.created_at, last_used_at = excluded.last_used_at""",
+                    (key, response, len(response.encode()), now, now)
+                )
+                self._writes += 1
+                if self._writes % EVICT_EVERY == 0:
+                    await self._evict(db, now)
+        except Exception as e:
+            print(f"LLM cache write failed: {e}")
+
+    async def evict(self):
+        """Drop expired rows and trim the table to max_bytes."""
+        async with transaction() as db:
+            await self._evict(db, time.time())
+
+    def stats(self) -> Dict[str, int]:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, response: str, created_at: float):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.counters["memory_evictions"] += 1
+
+    async def _evict(self, db, now: float):
+        cursor = await db.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl_seconds,))
+        self.counters["disk_evictions"] += cursor.rowcount
+
+        cursor = await db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache")
+        excess = (await cursor.fetchone())[0] - self.max_bytes
+        if excess <= 0:
+            return
+        # Delete least recently used rows until the running total covers the excess
+        cursor = await db.execute(
+            """DELETE FROM llm_cache WHERE key IN (
+                   SELECT key FROM (
+                       SELECT key, size, SUM(size) OVER (ORDER BY last_used_at, key) AS running
+                       FROM llm_cache
+                   )
+                   WHERE running - size < ?
+               )""",
+            (excess,)
+        )
+        self.counters["disk_evictions"] += cursor.rowcount
+
+
+llm_cache = LLMCache() if LLM_CACHE_ENABLED else None
@@ -0,0 +1,265 @@
+"""Admission control for Gemini calls.
+
+Every model call goes through one scheduler that enforces a global and a
+per-job concurrency cap, requests-per-minute and tokens-per-minute token
+buckets, and retries retryable errors (429/5xx) with jittered exponential
+backoff. Waiting calls are admitted strictly by priority class, then FIFO,
+so an interactive pitch for a reviewer overtakes queued background
+sourcing and matching.
+"""
+
+import asyncio
+import bisect
+import itertools
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from google.genai import errors
+
+from metrics import Counter, Gauge
+
+MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "8"))
+MAX_CONCURRENCY_PER_JOB = int(os.environ.get("GEMINI_MAX_CONCURRENCY_PER_JOB", "4"))
+REQUESTS_PER_MINUTE = int(os.environ.get("GEMINI_RPM", "1000"))
+TOKENS_PER_MINUTE = int(os.environ.get("GEMINI_TPM", "1000000"))
+MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", "4"))
+RETRY_BASE_SECONDS = float(os.environ.get("GEMINI_RETRY_BASE_SECONDS", "1"))
+RETRY_MAX_SECONDS = 30.0
+# Provider quotas are per minute, so by default a full minute may burst
+BURST_SECONDS = float(os.environ.get("GEMINI_BURST_SECONDS", "60"))
+
+# Priority classes, lowest value admitted first
+PRIORITY_INTERACTIVE = 0  # a reviewer is waiting on the response
+PRIORITY_PIPELINE = 1     # matching and pre-generated pitches
+PRIORITY_SOURCING = 2     # bulk candidate generation
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Output size assumed when reserving TPM before the real usage is known
+OUTPUT_TOKEN_ESTIMATE = 1024
+
+
+def estimate_tokens(prompt: str, config: Any = None) -> int:
+    """Rough token count for a request: ~4 characters per prompt token."""
+    max_output = getattr(config, "max_output_tokens", None) or OUTPUT_TOKEN_ESTIMATE
+    return len(prompt) // 4 + max_output
+
+
+def usage_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) if usage is not None else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, errors.APIError):
+        return exc.code in RETRYABLE_STATUS
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError))
+
+
+class TokenBucket:
+    """Refills `per_minute` tokens per minute, holding `burst_seconds` worth.
+
+    May go negative when a reservation is corrected upwards; the debt is
+    paid off by refill before anything else is admitted.
+    """
+
+    def __init__(self, per_minute: int, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = self.rate * burst_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        self._refill(now)
+        # Requests bigger than the bucket only wait for it to be full
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate) if self.rate else float("inf")
+
+    def take(self, amount: float):
+        self.tokens -= amount
+
+    def adjust(self, delta: float):
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class _Waiter:
+    __slots__ = ("key", "job_id", "tokens", "future")
+
+    def __init__(self, key, job_id, tokens, future):
+        self.key = key
+        self.job_id = job_id
+        self.tokens = tokens
+        self.future = future
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class LLMScheduler:
+    """Priority admission queue in front of the Gemini client."""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY,
+                 max_concurrency_per_job: int = MAX_CONCURRENCY_PER_JOB,
+                 requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = TOKENS_PER_MINUTE,
+                 max_retries: int = MAX_RETRIES, retry_base: float = RETRY_BASE_SECONDS,
+                 retry_max: float = RETRY_MAX_SECONDS, burst_seconds: float = BURST_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_job = max_concurrency_per_job
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._seq = itertools.count()
+        self._waiting: List[_Waiter] = []  # sorted by (priority, arrival)
+        self._in_flight = 0
+        self._per_job: Dict[Any, int] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.counters = {"admitted": 0, "retries": 0, "failures": 0, "rate_limited_waits": 0}
+
+    async def call(self, request: Callable[[], Awaitable[Any]], *, priority: int = PRIORITY_PIPELINE,
+                   job_id: Any = None, tokens: int = OUTPUT_TOKEN_ESTIMATE) -> Any:
+        """Run `request()` once admitted, retrying retryable failures.
+
+        The slot is released between attempts so a backoff never blocks
+        other calls.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, job_id, tokens)
+            try:
+                response = await request()
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    self.counters["failures"] += 1
+                    raise
+            else:
+                actual = usage_tokens(response)
+                if actual is not None:
+                    self.tokens.adjust(actual - tokens)
+                return response
+            finally:
+                self._release(job_id)
+            self.counters["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def stream(self, request: Callable[[], Awaitable[AsyncIterator[Any]]], *,
+                     priority: int = PRIORITY_PIPELINE, job_id: Any = None,
+                     tokens: int = OUTPUT_TOKEN_ESTIMATE) -> AsyncIterator[Any]:
+        """Like call() for streaming requests; the slot is held until the stream ends.
+
+        Only failures before the first chunk are retried, since chunks
+        already handed to the caller cannot be taken back.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, job_id, tokens)
+            started = False
+            try:
+                last = None
+                async for chunk in await request():
+                    started = True
+                    last = chunk
+                    yield chunk
+                actual = usage_tokens(last)
+                if actual is not None:
+                    self.tokens.adjust(actual - tokens)
+                return
+            except Exception as e:
+                if started or not is_retryable(e) or attempt == self.max_retries:
+                    self.counters["failures"] += 1
+                    raise
+            finally:
+                self._release(job_id)
+            self.counters["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        queued: Dict[int, int] = {}
+        for waiter in self._waiting:
+            queued[waiter.key[0]] = queued.get(waiter.key[0], 0) + 1
+        return {**self.counters, "in_flight": self._in_flight, "queued": queued}
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps clients that failed together from retrying together
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+
+    async def _acquire(self, priority: int, job_id: Any, tokens: int):
+        waiter = _Waiter((priority, next(self._seq)), job_id, tokens,
+                         asyncio.get_running_loop().create_future())
+        bisect.insort(self._waiting, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(job_id)  # admitted just as we were cancelled
+            else:
+                self._waiting.remove(waiter)
+                self._dispatch()
+            raise
+
+    def _release(self, job_id: Any):
+        self._in_flight -= 1
+        if job_id is not None:
+            remaining = self._per_job[job_id] - 1
+            if remaining:
+                self._per_job[job_id] = remaining
+            else:
+                del self._per_job[job_id]
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit waiters in priority order while capacity allows."""
+        now = time.monotonic()
+        index = 0
+        while index < len(self._waiting) and self._in_flight < self.max_concurrency:
+            waiter = self._waiting[index]
+            if waiter.job_id is not None and self._per_job.get(waiter.job_id, 0) >= self.max_concurrency_per_job:
+                index += 1  # its job is saturated; let other jobs through
+                continue
+            # Rate limits are head-of-line: nothing of lower priority jumps
+            # ahead while the best waiter is paced
+            delay = max(self.requests.wait_time(1, now), self.tokens.wait_time(waiter.tokens, now))
+            if delay > 0:
+                self.counters["rate_limited_waits"] += 1
+                self._wake_in(delay)
+                return
+            self._waiting.pop(index)
+            self.requests.take(1)
+            self.tokens.take(waiter.tokens)
+            self._in_flight += 1
+            if waiter.job_id is not None:
+                self._per_job[waiter.job_id] = self._per_job.get(waiter.job_id, 0) + 1
+            self.counters["admitted"] += 1
+            waiter.future.set_result(None)
+
+    def _wake_in(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+
+scheduler = LLMScheduler()
+
+Gauge("llm_scheduler_in_flight", "LLM calls currently admitted").set_function(lambda: scheduler._in_flight)
+_queued = Gauge("llm_scheduler_queued", "LLM calls waiting for admission", ["priority"])
+for _name, _priority in (("interactive", PRIORITY_INTERACTIVE), ("pipeline", PRIORITY_PIPELINE),
+                         ("sourcing", PRIORITY_SOURCING)):
+    _queued.labels(priority=_name).set_function(
+        lambda priority=_priority: sum(1 for w in scheduler._waiting if w.key[0] == priority)
+    )
+Counter("llm_retries_total", "LLM calls retried after a retryable error").set_function(
+    lambda: scheduler.counters["retries"]
+)
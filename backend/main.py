@@ -1,33 +1,64 @@
 """FastAPI application for agentic recruiter platform."""
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
+import orjson
 
 # Load environment variables from .env file
 load_dotenv()
 
 from rate_limiter import RateLimiter
 
-from models import JobCreate, StatsResponse, OutreachSendRequest
+from models import JobCreate, StatsResponse, OutreachSendRequest, DecisionBatch
 from database import (
-    init_db, create_job, get_job, create_candidate, create_match,
-    get_next_candidate, update_candidate_status, get_candidate,
+    init_db, create_job, get_job,
+    get_next_candidate, claim_candidates, apply_decisions,
+    update_candidate_status, get_candidate,
     create_outreach, update_outreach_status, get_job_stats,
-    get_outreach, update_outreach_content, get_outreach_by_candidate_id
+    get_outreach, update_outreach_content, get_outreach_by_candidate_id,
+    get_match_by_candidate_id, list_candidates_by_status, iter_candidates_by_status,
+    candidate_page_end, CANDIDATE_LIST_FIELDS, STAT_COLUMNS,
+    enqueue_pipeline_run, get_pipeline_run, list_pipeline_runs,
+    open_pool, close_pool
 )
-from agents import SourcingAgent, MatchingAgent, PitchWriterAgent, OutreachAgent
+from agents import SourcingAgent, MatchingAgent, PitchWriterAgent, OutreachAgent, PRIORITY_INTERACTIVE
+from pipeline import JobPipeline
+from candidate_index import candidate_index, seed_job
+from prefetch import PitchPrefetcher, PREFETCH_ACCEPTS
+from worker import PipelineWorkerPool, relay_events
+from llm_cache import llm_cache
+from events import event_bus, sse_stream
+import metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database and connection pool, and run queued pipelines, on startup."""
     await init_db()
-    yield
+    await open_pool()
+    # Loads and refreshes in the background; seeding is skipped until loaded
+    index_load = asyncio.create_task(candidate_index.run())
+    if PIPELINE_MODE == "external":
+        # Worker processes run the pipelines; relay their events to SSE
+        relay = asyncio.create_task(relay_events(event_bus))
+        yield
+        relay.cancel()
+        await asyncio.gather(relay, return_exceptions=True)
+    else:
+        worker_pool.start()
+        yield
+        await worker_pool.stop()
+    index_load.cancel()
+    await asyncio.gather(index_load, return_exceptions=True)
+    await pitch_prefetcher.stop()
+    await close_pool()
 
 
 app = FastAPI(title="Agentic Recruiter API", lifespan=lifespan)
@@ -44,6 +75,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 # Rate limiter
@@ -52,13 +84,26 @@ rate_limiter = RateLimiter()
 
 # Agent instances
 sourcing_agent = SourcingAgent()
-matching_agent = MatchingAgent()
-pitch_writer_agent = PitchWriterAgent()
+matching_agent = MatchingAgent(cache=llm_cache)
+pitch_writer_agent = PitchWriterAgent(cache=llm_cache)
 outreach_agent = OutreachAgent()
 
 
-async def process_job_pipeline(job_id: int, count: int = 25):
-    """Background task: Run sourcing and matching agents in batches."""
+pitch_prefetcher = PitchPrefetcher(pitch_writer_agent)
+# With prefetching on, pitches follow the review cursor instead of being
+# written up front for every strong match
+job_pipeline = JobPipeline(sourcing_agent, matching_agent, pitch_writer_agent,
+                           eager_pitches=not pitch_prefetcher.enabled)
+# Runs survive restarts: unfinished ones are claimed again on startup.
+# "inline" runs them in this process; "external" leaves them to worker.py
+PIPELINE_MODE = os.environ.get("PIPELINE_MODE", "inline")
+worker_pool = PipelineWorkerPool(job_pipeline)
+# Candidates a new job starts with: seeded from similar jobs, then sourced
+INITIAL_CANDIDATES = 25
+
+
+async def process_job_pipeline(job_id: int, count: int = INITIAL_CANDIDATES):
+    """Run the pipeline directly, outside the run queue (benchmarks and scripts)."""
     try:
         # Get job details
         job = await get_job(job_id)
@@ -67,87 +112,7 @@ async def process_job_pipeline(job_id: int, count: int = 25):
             return
 
         print(f"Starting pipeline for job {job_id}: {job['title']}")
-        
-        batch_size = 5
-        processed_count = 0
-        
-        while processed_count < count:
-            current_batch_size = min(batch_size, count - processed_count)
-            print(f"Processing batch: {current_batch_size} candidates (Total: {processed_count}/{count})...")
-
-            # Step 1: Sourcing Agent - Generate candidates (Batch)
-            candidates = await sourcing_agent.generate_candidates(job, count=current_batch_size)
-            print(f"Generated {len(candidates)} candidates in batch")
-
-            # Save candidates to database
-            candidate_ids = []
-            for candidate in candidates:
-                candidate_id = await create_candidate(
-                    job_id=job_id,
-                    name=candidate['name'],
-                    current_role=candidate['current_role'],
-                    current_company=candidate['current_company'],
-                    years_experience=candidate['years_experience'],
-                    skills=candidate['skills'],
-                    location=candidate['location'],
-                    email=candidate['email'],
-                    linkedin_summary=candidate['linkedin_summary'],
-                    linkedin_url=candidate.get('linkedin_url'),
-                    company_website=candidate.get('company_website')
-                )
-                candidate_ids.append(candidate_id)
-
-            # Step 2: Matching Agent - Rank candidates (Batch)
-            matches = await matching_agent.rank_candidates(job, candidates)
-            print(f"Ranked {len(matches)} candidates in batch")
-
-            # Save matches to database
-            for match in matches:
-                candidate_idx = match['candidate_index']
-                if candidate_idx < 0 or candidate_idx >= len(candidate_ids):
-                    continue
-                
-                candidate_id = candidate_ids[candidate_idx]
-                await create_match(
-                    job_id=job_id,
-                    candidate_id=candidate_id,
-                    score=match['score'],
-                    key_highlights=match['key_highlights'],
-                    fit_reasoning=match['fit_reasoning'],
-                    rank_position=match['rank_position'] # Rank is relative to batch, but that's fine for now
-                )
-
-            # Step 3: Parallel Pre-generation of pitches for top candidates (Score >= 75)
-            top_matches = [m for m in matches if m['score'] >= 75]
-            if top_matches:
-                async def generate_and_save_pitch(match_data):
-                    idx = match_data['candidate_index']
-                    c_id = candidate_ids[idx]
-                    c_data = candidates[idx]
-                    if isinstance(c_data['skills'], str):
-                        c_data['skills'] = json.loads(c_data['skills'])
-                    
-                    try:
-                        pitch = await pitch_writer_agent.create_pitch(job, c_data, match_data)
-                        await create_outreach(
-                            job_id=job_id,
-                            candidate_id=c_id,
-                            subject=pitch['subject'],
-                            body=pitch['body'],
-                            delivery_status="generated"
-                        )
-                    except Exception as e:
-                        print(f"Error in parallel pitch gen for {c_id}: {e}")
-
-                # Run all top match pitch generations concurrently
-                import asyncio
-                await asyncio.gather(*(generate_and_save_pitch(m) for m in top_matches))
-            
-            processed_count += len(candidates)
-            
-            # Small delay to yield control if needed
-            await asyncio.sleep(0.1)
-
+        await job_pipeline.run(job, count)
         print(f"Pipeline complete for job {job_id}")
 
     except Exception as e:
@@ -157,9 +122,9 @@ async def process_job_pipeline(job_id: int, count: int = 25):
 
 
 @app.post("/api/jobs")
-async def create_job_endpoint(job_data: JobCreate, background_tasks: BackgroundTasks, request: Request):
+async def create_job_endpoint(job_data: JobCreate, request: Request):
     """Create job and trigger candidate sourcing pipeline."""
-    rate_limiter.check("create_job", request.client.host, limit=10, window=3600)
+    await rate_limiter.check("create_job", request.client.host, limit=10, window=3600)
     job_id = await create_job(
         title=job_data.title,
         company=job_data.company,
@@ -170,93 +135,141 @@ async def create_job_endpoint(job_data: JobCreate, background_tasks: BackgroundT
         location=job_data.location
     )
 
-    # Start background pipeline
-    background_tasks.add_task(process_job_pipeline, job_id, count=25)
+    # Profiles from similar earlier jobs are ready immediately; the
+    # pipeline sources the rest
+    try:
+        seeded = await seed_job(await get_job(job_id), candidate_index)
+    except Exception as e:
+        print(f"Seeding job {job_id} failed: {e}")
+        seeded = 0
+
+    # Queue the pipeline; a worker picks it up
+    run_id = await enqueue_pipeline_run(job_id, max(0, INITIAL_CANDIDATES - seeded))
+    worker_pool.notify()
 
     return {
         "job_id": job_id,
+        "run_id": run_id,
+        "seeded": seeded,
         "status": "processing",
         "message": "Job created. Generating candidates..."
     }
 
 
 @app.post("/api/jobs/{job_id}/source-more")
-async def source_more_candidates(job_id: int, background_tasks: BackgroundTasks, request: Request):
+async def source_more_candidates(job_id: int, request: Request):
     """Generate additional batch of candidates on demand."""
-    rate_limiter.check("source_more", request.client.host, limit=5, window=3600)
+    await rate_limiter.check("source_more", request.client.host, limit=5, window=3600)
     job = await get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     # Generate smaller batch for "more" requests
-    background_tasks.add_task(process_job_pipeline, job_id, count=15)
+    run_id = await enqueue_pipeline_run(job_id, 15)
+    worker_pool.notify()
 
     return {
+        "run_id": run_id,
         "status": "sourcing",
         "message": "Generating new candidates..."
     }
 
 
-@app.get("/api/jobs/{job_id}/candidates")
-async def get_next_candidate_endpoint(job_id: int):
-    """Get next candidate to review."""
-    candidate = await get_next_candidate(job_id)
-    
-    # Always get stats
-    stats = await get_job_stats(job_id)
+@app.get("/api/jobs/{job_id}/runs")
+async def job_pipeline_runs(job_id: int):
+    """Pipeline runs for a job, newest first, with progress and state."""
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"runs": await list_pipeline_runs(job_id)}
 
-    if not candidate:
-        return {
-            "candidate": None,
-            "message": "No more candidates available",
-            "stats": stats
-        }
 
-    # Parse JSON fields
-    skills = json.loads(candidate['skills']) if isinstance(candidate['skills'], str) else candidate['skills']
-    key_highlights = json.loads(candidate['key_highlights']) if isinstance(candidate['key_highlights'], str) else candidate['key_highlights']
+@app.get("/api/pipeline-runs/{run_id}")
+async def pipeline_run_status(run_id: int):
+    """State and progress of one pipeline run."""
+    run = await get_pipeline_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    return run
 
-    return {
-        "candidate": {
-            "id": candidate['id'],
-            "name": candidate['name'],
-            "current_role": candidate['current_role'],
-            "current_company": candidate['current_company'],
-            "years_experience": candidate['years_experience'],
-            "skills": skills,
-            "location": candidate['location'],
-            "email": candidate['email'],
-            "linkedin_summary": candidate['linkedin_summary'],
-            "linkedin_url": candidate.get('linkedin_url'),
-            "company_website": candidate.get('company_website'),
-            "status": candidate['status']
-        },
-        "match": {
-            "id": candidate['match_id'],
-            "score": candidate['score'],
-            "key_highlights": key_highlights,
-            "fit_reasoning": candidate['fit_reasoning'],
-            "rank_position": candidate['rank_position']
-        },
-        "stats": stats
-    }
 
+@app.get("/api/jobs/{job_id}/pipeline-events")
+async def pipeline_events(job_id: int, request: Request):
+    """SSE stream of pipeline progress (sourced, matched, pitch ready, done/failed)."""
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Browsers resend the last id they saw when reconnecting
+    last_event_id = request.headers.get("last-event-id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
 
-@app.put("/api/candidates/{candidate_id}/accept")
-async def accept_candidate(candidate_id: int):
-    """Accept candidate and generate/retrieve personalized pitch."""
-    candidate = await get_candidate(candidate_id)
-    if not candidate:
-        raise HTTPException(status_code=404, detail="Candidate not found")
+    return StreamingResponse(
+        sse_stream(event_bus, job_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    # Update status to accepted
-    await update_candidate_status(candidate_id, "accepted")
 
-    # Get updated stats
-    stats = await get_job_stats(candidate['job_id'])
+# Most cards one reviewer can hold claimed at once (GET candidates / decisions `limit`)
+REVIEW_WINDOW_MAX = int(os.environ.get("REVIEW_WINDOW_MAX", "20"))
+
+
+def _raw_json(*objects: bytes, **fields) -> Response:
+    """A JSON response assembled from pre-serialized parts, skipping FastAPI's encoder.
+
+    `objects` are serialized JSON objects whose members are merged in, in
+    order. `fields` are added after them: bytes are embedded as-is,
+    anything else is serialized with orjson.
+    """
+    members = [obj[1:-1] for obj in objects if len(obj) > 2]
+    members += [orjson.dumps(name) + b":" + (value if isinstance(value, bytes) else orjson.dumps(value))
+                for name, value in fields.items()]
+    return Response(b"{" + b",".join(members) + b"}", media_type="application/json")
+
+
+def _json_array(items: List[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
+
+
+def _cards(window: List[Dict[str, Any]]) -> List[bytes]:
+    """The stored card JSON (see migrations/012_candidate_cards.sql) of claimed rows."""
+    return [candidate['card'].encode() for candidate in window]
+
+
+@app.get("/api/jobs/{job_id}/candidates")
+async def get_next_candidate_endpoint(job_id: int, reviewer_id: Optional[str] = None, limit: int = 1):
+    """Claim the next `limit` candidates to review (re-serves the reviewer's current ones).
 
-    # Check for pre-generated outreach
+    `candidate`/`match` are the first card; `candidates` is the whole window.
+    """
+    window = await claim_candidates(job_id, reviewer_id=reviewer_id,
+                                    limit=max(1, min(limit, REVIEW_WINDOW_MAX)))
+    if window:
+        pitch_prefetcher.advance(job_id, served=window)
+
+    # Always get stats
+    stats = await get_job_stats(job_id)
+
+    if not window:
+        return _raw_json(candidate=None, candidates=[], message="No more candidates available", stats=stats)
+
+    cards = _cards(window)
+    return _raw_json(cards[0], candidates=_json_array(cards), stats=stats)
+
+
+async def _accepted_pitch(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Retrieve or write the pitch for an accepted candidate."""
+    candidate_id = candidate['id']
+
+    # Check for a pre-generated or prefetched pitch, waiting for one that
+    # is already being written
     existing_outreach = await get_outreach_by_candidate_id(candidate_id)
+    if existing_outreach:
+        PREFETCH_ACCEPTS.labels(outcome="hit").inc()
+    elif await pitch_prefetcher.wait(candidate_id):
+        existing_outreach = await get_outreach_by_candidate_id(candidate_id)
+        PREFETCH_ACCEPTS.labels(outcome="in_flight").inc()
 
     if existing_outreach:
         print(f"Using pre-generated pitch for candidate {candidate_id}")
@@ -270,25 +283,15 @@ async def accept_candidate(candidate_id: int):
                 "subject": existing_outreach['subject'],
                 "body": existing_outreach['body']
             },
-            "outreach_id": existing_outreach['id'],
-            "stats": stats
+            "outreach_id": existing_outreach['id']
         }
 
     # If no pre-generated pitch, generate one now
     # Get job and match details
     job = await get_job(candidate['job_id'])
 
-    # Get match details (need to query separately)
-    import aiosqlite
-    from database import DB_PATH
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT * FROM matches WHERE candidate_id = ?",
-            (candidate_id,)
-        )
-        match_row = await cursor.fetchone()
-        match = dict(match_row) if match_row else None
+    # Get match details
+    match = await get_match_by_candidate_id(candidate_id)
 
     if not match:
         raise HTTPException(status_code=500, detail="Match data not found")
@@ -298,8 +301,9 @@ async def accept_candidate(candidate_id: int):
     match['key_highlights'] = json.loads(match['key_highlights']) if isinstance(match['key_highlights'], str) else match['key_highlights']
 
     # Generate pitch with PitchWriterAgent
+    PREFETCH_ACCEPTS.labels(outcome="miss").inc()
     print(f"Generating pitch for candidate {candidate_id} (On-demand)...")
-    pitch = await pitch_writer_agent.create_pitch(job, candidate, match)
+    pitch = await pitch_writer_agent.create_pitch(job, candidate, match, priority=PRIORITY_INTERACTIVE)
 
     # Create outreach record as DRAFT
     outreach_id = await create_outreach(
@@ -313,61 +317,88 @@ async def accept_candidate(candidate_id: int):
     return {
         "status": "draft_created",
         "pitch": pitch,
-        "outreach_id": outreach_id,
-        "stats": stats
+        "outreach_id": outreach_id
     }
 
 
+@app.put("/api/candidates/{candidate_id}/accept")
+async def accept_candidate(candidate_id: int):
+    """Accept candidate and generate/retrieve personalized pitch."""
+    candidate = await get_candidate(candidate_id)
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+
+    # Update status to accepted
+    await update_candidate_status(candidate_id, "accepted")
+
+    # Get updated stats
+    stats = await get_job_stats(candidate['job_id'])
+
+    return {**await _accepted_pitch(candidate), "stats": stats}
+
+
 @app.put("/api/candidates/{candidate_id}/reject")
-async def reject_candidate(candidate_id: int):
-    """Reject candidate."""
+async def reject_candidate(candidate_id: int, reviewer_id: Optional[str] = None):
+    """Reject candidate and claim the next one."""
     candidate = await get_candidate(candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
     await update_candidate_status(candidate_id, "rejected")
+    pitch_prefetcher.cancel(candidate_id)
 
     # Get updated stats
     stats = await get_job_stats(candidate['job_id'])
 
     # Get next candidate
-    next_candidate = await get_next_candidate(candidate['job_id'])
+    next_candidate = await get_next_candidate(candidate['job_id'], reviewer_id=reviewer_id)
+    if next_candidate:
+        pitch_prefetcher.advance(candidate['job_id'], served=[next_candidate])
 
     if not next_candidate:
-        return {
-            "status": "success",
-            "next_candidate": None,
-            "message": "No more candidates available",
-            "stats": stats
-        }
+        return _raw_json(status="success", next_candidate=None, message="No more candidates available",
+                         stats=stats)
 
-    # Parse JSON fields
-    skills = json.loads(next_candidate['skills']) if isinstance(next_candidate['skills'], str) else next_candidate['skills']
-    key_highlights = json.loads(next_candidate['key_highlights']) if isinstance(next_candidate['key_highlights'], str) else next_candidate['key_highlights']
+    return _raw_json(status="success", next_candidate=_cards([next_candidate])[0], stats=stats)
 
-    return {
-        "status": "success",
-        "next_candidate": {
-            "candidate": {
-                "id": next_candidate['id'],
-                "name": next_candidate['name'],
-                "current_role": next_candidate['current_role'],
-                "current_company": next_candidate['current_company'],
-                "years_experience": next_candidate['years_experience'],
-                "skills": skills,
-                "location": next_candidate['location'],
-                "email": next_candidate['email'],
-                "linkedin_summary": next_candidate['linkedin_summary']
-            },
-            "match": {
-                "score": next_candidate['score'],
-                "key_highlights": key_highlights,
-                "fit_reasoning": next_candidate['fit_reasoning'],
-                "rank_position": next_candidate['rank_position']
-            }
-        },
-        "stats": stats
-    }
+
+@app.post("/api/jobs/{job_id}/decisions")
+async def apply_decisions_endpoint(job_id: int, batch: DecisionBatch):
+    """Apply a batch of accept/reject decisions and return the refreshed window.
+
+    The decisions, the claim of the next `limit` cards and the stats read
+    share one transaction. Accepted candidates come back with their pitch.
+    Decisions for candidates outside the job, or already contacted, are
+    reported as "skipped".
+    """
+    statuses = {"accept": "accepted", "reject": "rejected"}
+    applied, window, stats = await apply_decisions(
+        job_id, [(d.candidate_id, statuses[d.decision]) for d in batch.decisions],
+        reviewer_id=batch.reviewer_id, limit=max(0, min(batch.limit, REVIEW_WINDOW_MAX))
+    )
+    applied = {candidate['id']: candidate for candidate in applied}
+
+    for candidate in applied.values():
+        if candidate['status'] == "rejected":
+            pitch_prefetcher.cancel(candidate['id'])
+    if window:
+        pitch_prefetcher.advance(job_id, served=window)
+
+    accepted = [c for c in applied.values() if c['status'] == "accepted"]
+    pitches = dict(zip([c['id'] for c in accepted],
+                       await asyncio.gather(*(_accepted_pitch(c) for c in accepted))))
+
+    results = []
+    for d in batch.decisions:
+        candidate = applied.get(d.candidate_id)
+        result = {"candidate_id": d.candidate_id, "status": candidate['status'] if candidate else "skipped"}
+        if d.candidate_id in pitches:
+            outreach = pitches[d.candidate_id]
+            result.update(pitch=outreach['pitch'], outreach_id=outreach['outreach_id'],
+                          pitch_status=outreach['status'])
+        results.append(result)
+
+    return _raw_json(results=results, candidates=_json_array(_cards(window)), stats=stats)
 
 
 @app.get("/api/jobs/{job_id}/stats")
@@ -413,49 +444,62 @@ async def send_outreach(request: OutreachSendRequest):
     }
 
 
+# Page size for by-status listings, the largest allowed, and the size above
+# which a page is streamed from the database instead of built in memory
+BY_STATUS_PAGE_SIZE = int(os.environ.get("BY_STATUS_PAGE_SIZE", "100"))
+BY_STATUS_MAX_PAGE_SIZE = int(os.environ.get("BY_STATUS_MAX_PAGE_SIZE", "10000"))
+BY_STATUS_STREAM_ROWS = int(os.environ.get("BY_STATUS_STREAM_ROWS", "1000"))
+
+
+async def _stream_json_array(chunks):
+    first = True
+    yield b"["
+    async for items in chunks:
+        yield (b"" if first else b",") + b",".join(item.encode() for item in items)
+        first = False
+    yield b"]"
+
+
 @app.get("/api/jobs/{job_id}/candidates/by-status/{status}")
-async def get_candidates_by_status(job_id: int, status: str):
-    """Get all candidates filtered by status."""
-    import aiosqlite
-    from database import DB_PATH
-
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            """SELECT c.*, m.score, m.key_highlights
-               FROM candidates c
-               JOIN matches m ON c.id = m.candidate_id
-               WHERE c.job_id = ? AND c.status = ?
-               ORDER BY m.score DESC""",
-            (job_id, status)
-        )
-        rows = await cursor.fetchall()
-
-        candidates = []
-        for row in rows:
-            candidate_dict = dict(row)
-            # Parse JSON fields
-            skills = json.loads(candidate_dict['skills']) if isinstance(candidate_dict['skills'], str) else candidate_dict['skills']
-            key_highlights = json.loads(candidate_dict['key_highlights']) if isinstance(candidate_dict['key_highlights'], str) else candidate_dict['key_highlights']
-
-            candidates.append({
-                "id": candidate_dict['id'],
-                "name": candidate_dict['name'],
-                "current_role": candidate_dict['current_role'],
-                "current_company": candidate_dict['current_company'],
-                "years_experience": candidate_dict['years_experience'],
-                "skills": skills,
-                "location": candidate_dict['location'],
-                "email": candidate_dict['email'],
-                "linkedin_summary": candidate_dict['linkedin_summary'],
-                "linkedin_url": candidate_dict.get('linkedin_url'),
-                "company_website": candidate_dict.get('company_website'),
-                "status": candidate_dict['status'],
-                "score": candidate_dict['score'],
-                "key_highlights": key_highlights
-            })
-
-        return candidates
+async def get_candidates_by_status(job_id: int, status: str, limit: int = BY_STATUS_PAGE_SIZE,
+                                   cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Get candidates filtered by status, best score first, a page at a time.
+
+    Pages are keyset-paginated on (score, id): pass a page's X-Next-Cursor
+    header as `cursor` to get the next one (no header on the last page).
+    `fields` picks a comma-separated subset of the item fields.
+    X-Total-Count is the status's count from the job's cached stats.
+    """
+    try:
+        after = tuple(int(part) for part in cursor.split(":")) if cursor else None
+        if after is not None and len(after) != 2:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    projection = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    unknown = [name for name in projection or [] if name not in CANDIDATE_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    limit = max(1, min(limit, BY_STATUS_MAX_PAGE_SIZE))
+
+    stats = await get_job_stats(job_id)
+    end = await candidate_page_end(job_id, status, limit, after)
+    headers = {"X-Total-Count": str(stats[status] if status in STAT_COLUMNS[1:] else 0)}
+    if end is not None:
+        headers["X-Next-Cursor"] = f"{end[0]}:{end[1]}"
+
+    if limit > BY_STATUS_STREAM_ROWS:
+        chunks = iter_candidates_by_status(job_id, status, limit, after, end, projection)
+        return StreamingResponse(_stream_json_array(chunks), media_type="application/json", headers=headers)
+    items = await list_candidates_by_status(job_id, status, limit, after, end, projection)
+    return Response(_json_array([item.encode() for item in items]), media_type="application/json",
+                    headers=headers)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics for the pipeline, LLM calls and database helpers."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.get("/")
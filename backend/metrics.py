@@ -0,0 +1,250 @@
+"""Minimal Prometheus-compatible metrics (counters, gauges, histograms).
+
+Recording is a dict lookup plus a few float additions, so it is cheap
+enough for every DB helper and agent call. `render()` produces the text
+exposition format served on /metrics.
+"""
+
+import bisect
+import functools
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds, from a fast SQLite read up to a slow sourcing call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), registry: "Registry" = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self.labels()  # unlabelled metrics report 0 before first use
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values, **kwargs):
+        """The child for one label combination (created on first use)."""
+        key = tuple(str(v) for v in values) if values else tuple(str(kwargs[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _default(self):
+        return self.labels(*()) if not self.labelnames else None
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at scrape time instead."""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Report `function()` at scrape time (e.g. a count kept elsewhere)."""
+        self._default().set_function(function)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_number(child.get())}"
+                for key, child in self._children.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1):
+        self._default().dec(amount)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    """Context manager observing elapsed seconds."""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: _HistogramValue):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS, registry: "Registry" = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _samples(self):
+        lines = []
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator observing an async function's duration in `histogram`."""
+    def decorate(fn):
+        child = histogram.labels(**labels)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# Metrics shared across modules
+DB_QUERY_SECONDS = Histogram("db_query_seconds", "Duration of database helper calls", ["op"])
+
+LLM_REQUEST_SECONDS = Histogram("llm_request_seconds", "Duration of LLM calls, including scheduler wait",
+                                ["agent", "outcome"])
+LLM_PROMPT_BYTES = Histogram("llm_prompt_bytes", "Prompt size sent to the LLM", ["agent"], buckets=BYTES_BUCKETS)
+LLM_RESPONSE_BYTES = Histogram("llm_response_bytes", "Response size received from the LLM", ["agent"],
+                               buckets=BYTES_BUCKETS)
+LLM_TOKENS = Histogram("llm_tokens", "Token usage reported in response metadata", ["agent", "kind"],
+                       buckets=TOKEN_BUCKETS)
+LLM_ERRORS = Counter("llm_errors_total", "LLM calls that raised", ["agent", "code"])
+LLM_PARSE_FAILURES = Counter("llm_parse_failures_total", "LLM responses that failed to parse or validate",
+                             ["agent"])
+LLM_CACHE_LOOKUPS = Counter("llm_cache_lookups_total", "LLM cache lookups", ["result"])
+
+PIPELINE_SECONDS = Histogram("pipeline_seconds", "Duration of whole pipeline runs", ["outcome"])
+PIPELINE_STAGE_SECONDS = Histogram("pipeline_stage_seconds", "Duration of one stage step (batch)", ["stage"])
+PIPELINE_BATCH_CANDIDATES = Histogram("pipeline_batch_candidates", "Candidates per batch", ["stage"],
+                                      buckets=SIZE_BUCKETS)
+PIPELINE_IN_FLIGHT = Gauge("pipeline_in_flight", "Pipelines currently running")
+PIPELINE_QUEUE_DEPTH = Gauge("pipeline_queue_depth", "Items waiting between pipeline stages", ["queue"])
+MATCHES_DROPPED = Counter("pipeline_matches_dropped_total",
+                          "Matches discarded for an out-of-range candidate_index")
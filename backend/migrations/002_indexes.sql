@@ -0,0 +1,9 @@
+-- Secondary indexes for the swipe and stats hot paths
+
+-- Per-job, per-status lookups are served by idx_candidates_queue (003)
+
+-- Candidate -> match join; rank/score ride along so the join is covering
+CREATE INDEX IF NOT EXISTS idx_matches_candidate ON matches (candidate_id, rank_position, score);
+
+-- Pre-generated pitch lookup on accept
+CREATE INDEX IF NOT EXISTS idx_outreach_candidate ON outreach (candidate_id);
@@ -0,0 +1,11 @@
+-- Per-job review queue ordered by match score across all batches
+
+-- Denormalized match score: the serving sort key. NULL until matched.
+ALTER TABLE candidates ADD COLUMN rank_score INTEGER;
+
+UPDATE candidates
+SET rank_score = (SELECT MAX(m.score) FROM matches m WHERE m.candidate_id = candidates.id);
+
+-- Best pending candidate first, earliest-sourced on ties. Also serves
+-- per-status listings and job stats through its (job_id, status) prefix.
+CREATE INDEX IF NOT EXISTS idx_candidates_queue ON candidates (job_id, status, rank_score DESC, id);
@@ -0,0 +1,7 @@
+-- Leases on 'viewed' candidates so abandoned cards return to the queue
+
+ALTER TABLE candidates ADD COLUMN claimed_by TEXT;
+ALTER TABLE candidates ADD COLUMN claim_expires_at REAL;  -- unix time
+
+-- Cards viewed before leases existed are treated as abandoned
+UPDATE candidates SET claim_expires_at = 0 WHERE status = 'viewed';
@@ -0,0 +1,61 @@
+-- Per-job candidate counters, kept exact by triggers so stats are a
+-- primary-key lookup instead of an aggregate over the job's candidates
+
+CREATE TABLE IF NOT EXISTS job_stats (
+    job_id INTEGER PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    pending INTEGER NOT NULL DEFAULT 0,
+    viewed INTEGER NOT NULL DEFAULT 0,
+    accepted INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    contacted INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
+
+INSERT INTO job_stats (job_id, total, pending, viewed, accepted, rejected, contacted)
+SELECT job_id,
+       COUNT(*),
+       SUM(status IS 'pending'),
+       SUM(status IS 'viewed'),
+       SUM(status IS 'accepted'),
+       SUM(status IS 'rejected'),
+       SUM(status IS 'contacted')
+FROM candidates
+GROUP BY job_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_job_stats_insert AFTER INSERT ON candidates
+BEGIN
+    INSERT INTO job_stats (job_id) VALUES (NEW.job_id) ON CONFLICT (job_id) DO NOTHING;
+    UPDATE job_stats SET
+        total = total + 1,
+        pending = pending + (NEW.status IS 'pending'),
+        viewed = viewed + (NEW.status IS 'viewed'),
+        accepted = accepted + (NEW.status IS 'accepted'),
+        rejected = rejected + (NEW.status IS 'rejected'),
+        contacted = contacted + (NEW.status IS 'contacted')
+    WHERE job_id = NEW.job_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_job_stats_status AFTER UPDATE OF status ON candidates
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE job_stats SET
+        pending = pending + (NEW.status IS 'pending') - (OLD.status IS 'pending'),
+        viewed = viewed + (NEW.status IS 'viewed') - (OLD.status IS 'viewed'),
+        accepted = accepted + (NEW.status IS 'accepted') - (OLD.status IS 'accepted'),
+        rejected = rejected + (NEW.status IS 'rejected') - (OLD.status IS 'rejected'),
+        contacted = contacted + (NEW.status IS 'contacted') - (OLD.status IS 'contacted')
+    WHERE job_id = NEW.job_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_job_stats_delete AFTER DELETE ON candidates
+BEGIN
+    UPDATE job_stats SET
+        total = total - 1,
+        pending = pending - (OLD.status IS 'pending'),
+        viewed = viewed - (OLD.status IS 'viewed'),
+        accepted = accepted - (OLD.status IS 'accepted'),
+        rejected = rejected - (OLD.status IS 'rejected'),
+        contacted = contacted - (OLD.status IS 'contacted')
+    WHERE job_id = OLD.job_id;
+END;
@@ -0,0 +1,12 @@
+-- Persistent tier of the LLM response cache (see llm_cache.py)
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,           -- sha256 of model, prompt, schema, config
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,          -- bytes of response
+    created_at REAL NOT NULL,       -- unix time, for TTL
+    last_used_at REAL NOT NULL      -- unix time, for LRU eviction
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache (created_at);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_at);
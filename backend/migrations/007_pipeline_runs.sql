@@ -0,0 +1,22 @@
+-- Durable queue of pipeline runs, claimed by workers under a lease
+
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    requested INTEGER NOT NULL,             -- candidates asked for
+    produced INTEGER NOT NULL DEFAULT 0,    -- candidates saved so far (checkpoint)
+    batches_completed INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',   -- queued, running, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    claimed_by TEXT,                        -- worker id holding the lease
+    lease_expires_at REAL,                  -- unix time
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
+
+-- Claim order: oldest queued run, or oldest running run whose lease expired
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_claim ON pipeline_runs (state, lease_expires_at, id);
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_job ON pipeline_runs (job_id, id);
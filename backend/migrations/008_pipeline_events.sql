@@ -0,0 +1,11 @@
+-- Pipeline progress events published by worker processes, relayed to SSE by the API
+
+CREATE TABLE IF NOT EXISTS pipeline_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,        -- JSON payload
+    created_at REAL NOT NULL   -- unix time
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_events_created ON pipeline_events (created_at);
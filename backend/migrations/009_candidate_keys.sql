@@ -0,0 +1,17 @@
+-- Per-job dedup index: normalized email, LinkedIn URL and name+company
+-- fingerprint of every saved candidate (see dedup.py)
+
+CREATE TABLE IF NOT EXISTS candidate_keys (
+    job_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,          -- email, linkedin, name_company
+    key TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    PRIMARY KEY (job_id, kind, key),
+    FOREIGN KEY (candidate_id) REFERENCES candidates(id)
+) WITHOUT ROWID;
+
+-- Which candidates already have keys (dedup.py backfills the rest)
+CREATE INDEX IF NOT EXISTS idx_candidate_keys_candidate ON candidate_keys (candidate_id);
+
+-- Sourced profiles dropped as duplicates, next to the trigger-kept counters
+ALTER TABLE job_stats ADD COLUMN duplicates INTEGER NOT NULL DEFAULT 0;
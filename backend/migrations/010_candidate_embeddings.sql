@@ -0,0 +1,4 @@
+-- Hashed bag-of-words embedding per candidate (float16 bytes, see embeddings.py),
+-- written at insert so the vector index loads without re-embedding
+
+ALTER TABLE candidates ADD COLUMN embedding BLOB;
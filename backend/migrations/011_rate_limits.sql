@@ -0,0 +1,9 @@
+-- Shared rate limiter state (RATE_LIMIT_STORE=sqlite): one GCRA theoretical
+-- arrival time per action:ip key, so limits hold across uvicorn workers
+
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    tat REAL NOT NULL   -- unix time; the key is idle once this has passed
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits (tat);
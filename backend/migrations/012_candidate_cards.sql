@@ -0,0 +1,44 @@
+-- The swiper card ({"candidate": ..., "match": ...}) for each matched
+-- candidate, serialized once when its match is written so the review
+-- endpoints can send it as-is. Cards are only served to the reviewer who
+-- just claimed them, so the candidate status in the card is always 'viewed'.
+
+ALTER TABLE candidates ADD COLUMN card TEXT;
+
+CREATE TRIGGER IF NOT EXISTS trg_candidate_card_insert AFTER INSERT ON matches
+BEGIN
+    UPDATE candidates SET card = json_object(
+        'candidate', json_object(
+            'id', id, 'name', name, 'current_role', current_role, 'current_company', current_company,
+            'years_experience', years_experience, 'skills', json(skills), 'location', location,
+            'email', email, 'linkedin_summary', linkedin_summary, 'linkedin_url', linkedin_url,
+            'company_website', company_website, 'status', 'viewed'
+        ),
+        'match', json_object(
+            'id', NEW.id, 'score', NEW.score, 'key_highlights', json(NEW.key_highlights),
+            'fit_reasoning', NEW.fit_reasoning, 'rank_position', NEW.rank_position
+        )
+    )
+    WHERE id = NEW.candidate_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_candidate_card_update
+AFTER UPDATE OF score, key_highlights, fit_reasoning, rank_position ON matches
+BEGIN
+    UPDATE candidates SET card = json_object(
+        'candidate', json_object(
+            'id', id, 'name', name, 'current_role', current_role, 'current_company', current_company,
+            'years_experience', years_experience, 'skills', json(skills), 'location', location,
+            'email', email, 'linkedin_summary', linkedin_summary, 'linkedin_url', linkedin_url,
+            'company_website', company_website, 'status', 'viewed'
+        ),
+        'match', json_object(
+            'id', NEW.id, 'score', NEW.score, 'key_highlights', json(NEW.key_highlights),
+            'fit_reasoning', NEW.fit_reasoning, 'rank_position', NEW.rank_position
+        )
+    )
+    WHERE id = NEW.candidate_id;
+END;
+
+-- Backfill existing matches through the update trigger
+UPDATE matches SET rank_position = rank_position;
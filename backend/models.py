@@ -1,7 +1,7 @@
 """Pydantic models for API requests and responses."""
 
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -69,6 +69,18 @@ class OutreachSendRequest(BaseModel):
     body: str
 
 
+class Decision(BaseModel):
+    candidate_id: int
+    decision: Literal["accept", "reject"]
+
+
+class DecisionBatch(BaseModel):
+    reviewer_id: Optional[str] = None
+    decisions: List[Decision]
+    # Size of the review window to return after applying the decisions
+    limit: int = 1
+
+
 class StatsResponse(BaseModel):
     total: int
     pending: int
@@ -76,3 +88,5 @@ class StatsResponse(BaseModel):
     accepted: int
     rejected: int
     contacted: int
+    duplicates: int = 0
+    dedup_rate: float = 0.0
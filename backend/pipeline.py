@@ -0,0 +1,407 @@
+"""Staged sourcing -> matching -> pitch pipeline.
+
+Each agent runs as its own pool of asyncio workers, joined by bounded
+queues. Batch N+1 is being sourced while batch N is matched and batch N-1
+pitched, and a full queue makes the upstream stage wait (backpressure).
+Sourced candidates are streamed to matching one at a time, so the first
+match call starts as soon as the first profile is complete.
+
+Profiles that duplicate one already seen for the job (dedup.py) are
+dropped as they stream in, and the shortfall is sourced again, so a run
+delivers the requested number of unique candidates.
+
+Batch sizes come from a BatchSizer per stage (batching.py): small first
+batches so the first card arrives quickly, larger ones after that. A
+response that fails to parse is not fatal: a sourcing batch's shortfall
+is sourced again and a matching batch is retried as two halves.
+"""
+
+import asyncio
+import json
+import os
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from database import (
+    transaction, create_candidates_bulk, create_matches_bulk, create_outreach_bulk, get_job_stats,
+    add_job_duplicates
+)
+from batching import BATCH_SIZE, ADAPTIVE, BatchSizer
+from dedup import DedupIndex, dedup_index, candidate_keys, find_existing_keys, save_keys
+from embeddings import embed_candidates, to_blob
+from prescore import PRESCORE_THRESHOLD, PRESCORED, LLM_CALLS_SAVED, prescore, split_batch, local_match
+from events import (
+    EventBus, event_bus, BATCH_SOURCED, BATCH_MATCHED, PITCH_READY, PIPELINE_DONE, PIPELINE_FAILED
+)
+from metrics import (
+    PIPELINE_SECONDS, PIPELINE_STAGE_SECONDS, PIPELINE_BATCH_CANDIDATES, PIPELINE_IN_FLIGHT,
+    PIPELINE_QUEUE_DEPTH, MATCHES_DROPPED
+)
+
+SOURCING_CONCURRENCY = int(os.environ.get("PIPELINE_SOURCING_CONCURRENCY", "2"))
+MATCHING_CONCURRENCY = int(os.environ.get("PIPELINE_MATCHING_CONCURRENCY", "2"))
+PITCH_CONCURRENCY = int(os.environ.get("PIPELINE_PITCH_CONCURRENCY", "2"))
+QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "2"))
+# Give up on further sourcing after this many batches in a row were all duplicates
+MAX_DUPLICATE_BATCHES = int(os.environ.get("PIPELINE_MAX_DUPLICATE_BATCHES", "3"))
+# Fail the run after this many sourcing responses in a row failed to parse
+MAX_PARSE_FAILURES = int(os.environ.get("PIPELINE_MAX_PARSE_FAILURES", "3"))
+
+# Matches scoring at least this get a pitch written ahead of time
+PITCH_SCORE_THRESHOLD = 75
+
+_DONE = object()
+
+# Inter-stage queues of running pipelines, summed when metrics are scraped
+_live_queues = {"match": weakref.WeakSet(), "pitch": weakref.WeakSet()}
+for _name, _queues in _live_queues.items():
+    PIPELINE_QUEUE_DEPTH.labels(queue=_name).set_function(
+        lambda queues=_queues: sum(q.qsize() for q in queues)
+    )
+
+
+class SourcingPlan:
+    """Hands out batch sizes until `count` candidates have been produced.
+
+    Shortfalls (the agent returning fewer profiles than asked for) are put
+    back, so concurrent sourcing workers still reach the requested total.
+    """
+
+    def __init__(self, count: int, next_size: Callable[[bool], int]):
+        self.remaining = count
+        self.next_size = next_size
+        self.batches = 0
+        self.in_flight = 0
+        self.stopped = False
+        self._changed = asyncio.Condition()
+
+    async def take(self) -> int:
+        """Reserve the next batch; returns 0 once the plan is complete."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.remaining > 0 or self.in_flight == 0)
+            if self.remaining <= 0:
+                return 0
+            size = min(self.next_size(self.batches == 0), self.remaining)
+            self.batches += 1
+            self.remaining -= size
+            self.in_flight += 1
+            return size
+
+    async def finish(self, requested: int, produced: int):
+        """Record a finished batch, returning any shortfall to the plan."""
+        async with self._changed:
+            self.in_flight -= 1
+            if not self.stopped:
+                self.remaining += max(0, requested - produced)
+            self._changed.notify_all()
+
+    async def stop(self):
+        """Hand out no more batches (batches in flight still finish)."""
+        async with self._changed:
+            self.stopped = True
+            self.remaining = 0
+            self._changed.notify_all()
+
+
+class JobPipeline:
+    """Runs the sourcing, matching and pitch agents as concurrent stages."""
+
+    def __init__(self, sourcing_agent, matching_agent, pitch_writer_agent,
+                 batch_size: int = BATCH_SIZE,
+                 sourcing_concurrency: int = SOURCING_CONCURRENCY,
+                 matching_concurrency: int = MATCHING_CONCURRENCY,
+                 pitch_concurrency: int = PITCH_CONCURRENCY,
+                 queue_size: int = QUEUE_SIZE,
+                 events: EventBus = event_bus,
+                 dedup: DedupIndex = dedup_index,
+                 prescore_threshold: float = PRESCORE_THRESHOLD,
+                 adaptive_batching: bool = ADAPTIVE,
+                 eager_pitches: bool = True):
+        self.sourcing_agent = sourcing_agent
+        self.matching_agent = matching_agent
+        self.pitch_writer_agent = pitch_writer_agent
+        self.batch_size = batch_size
+        # Shared by every run, so what one run learns about latency and
+        # output size carries over to the next
+        self.sourcing_sizer = BatchSizer("sourcing", batch_size, adaptive=adaptive_batching)
+        self.matching_sizer = BatchSizer("matching", batch_size, adaptive=adaptive_batching)
+        self.sourcing_concurrency = sourcing_concurrency
+        self.matching_concurrency = matching_concurrency
+        self.pitch_concurrency = pitch_concurrency
+        self.queue_size = queue_size
+        self.events = events
+        self.dedup = dedup
+        self.prescore_threshold = prescore_threshold
+        # False leaves pitches to the API's prefetcher (prefetch.py)
+        self.eager_pitches = eager_pitches
+
+    async def run(self, job: Dict[str, Any], count: int,
+                  checkpoint: Optional[Callable[[Any, int], Awaitable[None]]] = None):
+        """Source, match and pitch `count` candidates for `job`.
+
+        Any stage failing cancels the others and the error propagates.
+        `checkpoint(db, saved)` is awaited inside each batch's save
+        transaction, so progress records commit (or roll back) with it.
+        """
+        plan = SourcingPlan(count, self.sourcing_sizer.size)
+        # Sourced candidates are queued one at a time; matching takes
+        # whatever is ready, up to a batch, per LLM call
+        to_match: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size * self.matching_sizer.max_size)
+        to_pitch: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        _live_queues["match"].add(to_match)
+        _live_queues["pitch"].add(to_pitch)
+        duplicate_batches = parse_failures = matched_batches = 0
+
+        async def source(_):
+            nonlocal duplicate_batches, parse_failures
+            while size := await plan.take():
+                produced = duplicates = output_tokens = 0
+                started = time.perf_counter()
+                # Time spent waiting on a full matching queue is not the LLM's
+                blocked = 0.0
+                try:
+                    print(f"Sourcing batch of {size} for job {job['id']}...")
+                    try:
+                        async for candidate in self.sourcing_agent.stream_candidates(job, count=size):
+                            output_tokens += len(json.dumps(candidate)) // 4
+                            if await self.dedup.admit(job['id'], candidate) is not None:
+                                duplicates += 1
+                                continue
+                            produced += 1
+                            waited = time.perf_counter()
+                            await to_match.put(candidate)
+                            blocked += time.perf_counter() - waited
+                    except json.JSONDecodeError:
+                        self.sourcing_sizer.observe(size, time.perf_counter() - started - blocked, failed=True)
+                        parse_failures += 1
+                        if parse_failures >= MAX_PARSE_FAILURES:
+                            raise
+                        # Whatever streamed in before the break is kept;
+                        # the shortfall goes back to the plan
+                        print(f"Sourcing response for job {job['id']} failed to parse; "
+                              f"keeping {produced} and retrying the rest")
+                        continue
+                    finally:
+                        if duplicates:
+                            await add_job_duplicates(job['id'], duplicates)
+                    parse_failures = 0
+                    self.sourcing_sizer.observe(size, time.perf_counter() - started - blocked, output_tokens)
+                    if not produced and not duplicates:
+                        raise ValueError("Sourcing agent returned no candidates")
+                    duplicate_batches = 0 if produced else duplicate_batches + 1
+                    if duplicate_batches >= MAX_DUPLICATE_BATCHES:
+                        print(f"Sourcing for job {job['id']} keeps returning duplicates; stopping early")
+                        await plan.stop()
+                    PIPELINE_STAGE_SECONDS.labels(stage="sourcing").observe(time.perf_counter() - started)
+                    PIPELINE_BATCH_CANDIDATES.labels(stage="sourcing").observe(produced)
+                    self.events.publish(job['id'], BATCH_SOURCED, candidates=produced, duplicates=duplicates)
+                finally:
+                    await plan.finish(size, produced)
+
+        def match_batch() -> Tuple[int, float]:
+            return self.matching_sizer.size(first=matched_batches == 0), \
+                self.matching_sizer.linger(first=matched_batches == 0)
+
+        async def match(candidates):
+            nonlocal matched_batches
+            matched_batches += 1
+            with PIPELINE_STAGE_SECONDS.labels(stage="matching").time():
+                batch = await self._match_and_save(job, candidates, checkpoint)
+            PIPELINE_BATCH_CANDIDATES.labels(stage="matching").observe(len(batch['candidate_ids']))
+            self.events.publish(job['id'], BATCH_MATCHED,
+                                candidates=len(batch['candidate_ids']),
+                                top_score=batch['top_score'],
+                                stats=await get_job_stats(job['id']))
+            if batch['top_matches'] and self.eager_pitches:
+                await to_pitch.put(batch)
+
+        async def pitch(batch):
+            with PIPELINE_STAGE_SECONDS.labels(stage="pitch").time():
+                await self._pitch(job, batch)
+
+        started = time.perf_counter()
+        PIPELINE_IN_FLIGHT.inc()
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(_run_stage(self.sourcing_concurrency, None, source,
+                                             to_match, self.matching_concurrency))
+                group.create_task(_run_stage(self.matching_concurrency, to_match, match,
+                                             to_pitch, self.pitch_concurrency, max_items=match_batch))
+                group.create_task(_run_stage(self.pitch_concurrency, to_pitch, pitch))
+        except ExceptionGroup as group_error:
+            # Surface the stage's own error rather than the group wrapper
+            error = group_error.exceptions[0]
+            # Keys reserved for candidates that were never saved would
+            # otherwise block them on retry; reload from the table instead
+            self.dedup.forget(job['id'])
+            PIPELINE_SECONDS.labels(outcome="failed").observe(time.perf_counter() - started)
+            self.events.publish(job['id'], PIPELINE_FAILED, error=str(error))
+            raise error
+        finally:
+            PIPELINE_IN_FLIGHT.dec()
+            _live_queues["match"].discard(to_match)
+            _live_queues["pitch"].discard(to_pitch)
+
+        PIPELINE_SECONDS.labels(outcome="done").observe(time.perf_counter() - started)
+        self.events.publish(job['id'], PIPELINE_DONE, stats=await get_job_stats(job['id']))
+
+    async def _match_and_save(self, job: Dict[str, Any], candidates: List[Dict[str, Any]],
+                              checkpoint: Optional[Callable[[Any, int], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """Rank a sourced batch and persist candidates and matches together.
+
+        Candidates under the local pre-score threshold keep their heuristic
+        score; only the rest go to the matching agent, best first.
+        """
+        scores = prescore(job, candidates)
+        to_llm, local = split_batch(scores, self.prescore_threshold)
+        PRESCORED.labels(route="llm").inc(len(to_llm))
+        PRESCORED.labels(route="local").inc(len(local))
+
+        matches = []
+        if to_llm:
+            ranked = await self._rank(job, [candidates[i] for i in to_llm])
+            print(f"Ranked {len(ranked)} candidates in batch ({len(local)} pre-scored locally)")
+            matches = [{**m, 'candidate_index': to_llm[m['candidate_index']]} for m in ranked]
+        else:
+            LLM_CALLS_SAVED.inc()
+        for i in local:
+            matches.append({**local_match(job, candidates[i], i, scores[i]), 'rank_position': len(matches) + 1})
+        keys = [candidate_keys(c) for c in candidates]
+
+        # Save candidates and their matches in one transaction, so a failed
+        # batch never leaves unmatched candidates behind
+        async with transaction() as db:
+            # The table is authoritative across processes; the in-memory
+            # index already dropped duplicates seen by this one
+            taken = await find_existing_keys(job['id'], [k for own in keys for k in own], db=db)
+            keep = [i for i, own in enumerate(keys) if not taken.intersection(own)]
+            if len(keep) < len(candidates):
+                await add_job_duplicates(job['id'], len(candidates) - len(keep), db=db)
+                position = {old: new for new, old in enumerate(keep)}
+                candidates = [candidates[i] for i in keep]
+                keys = [keys[i] for i in keep]
+                matches = [{**m, 'candidate_index': position[m['candidate_index']]}
+                           for m in matches if m['candidate_index'] in position]
+            candidate_ids = await create_candidates_bulk(
+                job['id'], candidates, db=db, embeddings=[to_blob(v) for v in embed_candidates(candidates)]
+            )
+            await save_keys(db, job['id'], [(kind, key, candidate_id)
+                                            for own, candidate_id in zip(keys, candidate_ids)
+                                            for kind, key in own])
+            # rank_position stays the agent's in-batch rank; serving order
+            # comes from the score-ordered queue maintained on insert
+            await create_matches_bulk(job['id'], [
+                {**match, 'candidate_id': candidate_ids[match['candidate_index']]}
+                for match in matches
+            ], db=db)
+            if checkpoint is not None:
+                await checkpoint(db, len(candidate_ids))
+
+        return {
+            'candidates': candidates,
+            'candidate_ids': candidate_ids,
+            'top_score': max((m['score'] for m in matches), default=None),
+            'top_matches': [m for m in matches if m['score'] >= PITCH_SCORE_THRESHOLD],
+        }
+
+    async def _rank(self, job: Dict[str, Any], candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Matches from the matching agent, with out-of-range indices dropped.
+
+        A response that fails to parse is retried as two halves (down to
+        single candidates), whose results are merged best-first.
+        """
+        started = time.perf_counter()
+        try:
+            ranked = await self.matching_agent.rank_candidates(job, candidates)
+        except json.JSONDecodeError:
+            self.matching_sizer.observe(len(candidates), time.perf_counter() - started, failed=True)
+            if len(candidates) == 1:
+                raise
+            half = len(candidates) // 2
+            print(f"Matching response for {len(candidates)} candidates failed to parse; retrying in halves")
+            merged = await self._rank(job, candidates[:half]) + [
+                {**m, 'candidate_index': m['candidate_index'] + half}
+                for m in await self._rank(job, candidates[half:])
+            ]
+            merged.sort(key=lambda m: -m['score'])
+            return [{**m, 'rank_position': i + 1} for i, m in enumerate(merged)]
+        self.matching_sizer.observe(len(candidates), time.perf_counter() - started, len(json.dumps(ranked)) // 4)
+        in_range = [m for m in ranked if 0 <= m['candidate_index'] < len(candidates)]
+        if len(in_range) < len(ranked):
+            MATCHES_DROPPED.inc(len(ranked) - len(in_range))
+        return in_range
+
+    async def _pitch(self, job: Dict[str, Any], batch: Dict[str, Any]):
+        """Pre-generate pitches for a batch's top matches and save them together."""
+        async def generate_pitch(match_data):
+            idx = match_data['candidate_index']
+            c_id = batch['candidate_ids'][idx]
+            c_data = batch['candidates'][idx]
+            if isinstance(c_data['skills'], str):
+                c_data['skills'] = json.loads(c_data['skills'])
+
+            try:
+                pitch = await self.pitch_writer_agent.create_pitch(job, c_data, match_data)
+                return {
+                    'candidate_id': c_id,
+                    'subject': pitch['subject'],
+                    'body': pitch['body'],
+                    'delivery_status': "generated"
+                }
+            except Exception as e:
+                print(f"Error in parallel pitch gen for {c_id}: {e}")
+                return None
+
+        pitches = [p for p in await asyncio.gather(*(generate_pitch(m) for m in batch['top_matches'])) if p]
+        await create_outreach_bulk(job['id'], pitches)
+        for pitch in pitches:
+            self.events.publish(job['id'], PITCH_READY, candidate_id=pitch['candidate_id'])
+
+
+async def _run_stage(workers: int, inbox: asyncio.Queue, handle: Callable[[Any], Awaitable[None]],
+                     outbox: asyncio.Queue = None, downstream_workers: int = 0,
+                     max_items: Union[int, Callable[[], Tuple[int, float]]] = 1):
+    """Run `workers` copies of a stage, then tell the next stage it is done.
+
+    With no inbox, each worker calls `handle(None)` once and is expected to
+    loop on its own (the sourcing stage pulls from its plan instead). With
+    max_items other than 1, `handle` receives a list: the next item plus
+    whatever else is already queued, up to max_items. A callable max_items
+    returns (limit, linger) per batch: a batch short of the limit waits up
+    to `linger` seconds for more items.
+    """
+    async def worker():
+        if inbox is None:
+            await handle(None)
+            return
+        while (item := await inbox.get()) is not _DONE:
+            if max_items == 1:
+                await handle(item)
+                continue
+            items = [item]
+            finished = False
+            limit, linger = max_items() if callable(max_items) else (max_items, 0)
+            deadline = time.perf_counter() + linger
+            while len(items) < limit:
+                if not inbox.empty():
+                    item = inbox.get_nowait()
+                elif (remaining := deadline - time.perf_counter()) > 0:
+                    try:
+                        item = await asyncio.wait_for(inbox.get(), remaining)
+                    except TimeoutError:
+                        break
+                else:
+                    break
+                if item is _DONE:
+                    finished = True
+                    break
+                items.append(item)
+            await handle(items)
+            if finished:
+                return
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    if outbox is not None:
+        for _ in range(max(1, downstream_workers)):
+            await outbox.put(_DONE)
@@ -0,0 +1,149 @@
+"""Pitch prefetching that follows each job's review cursor.
+
+Every time a reviewer is served a card (or a window of them), the
+prefetcher makes sure a pitch is being written for that card and for the
+next PITCH_PREFETCH_DEPTH candidates in serving order (best rank_score
+first, as claim_candidates claims them) that score at least
+PITCH_PREFETCH_MIN_SCORE. Pitches are
+saved as 'generated' outreach drafts, the same as pipeline-made ones, so
+accepting a candidate finds one ready.
+
+Rejecting a candidate cancels its pitch if one is still queued or being
+written. A pitch that is already written is left to finish saving: the
+save discards it if the candidate was rejected meanwhile, and cancelling
+it inside its write transaction would leave that to the pool to clean up.
+When a candidate is accepted while its pitch is still queued behind
+other prefetches, the queued work is dropped and the endpoint writes the
+pitch itself at interactive priority. A pitch that has already started
+is awaited instead.
+
+Accepts are counted in pitch_prefetch_accepts_total{outcome}:
+  hit        a pitch was ready
+  in_flight  a pitch was being written and was awaited
+  miss       the pitch was written on demand
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+from agents import PRIORITY_PIPELINE
+from database import get_job, list_upcoming_candidates, save_prefetched_pitch
+from events import EventBus, event_bus, PITCH_READY
+from metrics import Counter, Gauge
+
+PREFETCH_DEPTH = int(os.environ.get("PITCH_PREFETCH_DEPTH", "3"))
+PREFETCH_CONCURRENCY = int(os.environ.get("PITCH_PREFETCH_CONCURRENCY", "2"))
+# Cards scoring below this are rarely accepted; their pitches are written on demand
+PREFETCH_MIN_SCORE = int(os.environ.get("PITCH_PREFETCH_MIN_SCORE", "60"))
+
+PREFETCH_ACCEPTS = Counter("pitch_prefetch_accepts_total", "Accepted candidates, by whether a pitch was prefetched",
+                           ["outcome"])
+PREFETCH_PITCHES = Counter("pitch_prefetch_pitches_total", "Prefetched pitches, by how they ended", ["result"])
+PREFETCH_IN_FLIGHT = Gauge("pitch_prefetch_in_flight", "Prefetched pitches queued or being written")
+
+
+class PitchPrefetcher:
+    """Keeps pitches warm for the cards each job's reviewers will see next."""
+
+    def __init__(self, pitch_writer_agent, depth: int = PREFETCH_DEPTH,
+                 concurrency: int = PREFETCH_CONCURRENCY, min_score: int = PREFETCH_MIN_SCORE,
+                 events: EventBus = event_bus):
+        self.pitch_writer_agent = pitch_writer_agent
+        self.depth = depth
+        self.min_score = min_score
+        self.events = events
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._started: set = set()
+        # Pitches written and being saved; cancel() leaves these alone
+        self._saving: set = set()
+        self._refreshes: set = set()
+        PREFETCH_IN_FLIGHT.set_function(lambda: len(self._tasks))
+
+    @property
+    def enabled(self) -> bool:
+        return self.depth > 0
+
+    def advance(self, job_id: int, served: List[Dict[str, Any]] = ()):
+        """Cards were served: warm the first of them and the `depth` after it,
+        continuing into the pending queue (runs in the background)."""
+        if not self.enabled:
+            return
+        refresh = asyncio.create_task(self._refresh(job_id, served))
+        self._refreshes.add(refresh)
+        refresh.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, job_id: int, served: List[Dict[str, Any]]):
+        try:
+            window = [{**row, 'has_pitch': None} for row in served[:self.depth + 1]]
+            if len(window) <= self.depth:
+                window += await list_upcoming_candidates(job_id, self.depth + 1 - len(window))
+            wanted = [row for row in window if not row['has_pitch'] and row['score'] >= self.min_score
+                      and row['id'] not in self._tasks]
+            if not wanted:
+                return
+            job = await get_job(job_id)
+            for row in wanted:
+                if row['id'] not in self._tasks:
+                    self._tasks[row['id']] = asyncio.create_task(self._generate(job, row))
+        except Exception as e:
+            print(f"Pitch prefetch for job {job_id} failed: {e}")
+
+    async def _generate(self, job: Dict[str, Any], candidate: Dict[str, Any]) -> Optional[int]:
+        candidate_id = candidate['id']
+        try:
+            async with self._slots:
+                self._started.add(candidate_id)
+                pitch = await self.pitch_writer_agent.create_pitch(job, candidate, candidate,
+                                                                   priority=PRIORITY_PIPELINE)
+            self._saving.add(candidate_id)
+            outreach_id = await asyncio.shield(
+                save_prefetched_pitch(job['id'], candidate_id, pitch['subject'], pitch['body']))
+            # None: rejected meanwhile, or a draft was written another way
+            PREFETCH_PITCHES.labels(result="saved" if outreach_id else "discarded").inc()
+            if outreach_id:
+                self.events.publish(job['id'], PITCH_READY, candidate_id=candidate_id)
+            return outreach_id
+        except asyncio.CancelledError:
+            PREFETCH_PITCHES.labels(result="cancelled").inc()
+            raise
+        except Exception as e:
+            PREFETCH_PITCHES.labels(result="failed").inc()
+            print(f"Prefetching pitch for candidate {candidate_id} failed: {e}")
+            return None
+        finally:
+            self._started.discard(candidate_id)
+            self._saving.discard(candidate_id)
+            if self._tasks.get(candidate_id) is asyncio.current_task():
+                del self._tasks[candidate_id]
+
+    def cancel(self, candidate_id: int):
+        """Drop a candidate's pitch (it was rejected), unless it is being saved."""
+        if candidate_id in self._saving:
+            return
+        task = self._tasks.pop(candidate_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def wait(self, candidate_id: int) -> bool:
+        """For an accepted candidate: await its pitch if one is being written.
+
+        Returns False (and drops the queued work) if there is none or it
+        has not started, leaving the caller to write the pitch itself.
+        """
+        task = self._tasks.get(candidate_id)
+        if task is None:
+            return False
+        if candidate_id not in self._started:
+            self.cancel(candidate_id)
+            return False
+        return await asyncio.shield(task) is not None
+
+    async def stop(self):
+        """Cancel all prefetch work (shutdown)."""
+        pending = list(self._refreshes) + list(self._tasks.values())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks.clear()
@@ -1,20 +1,125 @@
-"""Simple in-memory IP-based rate limiter."""
+"""IP-based rate limiter (GCRA).
 
+A limit of `limit` requests per `window` seconds is enforced with the
+generic cell rate algorithm. Each action:ip key keeps one number, its
+theoretical arrival time (TAT): when the next request would be due if
+requests came evenly, one every window / limit seconds. A request is
+allowed if moving the TAT on by one interval keeps it within `window` of
+now. So up to `limit` requests can come in a burst, and after that one
+more each interval. Checks take O(1) time and state per key, whatever
+the limit.
+
+Once a key's TAT has passed, the key is back to a full burst and storing
+it changes nothing. Keys like that are swept out every
+RATE_LIMIT_SWEEP_SECONDS, so memory follows the number of recently
+active clients rather than every IP ever seen. In memory, keys also sit
+in a queue in the order they were added; a sweep works through it
+SWEEP_BATCH keys per check, rather than stopping the event loop to walk
+(or copy) all of them, and puts the live ones back at the end.
+
+RATE_LIMIT_STORE=sqlite keeps TATs in the app database instead of process
+memory, so limits hold across uvicorn workers. Each check is then one
+upsert.
+"""
+
+import math
+import os
 import time
-from collections import defaultdict
+from collections import deque
+from typing import Deque, Dict
+
 from fastapi import HTTPException
 
+from database import prune_rate_limits, rate_limit_acquire
+from metrics import Counter, Gauge
+
+RATE_LIMIT_STORE = os.environ.get("RATE_LIMIT_STORE", "memory")
+SWEEP_SECONDS = float(os.environ.get("RATE_LIMIT_SWEEP_SECONDS", "60"))
+# Keys a sweep in progress examines per check
+SWEEP_BATCH = 1000
+
+RATE_LIMIT_CHECKS = Counter("rate_limit_checks_total", "Rate limit checks, by action and result",
+                            ["action", "result"])
+RATE_LIMIT_KEYS = Gauge("rate_limit_keys", "Keys held by the in-memory rate limiter")
+
+
+class MemoryStore:
+    """TATs in a dict, for a single process."""
+
+    def __init__(self, sweep_seconds: float = SWEEP_SECONDS):
+        self.sweep_seconds = sweep_seconds
+        self._tat: Dict[str, float] = {}
+        # Every key in _tat, once each, oldest-examined first
+        self._keys: Deque[str] = deque()
+        self._next_sweep = 0.0
+        # Keys the current sweep has yet to examine (the front of _keys)
+        self._unswept = 0
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    async def acquire(self, key: str, now: float, interval: float, window: float) -> float:
+        """0 if the request is allowed (and recorded), else seconds until it would be."""
+        if self._unswept or now >= self._next_sweep:
+            self._sweep_step(now)
+        tat = max(self._tat.get(key, now), now) + interval
+        if tat - now > window:
+            return tat - now - window
+        if key not in self._tat:
+            self._keys.append(key)
+        self._tat[key] = tat
+        return 0.0
+
+    def _sweep_step(self, now: float, batch: int = SWEEP_BATCH) -> int:
+        """Examine the next `batch` keys of the sweep (starting one if none
+        is in progress) and drop those whose TAT has passed."""
+        if not self._unswept:
+            self._unswept = len(self._keys)
+            self._next_sweep = now + self.sweep_seconds
+        count = min(batch, self._unswept)
+        self._unswept -= count
+        dropped = 0
+        for _ in range(count):
+            key = self._keys.popleft()
+            if self._tat[key] <= now:
+                del self._tat[key]
+                dropped += 1
+            else:
+                self._keys.append(key)
+        return dropped
+
+    def sweep(self, now: float) -> int:
+        """Run a whole sweep at once; returns how many keys were dropped."""
+        self._unswept = 0
+        return self._sweep_step(now, batch=len(self._keys))
+
+
+class SQLiteStore:
+    """TATs in the app database, shared by every process using it."""
+
+    def __init__(self, sweep_seconds: float = SWEEP_SECONDS):
+        self.sweep_seconds = sweep_seconds
+        self._next_sweep = 0.0
+
+    async def acquire(self, key: str, now: float, interval: float, window: float) -> float:
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_seconds
+            await prune_rate_limits(now)
+        return await rate_limit_acquire(key, now, interval, window)
+
 
 class RateLimiter:
-    def __init__(self):
-        self._requests = defaultdict(list)
+    def __init__(self, store=None):
+        if store is None:
+            store = SQLiteStore() if RATE_LIMIT_STORE == "sqlite" else MemoryStore()
+        self.store = store
+        if isinstance(store, MemoryStore):
+            RATE_LIMIT_KEYS.set_function(lambda: len(store))
 
-    def check(self, action: str, ip: str, limit: int, window: int):
+    async def check(self, action: str, ip: str, limit: int, window: int):
         """Raise 429 if IP exceeds limit within window (seconds)."""
-        key = f"{action}:{ip}"
-        now = time.time()
-        # Prune old entries
-        self._requests[key] = [t for t in self._requests[key] if now - t < window]
-        if len(self._requests[key]) >= limit:
-            raise HTTPException(status_code=429, detail="Rate limit exceeded. Try again later.")
-        self._requests[key].append(now)
+        retry_after = await self.store.acquire(f"{action}:{ip}", time.time(), window / limit, window)
+        RATE_LIMIT_CHECKS.labels(action=action, result="limited" if retry_after else "allowed").inc()
+        if retry_after:
+            raise HTTPException(status_code=429, detail="Rate limit exceeded. Try again later.",
+                                headers={"Retry-After": str(math.ceil(retry_after))})
@@ -14,18 +14,22 @@ from agents import SourcingAgent, MatchingAgent
 load_dotenv()
 
 async def run_tests():
-    # Verify API key is set
+    # Verify API key is set (not needed with LLM_BACKEND=fake)
     api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    if not api_key or api_key == "your_api_key_here":
+    if os.getenv("LLM_BACKEND") == "fake":
+        print("✓ Using offline fake LLM backend")
+    elif not api_key or api_key == "your_api_key_here":
         print("❌ Error: GEMINI_API_KEY not set in .env file")
         print("Please add your Gemini API key to backend/.env")
         return
-
-    print("✓ API key found")
+    else:
+        print("✓ API key found")
 
     # Test data
     test_job = {
         'title': 'Senior Full-Stack Engineer',
+        'company': 'Acme',
+        'company_website': 'https://acme.com',
         'required_skills': '["React", "Node.js", "PostgreSQL", "AWS"]',
         'experience_level': 'Senior',
         'location': 'Remote (US)'
@@ -0,0 +1,296 @@
+"""Durable pipeline runs: workers that claim queued runs under a lease.
+
+The API enqueues a row in pipeline_runs; a pool of workers claims runs
+one at a time, renews the lease while the pipeline works, and checkpoints
+each saved batch in the same transaction as the batch itself. A run whose
+worker dies is claimed again once its lease expires and resumes with only
+the candidates still missing. On graceful shutdown held runs are put back
+in the queue straight away.
+
+The pool runs inside the API process by default. With
+PIPELINE_MODE=external the API only enqueues runs and serves reads, and
+pipelines run in separate worker processes started from backend/:
+
+    python worker.py [--processes N] [--concurrency M]
+
+Workers coordinate only through the database. Their progress events are
+written to pipeline_events and relayed into the API's event bus, so the
+SSE stream works the same in both modes.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+import uuid
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+# Load environment variables from .env before the modules below read them
+load_dotenv()
+
+from database import (
+    init_db, open_pool, close_pool, get_job, claim_pipeline_run, renew_pipeline_run_lease, checkpoint_pipeline_run,
+    finish_pipeline_run, release_pipeline_runs, LeaseLostError,
+    append_pipeline_events, list_pipeline_events_after, latest_pipeline_event_id, prune_pipeline_events
+)
+from events import EventBus, Event, event_bus
+from agents import SourcingAgent, MatchingAgent, PitchWriterAgent
+from llm_cache import llm_cache
+from pipeline import JobPipeline
+from prefetch import PREFETCH_DEPTH
+
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", "2"))
+RUN_LEASE_SECONDS = float(os.environ.get("PIPELINE_RUN_LEASE_SECONDS", "60"))
+RUN_MAX_ATTEMPTS = int(os.environ.get("PIPELINE_RUN_MAX_ATTEMPTS", "3"))
+POLL_SECONDS = float(os.environ.get("PIPELINE_POLL_SECONDS", "1"))
+# Lower CPU priority so worker processes on the API's host yield to it
+WORKER_NICE = int(os.environ.get("PIPELINE_WORKER_NICE", "10"))
+EVENTS_FLUSH_SECONDS = float(os.environ.get("PIPELINE_EVENTS_FLUSH_SECONDS", "0.2"))
+EVENTS_RETENTION_SECONDS = float(os.environ.get("PIPELINE_EVENTS_RETENTION_SECONDS", "3600"))
+
+
+class PipelineWorkerPool:
+    """Runs queued pipeline runs with up to `concurrency` at a time."""
+
+    def __init__(self, pipeline, concurrency: int = PIPELINE_WORKERS,
+                 lease_seconds: float = RUN_LEASE_SECONDS, max_attempts: int = RUN_MAX_ATTEMPTS,
+                 poll_seconds: float = POLL_SECONDS, worker_id: Optional[str] = None):
+        self.pipeline = pipeline
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        for _ in range(max(0, self.concurrency)):
+            self._tasks.append(asyncio.create_task(self._loop()))
+
+    def notify(self):
+        """Wake idle workers now instead of at their next poll."""
+        self._wakeup.set()
+
+    async def stop(self):
+        """Cancel the workers and requeue whatever they were running."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        released = await release_pipeline_runs(self.worker_id)
+        if released:
+            print(f"Requeued {released} unfinished pipeline run(s)")
+
+    async def _loop(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                run = await claim_pipeline_run(self.worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"Pipeline worker failed to claim a run: {e}")
+                run = None
+            if run is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.execute(run)
+            except Exception as e:
+                # The run keeps its lease and is claimed again once it expires
+                print(f"Pipeline worker failed on run {run['id']}: {e}")
+
+    async def execute(self, run: Dict[str, Any]):
+        """Run (or resume) one claimed run and record how it ended."""
+        run_id = run['id']
+        job = await get_job(run['job_id'])
+        remaining = run['requested'] - run['produced']
+        if job is None:
+            await finish_pipeline_run(run_id, self.worker_id, "failed", "Job not found")
+            return
+        if remaining <= 0:
+            await finish_pipeline_run(run_id, self.worker_id, "done")
+            return
+
+        if run['produced']:
+            print(f"Resuming pipeline run {run_id} for job {job['id']}: {remaining} of {run['requested']} left")
+        else:
+            print(f"Starting pipeline run {run_id} for job {job['id']}: {job['title']}")
+
+        lease_lost = asyncio.Event()
+
+        async def checkpoint(db, saved: int):
+            # Checked at every saved batch; raising rolls the batch back
+            if lease_lost.is_set():
+                raise LeaseLostError(f"Lease on pipeline run {run_id} lost")
+            await checkpoint_pipeline_run(db, run_id, self.worker_id, saved, self.lease_seconds)
+
+        task = asyncio.create_task(self.pipeline.run(job, remaining, checkpoint=checkpoint))
+        heartbeat = asyncio.create_task(self._heartbeat(run_id, lease_lost))
+        try:
+            await task
+        except LeaseLostError as e:
+            print(f"{e}; leaving it to its new owner")
+            return
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            retry = run['attempts'] < self.max_attempts
+            state = "queued" if retry else "failed"
+            await finish_pipeline_run(run_id, self.worker_id, state, f"{type(e).__name__}: {e}")
+            print(f"Pipeline run {run_id} failed (attempt {run['attempts']}); "
+                  f"{'requeued' if retry else 'giving up'}")
+            return
+        finally:
+            heartbeat.cancel()
+
+        await finish_pipeline_run(run_id, self.worker_id, "done")
+        print(f"Pipeline run {run_id} complete for job {job['id']}")
+
+    async def _heartbeat(self, run_id: int, lease_lost: asyncio.Event):
+        """Renew the lease until the run ends; sets `lease_lost` if it is lost.
+
+        The run is not cancelled outright, which could land inside a batch's
+        save transaction: its next checkpoint raises LeaseLostError instead.
+        """
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                held = await renew_pipeline_run_lease(run_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"Failed to renew lease on pipeline run {run_id}: {e}")
+                continue
+            if not held:
+                lease_lost.set()
+                return
+
+
+class EventForwarder:
+    """Writes a worker process's published events to pipeline_events in batches."""
+
+    def __init__(self, bus: EventBus, flush_seconds: float = EVENTS_FLUSH_SECONDS,
+                 retention_seconds: float = EVENTS_RETENTION_SECONDS):
+        self.flush_seconds = flush_seconds
+        self.retention_seconds = retention_seconds
+        self._pending: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        bus.add_listener(self._collect)
+
+    def _collect(self, event: Event):
+        data = {k: v for k, v in event.data.items() if k != "job_id"}
+        self._pending.append({"job_id": event.job_id, "type": event.type, "data": data})
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+        await append_pipeline_events(events)
+
+    async def _loop(self):
+        last_prune = 0.0
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush()
+                if time.time() - last_prune > self.retention_seconds / 10:
+                    last_prune = time.time()
+                    await prune_pipeline_events(last_prune - self.retention_seconds)
+            except Exception as e:
+                print(f"Failed to persist pipeline events: {e}")
+
+
+async def relay_events(bus: EventBus, poll_seconds: float = EVENTS_FLUSH_SECONDS):
+    """API side of external mode: republish events written by worker processes."""
+    after = await latest_pipeline_event_id()
+    while True:
+        try:
+            rows = await list_pipeline_events_after(after)
+        except Exception as e:
+            print(f"Failed to read pipeline events: {e}")
+            rows = []
+        for row in rows:
+            after = row['id']
+            bus.publish(row['job_id'], row['type'], **json.loads(row['data']))
+        if len(rows) < 500:
+            await asyncio.sleep(poll_seconds)
+
+
+async def serve(concurrency: int = PIPELINE_WORKERS):
+    """Run a worker pool in this process until SIGINT/SIGTERM."""
+    await init_db()
+    await open_pool()
+    # The API process prefetches pitches along the review cursor
+    pipeline = JobPipeline(SourcingAgent(), MatchingAgent(cache=llm_cache), PitchWriterAgent(cache=llm_cache),
+                           eager_pitches=PREFETCH_DEPTH == 0)
+    forwarder = EventForwarder(event_bus)
+    pool = PipelineWorkerPool(pipeline, concurrency=concurrency)
+    forwarder.start()
+    pool.start()
+    print(f"Pipeline worker {pool.worker_id} running {concurrency} concurrent run(s)")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await stopping.wait()
+
+    print(f"Pipeline worker {pool.worker_id} stopping")
+    await pool.stop()
+    await forwarder.stop()
+    await close_pool()
+
+
+def _run_process(concurrency: int, nice: int = WORKER_NICE):
+    if nice:
+        os.nice(nice)
+    asyncio.run(serve(concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued pipeline runs outside the API process.")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to start")
+    parser.add_argument("--concurrency", type=int, default=PIPELINE_WORKERS, help="concurrent runs per process")
+    parser.add_argument("--nice", type=int, default=WORKER_NICE, help="niceness increment for worker processes")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process(args.concurrency, args.nice)
+        return
+
+    # Children get their own event loop, DB pool and LLM clients; SIGINT
+    # from the terminal reaches them directly, SIGTERM is passed on
+    context = multiprocessing.get_context("spawn")
+    children = [context.Process(target=_run_process, args=(args.concurrency, args.nice))
+                for _ in range(args.processes)]
+    for child in children:
+        child.start()
+    signal.signal(signal.SIGTERM, lambda *_: [c.terminate() for c in children if c.is_alive()])
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        for child in children:
+            child.join()
+
+
+if __name__ == "__main__":
+    main()
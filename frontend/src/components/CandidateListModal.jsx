@@ -1,6 +1,6 @@
 import { motion, AnimatePresence } from 'framer-motion';
 
-const CandidateListModal = ({ isOpen, onClose, candidates, statusType, onCandidateClick }) => {
+const CandidateListModal = ({ isOpen, onClose, candidates, total, hasMore, onLoadMore, statusType, onCandidateClick }) => {
   const statusColors = {
     'accepted': 'bg-neo-green',
     'rejected': 'bg-neo-pink',
@@ -32,7 +32,7 @@ const CandidateListModal = ({ isOpen, onClose, candidates, statusType, onCandida
             {/* Header */}
             <div className="flex justify-between items-center p-6 border-b-4 border-black bg-black text-white">
               <h2 className="font-black text-2xl uppercase tracking-tight">
-                {statusType} ({candidates.length})
+                {statusType} ({total ?? candidates.length})
               </h2>
               <button
                 onClick={onClose}
@@ -71,6 +71,14 @@ const CandidateListModal = ({ isOpen, onClose, candidates, statusType, onCandida
                   </button>
                 ))
               )}
+              {hasMore && (
+                <button
+                  onClick={onLoadMore}
+                  className="w-full border-3 border-black bg-black text-white p-3 font-black uppercase active:translate-y-0.5 transition-all"
+                >
+                  Load more ({candidates.length} of {total})
+                </button>
+              )}
             </div>
           </motion.div>
         </motion.div>
@@ -92,11 +92,14 @@ const CandidateSwiper = () => {
     loading,
     pitch,
     filteredCandidates,
+    filteredTotal,
+    hasMoreFiltered,
     fetchNextCandidate,
     acceptCandidate,
     rejectCandidate,
     sourceMoreCandidates,
-    fetchCandidatesByStatus
+    fetchCandidatesByStatus,
+    loadMoreCandidatesByStatus
   } = useApp();
 
   const [showPitch, setShowPitch] = useState(false);
@@ -196,6 +199,9 @@ const CandidateSwiper = () => {
           expandedStatus={expandedStatus}
           onStatClick={handleStatClick}
           candidates={filteredCandidates}
+          candidatesTotal={filteredTotal}
+          hasMoreCandidates={hasMoreFiltered}
+          onLoadMore={loadMoreCandidatesByStatus}
           onCandidateClick={handleCandidateClick}
         />
         <div className="bg-white border-4 border-black shadow-neo p-8 max-w-2xl w-full text-center">
@@ -240,6 +246,9 @@ const CandidateSwiper = () => {
           expandedStatus={expandedStatus}
           onStatClick={handleStatClick}
           candidates={filteredCandidates}
+          candidatesTotal={filteredTotal}
+          hasMoreCandidates={hasMoreFiltered}
+          onLoadMore={loadMoreCandidatesByStatus}
           onCandidateClick={handleCandidateClick}
         />
       </div>
@@ -1,6 +1,6 @@
 import { motion, AnimatePresence } from 'framer-motion';
 
-const StatsPanel = ({ stats, expandedStatus, onStatClick, candidates, onCandidateClick }) => {
+const StatsPanel = ({ stats, expandedStatus, onStatClick, candidates, candidatesTotal, hasMoreCandidates, onLoadMore, onCandidateClick }) => {
   const statusColors = {
     'accepted': 'bg-neo-green',
     'rejected': 'bg-neo-pink',
@@ -22,6 +22,9 @@ const StatsPanel = ({ stats, expandedStatus, onStatClick, candidates, onCandidat
           >
             <div className="text-xl font-black text-black">{stats.total}</div>
             <div className="text-[9px] font-black uppercase text-black">Sourced</div>
+            {stats.duplicates > 0 && (
+              <div className="text-[8px] font-bold uppercase opacity-60">{stats.duplicates} dupes skipped</div>
+            )}
           </button>
           <button
             onClick={() => onStatClick('accepted')}
@@ -95,6 +98,14 @@ const StatsPanel = ({ stats, expandedStatus, onStatClick, candidates, onCandidat
                       </div>
                     </button>
                   ))}
+                  {hasMoreCandidates && (
+                    <button
+                      onClick={onLoadMore}
+                      className="w-full border-3 border-black bg-black text-white p-2 font-black text-xs uppercase active:translate-y-[1px] transition-all"
+                    >
+                      Load more ({candidates.length} of {candidatesTotal})
+                    </button>
+                  )}
                 </div>
               )}
             </div>
@@ -1,13 +1,24 @@
-import { createContext, useContext, useState } from 'react';
+import { createContext, useContext, useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 
 const AppContext = createContext();
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// Identifies this tab's claims on candidates so a repeated fetch returns the
+// card we already hold instead of claiming another one
+const REVIEWER_ID = crypto.randomUUID();
+
+// Cards held claimed in the local buffer, so swipes don't wait on the network
+const REVIEW_WINDOW = 5;
+// Rejects are sent in batches: after this long, or sooner once the buffer runs low
+const FLUSH_DELAY_MS = 1500;
+const LOW_WATER = 2;
+
 export const AppProvider = ({ children }) => {
   const [jobId, setJobId] = useState(null);
-  const [currentCandidate, setCurrentCandidate] = useState(null);
+  // Claimed cards in serving order; the first one is on screen
+  const [queue, setQueue] = useState([]);
   const [stats, setStats] = useState({
     total: 0,
     pending: 0,
@@ -19,10 +30,94 @@ export const AppProvider = ({ children }) => {
   const [loading, setLoading] = useState(false);
   const [pitch, setPitch] = useState(null);
   const [filteredCandidates, setFilteredCandidates] = useState([]);
+  // X-Total-Count of the listed status, and the X-Next-Cursor to load more from
+  const [filteredTotal, setFilteredTotal] = useState(0);
+  const [filteredCursor, setFilteredCursor] = useState(null);
+  const filteredStatus = useRef(null);
+  // Set while no card is available and we're waiting on the pipeline
+  const waitingForCandidate = useRef(false);
+  const fallbackPoll = useRef(null);
+  const queueRef = useRef([]);
+  // Decisions made locally but not yet sent, and every card decided so far
+  const pendingDecisions = useRef([]);
+  const decided = useRef(new Set());
+  const flushTimer = useRef(null);
+  const flushing = useRef(Promise.resolve());
+
+  const currentCandidate = queue[0] || null;
+
+  const updateQueue = (cards) => {
+    queueRef.current = cards;
+    setQueue(cards);
+  };
+
+  // Merge a window from the server into the buffer: keep the order of the
+  // cards we already show, append new ones, drop anything decided locally
+  const receiveWindow = (data) => {
+    if (data.stats) {
+      setStats(data.stats);
+    }
+    const cards = (data.candidates || []).filter((card) => !decided.current.has(card.candidate.id));
+    const live = new Set(cards.map((card) => card.candidate.id));
+    const kept = queueRef.current.filter((card) => live.has(card.candidate.id));
+    const keptIds = new Set(kept.map((card) => card.candidate.id));
+    updateQueue([...kept, ...cards.filter((card) => !keptIds.has(card.candidate.id))]);
+
+    if (cards.length) {
+      waitingForCandidate.current = false;
+      setLoading(false);
+    } else if (data.stats && (data.stats.total === 0 || data.stats.pending > 0)) {
+      // No candidate returned, but either:
+      // 1. We haven't sourced any yet (total === 0)
+      // 2. We have pending candidates but they might not be matched yet (pending > 0)
+      // The next pipeline event refetches; slow polling is only a fallback
+      waitingForCandidate.current = true;
+      clearTimeout(fallbackPoll.current);
+      fallbackPoll.current = setTimeout(() => fetchNextCandidate(true), 15000);
+    } else {
+      waitingForCandidate.current = false;
+      setLoading(false);
+    }
+  };
+
+  // Send queued decisions in one request and take the refreshed window.
+  // Flushes run one at a time, in order
+  const flushDecisions = () => {
+    clearTimeout(flushTimer.current);
+    const decisions = pendingDecisions.current.splice(0);
+    const flush = flushing.current.then(async () => {
+      if (!decisions.length) return null;
+      try {
+        const response = await axios.post(`${API_BASE_URL}/api/jobs/${jobId}/decisions`, {
+          reviewer_id: REVIEWER_ID,
+          decisions,
+          limit: REVIEW_WINDOW
+        });
+        receiveWindow(response.data);
+        return response.data;
+      } catch (error) {
+        // Keep them for the next flush
+        pendingDecisions.current.unshift(...decisions);
+        throw error;
+      }
+    });
+    flushing.current = flush.catch(() => {});
+    return flush;
+  };
+
+  // Take a card off the buffer and queue its decision
+  const decide = (candidateId, decision) => {
+    decided.current.add(candidateId);
+    pendingDecisions.current.push({ candidate_id: candidateId, decision });
+    updateQueue(queueRef.current.filter((card) => card.candidate.id !== candidateId));
+  };
 
   const createJob = async (jobData) => {
     setLoading(true);
-    setCurrentCandidate(null);
+    // Decisions still queued for the previous job go out before we switch
+    flushDecisions().catch(() => {});
+    updateQueue([]);
+    decided.current = new Set();
     setPitch(null);
     setStats({
       total: 0,
@@ -48,27 +143,12 @@ export const AppProvider = ({ children }) => {
   const fetchNextCandidate = async (isRetry = false) => {
     if (!jobId) return;
 
-    if (!isRetry) setLoading(true);
+    if (!isRetry && !queueRef.current.length) setLoading(true);
     try {
-      const response = await axios.get(`${API_BASE_URL}/api/jobs/${jobId}/candidates`);
-      
-      if (response.data.stats) {
-        setStats(response.data.stats);
-      }
-
-      if (response.data.candidate) {
-        setCurrentCandidate(response.data);
-        setLoading(false);
-      } else if (response.data.stats && (response.data.stats.total === 0 || response.data.stats.pending > 0)) {
-        // No candidate returned, but either:
-        // 1. We haven't sourced any yet (total === 0)
-        // 2. We have pending candidates but they might not be matched yet (pending > 0)
-        // Poll every 3 seconds
-        setTimeout(() => fetchNextCandidate(true), 3000);
-      } else {
-        setCurrentCandidate(null);
-        setLoading(false);
-      }
+      const response = await axios.get(`${API_BASE_URL}/api/jobs/${jobId}/candidates`, {
+        params: { reviewer_id: REVIEWER_ID, limit: REVIEW_WINDOW }
+      });
+      receiveWindow(response.data);
       setPitch(null); // Reset pitch when loading new candidate
     } catch (error) {
       console.error('Error fetching candidate:', error);
@@ -77,17 +157,21 @@ export const AppProvider = ({ children }) => {
   };
 
   const acceptCandidate = async (candidateId) => {
+    if (decided.current.has(candidateId)) return;
     setLoading(true);
     try {
-      const response = await axios.put(`${API_BASE_URL}/api/candidates/${candidateId}/accept`);
-      // response.data.pitch now includes just the content, we need to attach the ID
+      // The pitch is needed right away, so this goes out with any queued rejects
+      decide(candidateId, 'accept');
+      const data = await flushDecisions();
+      const result = data.results.find((r) => r.candidate_id === candidateId);
+      if (!result || result.status !== 'accepted') {
+        throw new Error('Candidate could not be accepted');
+      }
       setPitch({
-        ...response.data.pitch,
-        outreachId: response.data.outreach_id
+        ...result.pitch,
+        outreachId: result.outreach_id
       });
-      // Update stats
-      await fetchStats();
-      return response.data;
+      return result;
     } catch (error) {
       console.error('Error accepting candidate:', error);
       throw error;
@@ -114,21 +198,24 @@ export const AppProvider = ({ children }) => {
   };
 
   const rejectCandidate = async (candidateId) => {
-    setLoading(true);
+    if (decided.current.has(candidateId)) return;
+    decide(candidateId, 'reject');
+    if (queueRef.current.length > LOW_WATER) {
+      clearTimeout(flushTimer.current);
+      flushTimer.current = setTimeout(() => {
+        flushDecisions().catch((error) => console.error('Error sending decisions:', error));
+      }, FLUSH_DELAY_MS);
+      return;
+    }
+
+    // Running low: send now, which also refills the buffer
+    if (!queueRef.current.length) setLoading(true);
     try {
-      const response = await axios.put(`${API_BASE_URL}/api/candidates/${candidateId}/reject`);
-      if (response.data.next_candidate) {
-        setCurrentCandidate(response.data.next_candidate);
-      } else {
-        setCurrentCandidate(null);
-      }
-      // Update stats
-      await fetchStats();
+      await flushDecisions();
     } catch (error) {
       console.error('Error rejecting candidate:', error);
-      throw error;
-    } finally {
       setLoading(false);
+      throw error;
     }
   };
 
@@ -139,10 +226,10 @@ export const AppProvider = ({ children }) => {
     try {
       await axios.post(`${API_BASE_URL}/api/jobs/${jobId}/source-more`);
 
-      // Poll for new candidates (simple approach)
-      setTimeout(async () => {
-        await fetchNextCandidate();
-      }, 30000); // Wait 30 seconds for generation
+      // If we've run out, the next matched batch event fetches a card
+      if (!currentCandidate) {
+        waitingForCandidate.current = true;
+      }
 
       return { message: 'Sourcing new candidates... This may take 30-60 seconds.' };
     } catch (error) {
@@ -153,6 +240,32 @@ export const AppProvider = ({ children }) => {
     }
   };
 
+  // Live pipeline progress replaces polling /stats and /candidates
+  useEffect(() => {
+    if (!jobId) return;
+
+    const events = new EventSource(`${API_BASE_URL}/api/jobs/${jobId}/pipeline-events`);
+    const onProgress = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.stats) {
+        setStats(data.stats);
+      }
+      if (waitingForCandidate.current) {
+        waitingForCandidate.current = false;
+        fetchNextCandidate(true);
+      }
+    };
+    events.addEventListener('batch_matched', onProgress);
+    events.addEventListener('pipeline_done', onProgress);
+    events.addEventListener('pipeline_failed', onProgress);
+
+    return () => {
+      events.close();
+      clearTimeout(fallbackPoll.current);
+      flushDecisions().catch(() => {});
+    };
+  }, [jobId]);
+
   const fetchStats = async () => {
     if (!jobId) return;
 
@@ -164,12 +277,21 @@ export const AppProvider = ({ children }) => {
     }
   };
 
+  const fetchStatusPage = (status, cursor) =>
+    // Only the fields the list shows; X-Next-Cursor points at the next page
+    axios.get(`${API_BASE_URL}/api/jobs/${jobId}/candidates/by-status/${status}`, {
+      params: { limit: 100, cursor, fields: 'id,name,current_role,current_company,score' }
+    });
+
   const fetchCandidatesByStatus = async (status) => {
     if (!jobId) return [];
 
     try {
-      const response = await axios.get(`${API_BASE_URL}/api/jobs/${jobId}/candidates/by-status/${status}`);
+      filteredStatus.current = status;
+      const response = await fetchStatusPage(status);
       setFilteredCandidates(response.data);
+      setFilteredTotal(Number(response.headers['x-total-count'] ?? response.data.length));
+      setFilteredCursor(response.headers['x-next-cursor'] || null);
       return response.data;
     } catch (error) {
       console.error('Error fetching candidates by status:', error);
@@ -177,6 +299,21 @@ export const AppProvider = ({ children }) => {
     }
   };
 
+  const loadMoreCandidatesByStatus = async () => {
+    const status = filteredStatus.current;
+    if (!jobId || !status || !filteredCursor) return;
+
+    try {
+      const response = await fetchStatusPage(status, filteredCursor);
+      // Another status may have been opened while this page was loading
+      if (filteredStatus.current !== status) return;
+      setFilteredCandidates(prev => [...prev, ...response.data]);
+      setFilteredCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error loading more candidates:', error);
+    }
+  };
+
   return (
     <AppContext.Provider
       value={{
@@ -186,6 +323,8 @@ export const AppProvider = ({ children }) => {
         loading,
         pitch,
         filteredCandidates,
+        filteredTotal,
+        hasMoreFiltered: filteredCursor !== null,
         createJob,
         fetchNextCandidate,
         acceptCandidate,
@@ -193,7 +332,8 @@ export const AppProvider = ({ children }) => {
         sourceMoreCandidates,
         fetchStats,
         sendOutreach,
-        fetchCandidatesByStatus
+        fetchCandidatesByStatus,
+        loadMoreCandidatesByStatus
       }}
     >
       {children}